@@ -1,39 +1,415 @@
-import joblib
+import time
+
+STARTED_AT = time.perf_counter()  # process start as far as serving is concerned, for startup timing
+
+import csv
+import io
+import os
+import json
+import queue
+from concurrent.futures import TimeoutError as FutureTimeoutError
 import numpy as np
-from config.paths_config import MODEL_OUTPUT_PATH
-from flask import Flask, render_template, request
+from config.paths_config import SERVING_MANIFEST_PATH, CONFIG_PATH
+from flask import Flask, render_template, request, jsonify, Response, stream_with_context, g
+from src.logger import get_logger
+from src.features import build_feature_row, build_feature_matrix, FeatureSchema
+from src.micro_batcher import MicroBatcher
+from src.prediction_executor import PredictionExecutor
+from src.model_registry import ModelRegistry
+from src.prediction_cache import PredictionCache
+from src.stream_scoring import score_stream
+from src import binary_protocol
+from src.metrics import ServingMetrics
+from src.admission import AdmissionController, AdmissionMiddleware, SLOT_ENVIRON_KEY
+from utils.common_functions import read_yaml
+
+try:
+    import orjson
+    json_dumps, json_loads = orjson.dumps, orjson.loads
+except ImportError:
+    json_dumps, json_loads = lambda payload: json.dumps(payload).encode(), json.loads
+
+logger = get_logger(__name__)
 
 app = Flask(__name__)
 
-loaded_model = joblib.load(MODEL_OUTPUT_PATH)
+serving_config = read_yaml(CONFIG_PATH)["serving"]
+
+reload_config = serving_config["hot_reload"]
+
+# lightgbm, numpy or quickscorer; all of them expose the LGBMClassifier predict interface
+model_registry = ModelRegistry(
+    SERVING_MANIFEST_PATH,
+    engine=serving_config["engine"],
+    pointer_path=reload_config["pointer_path"],
+    poll_interval_seconds=reload_config["poll_interval_seconds"]
+)
+
+cache_config = serving_config["prediction_cache"]
+prediction_cache = None
+if cache_config["enabled"]:
+    prediction_cache = PredictionCache(
+        max_size=cache_config["max_size"],
+        ttl_seconds=cache_config["ttl_seconds"],
+        model_path=SERVING_MANIFEST_PATH,
+        check_interval_seconds=cache_config["check_interval_seconds"]
+    )
+
+executor_config = serving_config["prediction_executor"]
+prediction_executor = None
+
+batching_config = serving_config["micro_batching"]
+batcher = None
+
+def on_model_swap(handle):
+    if batcher is not None:
+        batcher.use_model(handle.model, handle.version)
+
+model_registry.add_listener(on_model_swap)
+
+def start_prediction_threads():
+    global batcher, prediction_executor
+    prediction_executor = PredictionExecutor(
+        max_workers=executor_config["workers"],
+        thread_budget=executor_config["thread_budget"],
+        rows_per_thread=executor_config["rows_per_thread"],
+        # serve.py sets this to the number of prefork workers sharing the host
+        processes=int(os.environ.get("SERVING_PROCESSES", "1"))
+    )
+    if batching_config["enabled"]:
+        handle = model_registry.current
+        batcher = MicroBatcher(
+            handle.model,
+            max_batch_size=batching_config["max_batch_size"],
+            flush_interval_ms=batching_config["flush_interval_ms"],
+            max_queue_size=batching_config["max_queue_size"],
+            executor=prediction_executor,
+            version=handle.version
+        )
+    if reload_config["enabled"]:
+        model_registry.start_watching()
+
+ready = False
+startup_seconds = None
+
+def warmup():
+    # Exercise every layer a first request touches (executor, batcher, Jinja template compilation,
+    # JSON encoding) so /readyz only reports ready once the first request will be fast
+    global ready, startup_seconds
+    handle = model_registry.current
+    row = np.zeros((1, len(feature_schema.fields)), dtype=np.float64)
+
+    prediction_executor.score(handle.model, row)
+    if batcher is not None:
+        batcher.predict(row[0].copy(), timeout=batching_config["request_timeout_seconds"])
+    with app.test_request_context():
+        render_template('index.html', prediction=0)
+        render_template('index.html', prediction=1)
+    json_dumps({"prediction": 0, "probability": 0.0, "model_version": handle.version})
+
+    ready = True
+    startup_seconds = time.perf_counter() - STARTED_AT
+    logger.info(f"Serving ready after {startup_seconds:.2f}s (model version {handle.version})")
+
+def start_background_threads():
+    # Threads do not survive fork, so prefork workers call this again after forking
+    start_prediction_threads()
+    warmup()
+
+metrics = ServingMetrics()
+
+@app.before_request
+def track_request_start():
+    g.request_start = time.perf_counter()
+    metrics.request_started()
+
+admission_config = serving_config["admission"]
+admission = None
+if admission_config["enabled"]:
+    admission = AdmissionController(
+        max_in_flight=admission_config["max_in_flight"],
+        max_queue=admission_config["max_queue"],
+        queue_timeout_seconds=admission_config["queue_timeout_seconds"]
+    )
+    # Only the prediction routes are shed; health, readiness and stats always answer
+    app.wsgi_app = AdmissionMiddleware(
+        app.wsgi_app, admission,
+        paths=("/", "/predict", "/predict/batch", "/predict/stream", "/predict/binary"),
+        retry_after_seconds=admission_config["retry_after_seconds"]
+    )
+
+@app.teardown_request
+def track_request_end(exception):
+    slot = request.environ.get(SLOT_ENVIRON_KEY)
+    if slot is not None and not slot.held_until_close:
+        slot.release()
+    request_start = g.get("request_start")
+    if request_start is None:
+        # Contexts pushed outside a real request (warmup) never ran track_request_start
+        return
+    route = request.url_rule.rule if request.url_rule is not None else "unmatched"
+    metrics.request_finished(route, time.perf_counter() - request_start)
+
+feature_schema = FeatureSchema()
+
+def predict_single(row, handle, timer):
+    # row is a 1 x NUM_FEATURES array. Returns (label, probability, model version), or None when
+    # the batcher is full or does not answer in time. A hot reload can swap the batcher's model
+    # after handle was taken, so the version is the one that actually scored the row.
+    cache_key = None
+    if prediction_cache is not None:
+        cache_key = PredictionCache.make_key(handle.version, row[0])
+        cached = prediction_cache.get(cache_key)
+        timer.stage("cache_lookup")
+        if cached is not None:
+            return cached
+
+    if batcher is not None:
+        try:
+            # The batcher may read the row after a timeout, so it gets its own copy
+            result = batcher.predict(row[0].copy(), timeout=batching_config["request_timeout_seconds"])
+        except queue.Full:
+            logger.error("Micro batcher queue is full, rejecting request")
+            return None
+        except FutureTimeoutError:
+            logger.error("Micro batcher did not answer within the request timeout, rejecting request")
+            return None
+    else:
+        labels, probabilities = prediction_executor.score(handle.model, row)
+        result = (labels[0].item(), probabilities[0].item(), handle.version)
+
+    if prediction_cache is not None:
+        if result[2] != handle.version:
+            cache_key = PredictionCache.make_key(result[2], row[0])
+        prediction_cache.put(cache_key, result)
+    timer.stage("predict")
+    return result
+
+def wants_json():
+    return request.is_json or request.accept_mimetypes.best == "application/json"
 
 @app.route('/', methods=['GET', 'POST'])
 def index():
     if request.method == 'POST':
-        
-        lead_time = int(request.form['lead_time'])
-        no_of_special_requests = int(request.form['no_of_special_requests'])
-        avg_price_per_room = float(request.form['avg_price_per_room'])
-        arrival_month = int(request.form['arrival_month'])
-        arrival_date = int(request.form['arrival_date'])
-        market_segment_type = int(request.form['market_segment_type'])
-        no_of_week_nights = int(request.form['no_of_week_nights'])
-        no_of_weekend_nights = int(request.form['no_of_weekend_nights'])
-        type_of_meal_plan = int(request.form['type_of_meal_plan'])
-        # room_type_reserved = int(request.form['room_type_reserved'])
-
-
-        features = np.array([[lead_time, no_of_special_requests, avg_price_per_room, arrival_month, arrival_date,
-                            market_segment_type, no_of_week_nights, no_of_weekend_nights, type_of_meal_plan
-                            # room_type_reserved
-                            ]])
-
-        prediction = loaded_model.predict(features)
-
-        return render_template('index.html', prediction=prediction[0])
+        if wants_json():
+            return predict_json()
+
+        timer = metrics.timer('/', g.request_start)
+
+        # lead_time, no_of_special_requests, avg_price_per_room, arrival_month, arrival_date,
+        # market_segment_type, no_of_week_nights, no_of_weekend_nights, type_of_meal_plan
+        # room_type_reserved is not used by the model
+        features = build_feature_row(request.form)
+        handle = model_registry.current
+        timer.stage("parse")
+
+        row = np.array([features], dtype=np.float64)
+        timer.stage("build_array")
+
+        result = predict_single(row, handle, timer)
+        if result is None:
+            return "Server is busy, please retry", 503, {"Retry-After": "1"}
+        prediction = result[0]
+
+        metrics.count_predictions(prediction)
+        page = render_template('index.html', prediction=prediction)
+        timer.stage("render")
+        return page
     return render_template('index.html', prediction=None)
 
+@app.route('/predict', methods=['POST'])
+def predict_json():
+    # Machine clients get label, probability and model version as JSON, without template rendering
+    timer = metrics.timer('/predict', g.request_start)
+    try:
+        if request.mimetype in ("application/x-www-form-urlencoded", "multipart/form-data"):
+            payload = request.form.to_dict()
+        else:
+            payload = json_loads(request.get_data(cache=False))
+        row = feature_schema.fill(payload)
+    except (KeyError, TypeError, ValueError) as e:
+        logger.error(f"Rejected JSON prediction request: {e}")
+        return Response(json_dumps({"error": f"{type(e).__name__}: {e}"}), status=400, mimetype="application/json")
+    handle = model_registry.current
+    timer.stage("parse")
+
+    result = predict_single(row, handle, timer)
+    if result is None:
+        return Response(json_dumps({"error": "Server is busy, please retry"}), status=503,
+                        mimetype="application/json", headers={"Retry-After": "1"})
+
+    label, probability, version = result
+    metrics.count_predictions(label)
+    response = Response(json_dumps({"prediction": label, "probability": probability, "model_version": version}),
+                        mimetype="application/json")
+    timer.stage("serialize")
+    return response
+
+@app.route('/predict/batch', methods=['POST'])
+def predict_batch():
+    timer = metrics.timer('/predict/batch', g.request_start)
+    payload = request.get_json(silent=True)
+    bookings = payload.get("bookings") if isinstance(payload, dict) else payload
+
+    try:
+        features = build_feature_matrix(bookings)
+    except ValueError as e:
+        logger.error(f"Rejected batch prediction request: {e}")
+        return jsonify({"error": str(e)}), 400
+
+    if len(features) > serving_config["max_batch_size"]:
+        return jsonify({"error": f"Batch size {len(features)} exceeds the limit of {serving_config['max_batch_size']}"}), 413
+
+    timer.stage("parse")
+
+    # One vectorized call for the whole batch instead of one call per booking
+    predictions, probabilities = prediction_executor.score(model_registry.current.model, features)
+    timer.stage("predict")
+    metrics.count_predictions(predictions)
+
+    logger.info(f"Scored a batch of {len(features)} bookings")
+
+    response = jsonify({
+        "predictions": predictions.tolist(),
+        "probabilities": probabilities.tolist()
+    })
+    timer.stage("serialize")
+    return response
+
+@app.route('/predict/stream', methods=['POST'])
+def predict_stream():
+    # Accepts a (possibly chunked) NDJSON or CSV body and streams one result per row back
+    input_format = "csv" if request.mimetype in ("text/csv", "application/csv") else "ndjson"
+    slot = request.environ.get(SLOT_ENVIRON_KEY)
+    if slot is not None:
+        # Rows are scored while the response streams, so keep the slot until the server closes it
+        slot.held_until_close = True
+    results = score_stream(model_registry.current.model, request.stream, input_format, serving_config["stream_chunk_size"],
+                           prediction_executor)
+
+    def counted(results):
+        for result in results:
+            if "prediction" in result:
+                metrics.count_predictions(result["prediction"])
+            yield result
+
+    results = counted(results)
+
+    def generate_ndjson():
+        for result in results:
+            yield json.dumps(result) + "\n"
+
+    def generate_csv():
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=["row", "prediction", "probability", "error"])
+        writer.writeheader()
+        for result in results:
+            writer.writerow(result)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    if input_format == "csv":
+        return Response(stream_with_context(generate_csv()), mimetype="text/csv")
+    return Response(stream_with_context(generate_ndjson()), mimetype="application/x-ndjson")
+
+@app.route('/predict/binary', methods=['POST'])
+def predict_binary():
+    # Raw little-endian float32 matrix or Arrow IPC stream in, probabilities out in the same encoding
+    timer = metrics.timer('/predict/binary', g.request_start)
+    body = request.get_data(cache=False)
+    is_arrow = request.mimetype == binary_protocol.ARROW_CONTENT_TYPE
+
+    try:
+        if is_arrow:
+            features = binary_protocol.decode_arrow_stream(body)
+        else:
+            features = binary_protocol.decode_float32_matrix(body)
+    except Exception as e:
+        logger.error(f"Rejected binary prediction request: {e}")
+        return jsonify({"error": str(e)}), 400
+
+    if len(features) > serving_config["max_batch_size"]:
+        return jsonify({"error": f"Batch size {len(features)} exceeds the limit of {serving_config['max_batch_size']}"}), 413
+
+    timer.stage("parse")
+
+    if len(features) == 0:
+        probabilities = np.empty(0)
+    else:
+        labels, probabilities = prediction_executor.score(model_registry.current.model, features)
+        metrics.count_predictions(labels)
+    timer.stage("predict")
+
+    if is_arrow:
+        response = Response(binary_protocol.encode_arrow_probabilities(probabilities),
+                            mimetype=binary_protocol.ARROW_CONTENT_TYPE)
+    else:
+        response = Response(binary_protocol.encode_float32_matrix(probabilities),
+                            mimetype=binary_protocol.FLOAT32_CONTENT_TYPE)
+    timer.stage("serialize")
+    return response
+
+@app.route('/batcher/stats', methods=['GET'])
+def batcher_stats():
+    if batcher is None:
+        return jsonify({"enabled": False})
+    return jsonify({"enabled": True, **batcher.stats()})
+
+@app.route('/admission/stats', methods=['GET'])
+def admission_stats():
+    if admission is None:
+        return jsonify({"enabled": False})
+    return jsonify({"enabled": True, **admission.stats()})
+
+@app.route('/cache/stats', methods=['GET'])
+def cache_stats():
+    if prediction_cache is None:
+        return jsonify({"enabled": False})
+    return jsonify({"enabled": True, "model_version": model_registry.current.version, **prediction_cache.stats()})
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    gauges = {}
+    if batcher is not None:
+        gauges["batcher_queue_depth"] = ("Rows waiting in the micro batcher queue", batcher.queue.qsize())
+    if admission is not None:
+        admission_state = admission.stats()
+        gauges["admission_queue_depth"] = ("Requests waiting for an admission slot", admission_state["queue_depth"])
+        gauges["admission_in_flight"] = ("Admitted requests being handled", admission_state["in_flight"])
+        gauges["admission_shed_queue_full"] = ("Requests shed because the admission queue was full",
+                                               admission_state["shed"]["queue_full"])
+        gauges["admission_shed_deadline"] = ("Requests shed after waiting past the queue deadline",
+                                             admission_state["shed"]["deadline"])
+    if prediction_cache is not None:
+        cache = prediction_cache.stats()
+        gauges["cache_hits"] = ("Prediction cache hits", cache["hits"])
+        gauges["cache_misses"] = ("Prediction cache misses", cache["misses"])
+        gauges["cache_size"] = ("Entries in the prediction cache", cache["size"])
+    body = metrics.render_prometheus(model_registry.current.version, gauges)
+    return Response(body, mimetype="text/plain; version=0.0.4")
+
+@app.route('/status', methods=['GET'])
+def status():
+    return jsonify(model_registry.status())
+
+@app.route('/healthz', methods=['GET'])
+def healthz():
+    # Liveness: the process is up and answering
+    return jsonify({"status": "ok"})
+
+@app.route('/readyz', methods=['GET'])
+def readyz():
+    # Readiness: the model is loaded, warmed up and the batcher is running
+    batcher_alive = batcher is None or batcher.is_alive()
+    if not (ready and batcher_alive):
+        return jsonify({"status": "not ready", "warmed_up": ready, "batcher_alive": batcher_alive}), 503
+    return jsonify({"status": "ready", "model_version": model_registry.current.version,
+                    "startup_seconds": startup_seconds})
+
+# The prefork master only loads the model; serve.py starts the threads in each worker after fork
+if os.environ.get("PREFORK_MASTER") != "1":
+    start_background_threads()
+
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=8080)
-
-    
\ No newline at end of file
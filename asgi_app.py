@@ -0,0 +1,164 @@
+import asyncio
+import json
+from urllib.parse import parse_qsl
+
+import numpy as np
+
+from config.paths_config import SERVING_MANIFEST_PATH, CONFIG_PATH
+from src.logger import get_logger
+from src.features import build_feature_matrix, FeatureSchema
+from src.prediction_executor import PredictionExecutor
+from src.model_registry import ModelRegistry
+from utils.common_functions import read_yaml
+
+logger = get_logger(__name__)
+
+serving_config = read_yaml(CONFIG_PATH)["serving"]
+asgi_config = serving_config["asgi"]
+
+reload_config = serving_config["hot_reload"]
+
+model_registry = ModelRegistry(
+    SERVING_MANIFEST_PATH,
+    engine=serving_config["engine"],
+    pointer_path=reload_config["pointer_path"],
+    poll_interval_seconds=reload_config["poll_interval_seconds"]
+)
+
+# Predictions are CPU bound, so they run on a bounded pool and the event loop only does I/O and parsing
+executor_config = serving_config["prediction_executor"]
+executor = PredictionExecutor(
+    max_workers=executor_config["workers"],
+    thread_budget=executor_config["thread_budget"],
+    rows_per_thread=executor_config["rows_per_thread"]
+)
+pending = asyncio.Semaphore(asgi_config["max_pending"])
+feature_schema = FeatureSchema()
+# Set once the lifespan startup has loaded the model and run a warmup prediction
+ready = False
+
+
+async def read_body(receive):
+    chunks = []
+    size = 0
+    while True:
+        message = await receive()
+        chunk = message.get("body", b"")
+        size += len(chunk)
+        if size > asgi_config["max_body_bytes"]:
+            raise ValueError("Request body too large")
+        chunks.append(chunk)
+        if not message.get("more_body", False):
+            return b"".join(chunks)
+
+
+async def send_json(send, status, payload, headers=()):
+    body = json.dumps(payload).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode()), *headers],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+def parse_single(body, content_type):
+    # Same validation as the Flask /predict route. fill() reuses one buffer per thread and the
+    # event loop parses the next request while this one is scored, so the row is copied.
+    if content_type.startswith(("application/x-www-form-urlencoded", "multipart/form-data")):
+        payload = dict(parse_qsl(body.decode()))
+    else:
+        payload = json.loads(body)
+    return feature_schema.fill(payload).copy()
+
+
+def parse_batch(body):
+    payload = json.loads(body)
+    bookings = payload.get("bookings") if isinstance(payload, dict) else payload
+    features = build_feature_matrix(bookings)
+    if len(features) > serving_config["max_batch_size"]:
+        raise ValueError(f"Batch size {len(features)} exceeds the limit of {serving_config['max_batch_size']}")
+    return features
+
+
+async def run_prediction(model, features):
+    if pending.locked():
+        return None
+    async with pending:
+        return await asyncio.wrap_future(executor.submit(model, features))
+
+
+async def warmup():
+    # First prediction through the executor, so /readyz only reports ready once requests will be fast
+    global ready
+    row = np.zeros((1, len(feature_schema.fields)), dtype=np.float64)
+    await asyncio.wrap_future(executor.submit(model_registry.current.model, row))
+    ready = True
+
+
+async def app(scope, receive, send):
+    if scope["type"] == "lifespan":
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                if reload_config["enabled"]:
+                    model_registry.start_watching()
+                await warmup()
+                logger.info(f"ASGI app started with model version {model_registry.current.version}")
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                model_registry.stop_watching()
+                executor.shutdown()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    if scope["type"] != "http":
+        return
+
+    path, method = scope["path"], scope["method"]
+    if method == "GET" and path == "/healthz":
+        # Liveness: the event loop is up and answering
+        await send_json(send, 200, {"status": "ok"})
+        return
+    if method == "GET" and path == "/readyz":
+        if not ready:
+            await send_json(send, 503, {"status": "not ready"})
+        else:
+            await send_json(send, 200, {"status": "ready", "model_version": model_registry.current.version})
+        return
+    if method != "POST" or path not in ("/", "/predict", "/predict/batch"):
+        await send_json(send, 404, {"error": f"No route for {method} {path}"})
+        return
+
+    headers = dict(scope["headers"])
+    content_type = headers.get(b"content-type", b"").decode()
+
+    try:
+        body = await read_body(receive)
+        if path == "/predict/batch":
+            features = parse_batch(body)
+        else:
+            features = parse_single(body, content_type)
+    except (KeyError, TypeError, ValueError) as e:
+        logger.error(f"Rejected ASGI prediction request: {e}")
+        await send_json(send, 400, {"error": str(e)})
+        return
+
+    handle = model_registry.current
+    result = await run_prediction(handle.model, features)
+    if result is None:
+        await send_json(send, 503, {"error": "Server is busy, please retry"}, headers=[(b"retry-after", b"1")])
+        return
+
+    labels, probabilities = result
+    if path == "/predict/batch":
+        await send_json(send, 200, {"predictions": labels.tolist(), "probabilities": probabilities.tolist()})
+    else:
+        await send_json(send, 200, {"prediction": labels[0].item(), "probability": probabilities[0].item(),
+                                    "model_version": handle.version})
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run("asgi_app:app", host=asgi_config["host"], port=asgi_config["port"], log_level="warning")
@@ -0,0 +1,109 @@
+import argparse
+import asyncio
+import json
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.benchmark_prefork_memory import wait_until_up
+
+CONNECTION_LEVELS = [10, 100, 1000]
+
+BOOKING = {"lead_time": 26, "no_of_special_requests": 0, "avg_price_per_room": 161.0, "arrival_month": 10,
+           "arrival_date": 17, "market_segment_type": 4, "no_of_week_nights": 1, "no_of_weekend_nights": 2,
+           "type_of_meal_plan": 0}
+
+
+def build_request(port):
+    # /predict/batch with a single booking does the same work on both servers
+    body = json.dumps({"bookings": [BOOKING]}).encode()
+    head = (f"POST /predict/batch HTTP/1.1\r\nHost: 127.0.0.1:{port}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n").encode()
+    return head + body
+
+
+async def read_response(reader):
+    head = await reader.readuntil(b"\r\n\r\n")
+    status = int(head.split(b" ", 2)[1])
+    length = 0
+    for line in head.split(b"\r\n"):
+        if line.lower().startswith(b"content-length:"):
+            length = int(line.split(b":")[1])
+    await reader.readexactly(length)
+    return status, b"connection: close" in head.lower()
+
+
+async def connection_loop(port, request, deadline, latencies, errors):
+    # One keep-alive connection sending requests back to back until the deadline
+    reader = writer = None
+    while time.perf_counter() < deadline:
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            start = time.perf_counter()
+            writer.write(request)
+            await writer.drain()
+            status, closed = await read_response(reader)
+            if status == 200:
+                latencies.append(time.perf_counter() - start)
+            else:
+                errors.append(status)
+            if closed:
+                writer.close()
+                writer = None
+        except (OSError, asyncio.IncompleteReadError):
+            errors.append("connection")
+            writer = None
+            await asyncio.sleep(0.01)
+    if writer is not None:
+        writer.close()
+
+
+async def run_level(port, connections, duration):
+    request = build_request(port)
+    latencies, errors = [], []
+    deadline = time.perf_counter() + duration
+    await asyncio.gather(*(connection_loop(port, request, deadline, latencies, errors) for _ in range(connections)))
+    return np.array(latencies), errors
+
+
+def start_server(kind, port, workers):
+    if kind == "wsgi":
+        command = [sys.executable, "serve.py", "--workers", str(workers), "--bind", f"127.0.0.1:{port}"]
+    else:
+        command = [sys.executable, "-m", "uvicorn", "asgi_app:app", "--host", "127.0.0.1", "--port", str(port),
+                   "--workers", str(workers), "--log-level", "warning"]
+    server = subprocess.Popen(command)
+    wait_until_up(f"http://127.0.0.1:{port}/predict/batch", timeout=60)
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the Flask (WSGI) and asyncio (ASGI) serving paths")
+    parser.add_argument("--connections", nargs="+", type=int, default=CONNECTION_LEVELS)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per connection level")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--port", type=int, default=8097)
+    args = parser.parse_args()
+
+    print(f"{'server':<8}{'conns':>7}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'p99.9 ms':>10}{'errors':>8}")
+    for kind in ("wsgi", "asgi"):
+        server = start_server(kind, args.port, args.workers)
+        try:
+            for connections in args.connections:
+                latencies, errors = asyncio.run(run_level(args.port, connections, args.duration))
+                if len(latencies):
+                    p50, p99, p999 = np.percentile(latencies, [50, 99, 99.9]) * 1000
+                else:
+                    p50 = p99 = p999 = float("nan")
+                print(f"{kind:<8}{connections:>7}{len(latencies) / args.duration:>10.0f}"
+                      f"{p50:>10.2f}{p99:>10.2f}{p999:>10.2f}{len(errors):>8}")
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+import argparse
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from config.paths_config import MODEL_OUTPUT_PATH, PROCESSED_TEST_DATA_PATH
+from src.features import FEATURE_COLUMNS
+from src.inference_engine import ENGINES, load_inference_engine
+
+BATCH_SIZES = [1, 10, 100, 1000, 10000, 100000]
+
+
+def time_call(fn, X, repeats):
+    fn(X)  # warm up
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn(X)
+        timings.append(time.perf_counter() - start)
+    return np.array(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare inference engines across batch sizes")
+    parser.add_argument("--engines", nargs="+", default=list(ENGINES), choices=ENGINES)
+    parser.add_argument("--batch-sizes", nargs="+", type=int, default=BATCH_SIZES)
+    parser.add_argument("--max-seconds", type=float, default=2.0, help="time budget per engine and batch size")
+    args = parser.parse_args()
+
+    model = joblib.load(MODEL_OUTPUT_PATH)
+    data = pd.read_parquet(PROCESSED_TEST_DATA_PATH, columns=FEATURE_COLUMNS).to_numpy(dtype=np.float64)
+    rows = np.resize(data, (max(args.batch_sizes), data.shape[1]))
+
+    engines = {name: load_inference_engine(model, name) for name in args.engines}
+
+    print(f"{'engine':<12}{'batch':>8}{'p50 ms':>12}{'p99 ms':>12}{'rows/s':>14}")
+    for batch_size in args.batch_sizes:
+        X = np.ascontiguousarray(rows[:batch_size])
+        for name, engine in engines.items():
+            # Size the number of repeats from one timed call so large batches stay within budget
+            single = time_call(engine.predict_proba, X, 1)[0]
+            repeats = int(min(1000, max(3, args.max_seconds / max(single, 1e-6))))
+            timings = time_call(engine.predict_proba, X, repeats)
+
+            p50, p99 = np.percentile(timings, [50, 99]) * 1000
+            throughput = batch_size / np.median(timings)
+            print(f"{name:<12}{batch_size:>8}{p50:>12.3f}{p99:>12.3f}{throughput:>14.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from config.paths_config import PROCESSED_TRAIN_DATA_PATH, TRAIN_FILE_PATH
+from src.data_schema import RAW_SCHEMA, processed_schema
+from src.features import FEATURE_COLUMNS
+from utils.common_functions import save_parquet
+
+# Columns a typical downstream stage asks for: the model features and the label
+SUBSET = FEATURE_COLUMNS + ["booking_status"]
+
+
+def timed(function, runs):
+    seconds = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        function()
+        seconds.append(time.perf_counter() - start)
+    return float(np.median(seconds))
+
+
+def compare(name, df, schema, runs, workdir):
+    csv_path = os.path.join(workdir, f"{name}.csv")
+    parquet_path = os.path.join(workdir, f"{name}.parquet")
+    subset = [column for column in SUBSET if column in df.columns]
+
+    rows = []
+    for fmt, path, write, read, read_subset in (
+        ("csv", csv_path,
+         lambda: df.to_csv(csv_path, index=False),
+         lambda: pd.read_csv(csv_path),
+         lambda: pd.read_csv(csv_path, usecols=subset)),
+        ("parquet", parquet_path,
+         lambda: save_parquet(df, parquet_path, schema),
+         lambda: pd.read_parquet(parquet_path),
+         lambda: pd.read_parquet(parquet_path, columns=subset)),
+    ):
+        write_seconds = timed(write, runs)
+        rows.append((f"{name} ({fmt})", os.path.getsize(path), write_seconds, timed(read, runs),
+                     timed(read_subset, runs)))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare CSV and Parquet for the pipeline's intermediate files")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    raw = pd.read_parquet(TRAIN_FILE_PATH)
+    processed = pd.read_parquet(PROCESSED_TRAIN_DATA_PATH)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        rows = compare("raw train", raw, RAW_SCHEMA, args.runs, workdir)
+        rows += compare("processed train", processed, processed_schema(processed, []), args.runs, workdir)
+
+    print(f"{'file':<28}{'size KB':>10}{'write ms':>10}{'read ms':>10}{'subset ms':>11}")
+    for name, size, write_seconds, read_seconds, subset_seconds in rows:
+        print(f"{name:<28}{size / 1024:>10.0f}{write_seconds * 1000:>10.1f}{read_seconds * 1000:>10.1f}"
+              f"{subset_seconds * 1000:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+import argparse
+import time
+
+from src.metrics import ServingMetrics
+
+
+def instrumented_request(metrics):
+    # Everything application.py adds to a form POST: in-flight tracking, four stage timers,
+    # the per-class prediction count and the total request histogram
+    start = time.perf_counter()
+    metrics.request_started()
+    timer = metrics.timer("/", start)
+    timer.stage("parse")
+    timer.stage("cache_lookup")
+    timer.stage("predict")
+    metrics.count_predictions(1)
+    timer.stage("render")
+    metrics.request_finished("/", time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the per-request cost of the serving metrics")
+    parser.add_argument("--requests", type=int, default=200000)
+    parser.add_argument("--repeat", type=int, default=5, help="runs to take the fastest of, to filter out noise")
+    parser.add_argument("--budget-us", type=float, default=5.0, help="fail when a request costs more than this")
+    args = parser.parse_args()
+
+    metrics = ServingMetrics()
+    for _ in range(1000):
+        instrumented_request(metrics)
+
+    runs = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        for _ in range(args.requests):
+            instrumented_request(metrics)
+        runs.append((time.perf_counter() - start) / args.requests)
+    per_request = min(runs)
+
+    start = time.perf_counter()
+    metrics.render_prometheus("benchmark")
+    scrape = time.perf_counter() - start
+
+    print(f"Instrumentation overhead: {per_request * 1e6:.2f} us per request (budget {args.budget_us:.2f} us)")
+    print(f"Rendering /metrics: {scrape * 1e3:.2f} ms")
+    assert per_request * 1e6 <= args.budget_us, \
+        f"Instrumentation costs {per_request * 1e6:.2f} us per request, over the {args.budget_us:.2f} us budget"
+
+
+if __name__ == "__main__":
+    main()
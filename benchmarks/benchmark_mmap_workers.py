@@ -0,0 +1,87 @@
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.benchmark_prefork_memory import memory_kb
+from config.paths_config import MODEL_OUTPUT_PATH, PROCESSED_TEST_DATA_PATH, SERVING_MANIFEST_PATH
+from src.features import FEATURE_COLUMNS
+
+# model path and engine each worker loads; "baseline" only imports the serving code
+FORMATS = {
+    "baseline": (None, None),
+    "pickle (lightgbm)": (MODEL_OUTPUT_PATH, "lightgbm"),
+    "text model (numpy)": (SERVING_MANIFEST_PATH, "text"),
+    "memmap trees (numpy)": (SERVING_MANIFEST_PATH, "numpy"),
+}
+
+# A worker loads the model, scores the sample so every page it needs is touched,
+# reports how long the load took and then idles until stdin is closed
+WORKER_SCRIPT = """
+import sys, time
+import numpy as np
+start = time.perf_counter()
+from src.predictor import load_model, score
+model_path, engine, sample_path = sys.argv[1:4]
+if model_path != "None":
+    if engine == "text":
+        from src.serving_artifact import read_manifest
+        from src.inference_engine import load_inference_engine_from_text
+        manifest = read_manifest(model_path)
+        with open(model_path.replace("manifest.json", manifest["model_file"])) as model_file:
+            model = load_inference_engine_from_text(model_file.read(), manifest["classes"], "numpy")
+    else:
+        model, _ = load_model(model_path, engine)
+    loaded = time.perf_counter() - start
+    score(model, np.load(sample_path))
+else:
+    loaded = time.perf_counter() - start
+print(loaded, flush=True)
+sys.stdin.read()
+"""
+
+
+def run_workers(model_path, engine, sample_path, workers):
+    processes = [subprocess.Popen([sys.executable, "-c", WORKER_SCRIPT, str(model_path), str(engine), sample_path],
+                                  stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+                 for _ in range(workers)]
+    try:
+        load_seconds = [float(process.stdout.readline()) for process in processes]
+        time.sleep(0.2)
+        memory = [memory_kb(process.pid) for process in processes]
+    finally:
+        for process in processes:
+            process.stdin.close()
+            process.wait()
+    return load_seconds, memory
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-worker memory of the pickled vs memory-mapped model")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--rows", type=int, default=5000)
+    args = parser.parse_args()
+
+    sample = pd.read_parquet(PROCESSED_TEST_DATA_PATH, columns=FEATURE_COLUMNS).head(args.rows).to_numpy(dtype=np.float64)
+    with tempfile.TemporaryDirectory() as tmp:
+        sample_path = os.path.join(tmp, "sample.npy")
+        np.save(sample_path, sample)
+
+        print(f"{args.workers} worker processes per format")
+        print(f"{'format':<24}{'load s':>8}{'PSS MiB':>10}{'shared MiB':>12}{'private MiB':>13}{'total PSS MiB':>15}")
+        for name, (model_path, engine) in FORMATS.items():
+            load_seconds, memory = run_workers(model_path, engine, sample_path, args.workers)
+            pss = np.mean([m["pss"] for m in memory]) / 1024
+            shared = np.mean([m["shared"] for m in memory]) / 1024
+            private = np.mean([m["private"] for m in memory]) / 1024
+            total = sum(m["pss"] for m in memory) / 1024
+            print(f"{name:<24}{np.median(load_seconds):>8.2f}{pss:>10.1f}{shared:>12.1f}{private:>13.1f}{total:>15.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+import argparse
+import json
+import subprocess
+import sys
+
+import numpy as np
+
+from config.paths_config import MODEL_OUTPUT_PATH, SERVING_MANIFEST_PATH
+
+# Runs in a fresh interpreter so imports and allocations are not shared between the two formats
+LOAD_SCRIPT = """
+import json, resource, sys, time
+start = time.perf_counter()
+from src.predictor import load_model
+model, version = load_model(sys.argv[1], sys.argv[2])
+seconds = time.perf_counter() - start
+print(json.dumps({"seconds": seconds, "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+                  "sklearn_imported": "sklearn" in sys.modules}))
+"""
+
+
+def measure(model_path, engine, runs):
+    results = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, "-c", LOAD_SCRIPT, model_path, engine],
+                                capture_output=True, text=True, check=True)
+        results.append(json.loads(output.stdout.strip().splitlines()[-1]))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare loading the pickled model with the serving artifact")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--engine", default="lightgbm", choices=["lightgbm", "numpy", "quickscorer"])
+    args = parser.parse_args()
+
+    print(f"{'artifact':<40}{'load s':>10}{'max RSS MB':>12}{'sklearn':>9}")
+    for model_path in (MODEL_OUTPUT_PATH, SERVING_MANIFEST_PATH):
+        results = measure(model_path, args.engine, args.runs)
+        seconds = np.median([r["seconds"] for r in results])
+        rss_mb = np.median([r["max_rss_kb"] for r in results]) / 1024
+        print(f"{model_path:<40}{seconds:>10.2f}{rss_mb:>12.1f}{str(results[0]['sklearn_imported']):>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+import argparse
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+import joblib
+
+from config.paths_config import MODEL_OUTPUT_PATH
+
+FORM = "lead_time=26&no_of_special_requests=0&avg_price_per_room=161&arrival_month=10&arrival_date=17" \
+       "&market_segment_type=4&no_of_week_nights=1&no_of_weekend_nights=2&type_of_meal_plan=0"
+
+
+def memory_kb(pid):
+    # Rss counts shared pages in full, Pss splits them between the processes sharing them
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as smaps:
+        for line in smaps:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                fields[parts[0].rstrip(":")] = int(parts[1])
+    return {
+        "rss": fields["Rss"],
+        "pss": fields["Pss"],
+        "shared": fields["Shared_Clean"] + fields["Shared_Dirty"],
+        "private": fields["Private_Clean"] + fields["Private_Dirty"],
+    }
+
+
+def children(pid):
+    with open(f"/proc/{pid}/task/{pid}/children") as f:
+        return [int(child) for child in f.read().split()]
+
+
+def current_rss_kb():
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+
+
+def model_footprint_kb():
+    before = current_rss_kb()
+    model = joblib.load(MODEL_OUTPUT_PATH)
+    return current_rss_kb() - before, model
+
+
+def wait_until_up(url, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(url, timeout=1).read()
+            return
+        except urllib.error.HTTPError:
+            return  # any HTTP answer means the server is accepting requests
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"Server at {url} did not come up in {timeout}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure per-worker memory of the prefork server")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    footprint, _ = model_footprint_kb()
+    print(f"Importing lightgbm and unpickling the model adds {footprint / 1024:.1f} MiB to a process")
+
+    url = f"http://127.0.0.1:{args.port}/"
+    server = subprocess.Popen([sys.executable, "serve.py", "--workers", str(args.workers),
+                               "--bind", f"127.0.0.1:{args.port}"])
+    try:
+        wait_until_up(url)
+        # Spread some predictions over the workers so they are measured warm
+        for _ in range(args.requests):
+            urllib.request.urlopen(url, data=FORM.encode()).read()
+
+        master = memory_kb(server.pid)
+        print(f"{'process':<10}{'pid':>8}{'RSS MiB':>10}{'PSS MiB':>10}{'shared MiB':>12}{'private MiB':>13}")
+        print(f"{'master':<10}{server.pid:>8}{master['rss'] / 1024:>10.1f}{master['pss'] / 1024:>10.1f}"
+              f"{master['shared'] / 1024:>12.1f}{master['private'] / 1024:>13.1f}")
+
+        worker_pids = children(server.pid)
+        total_pss = master["pss"]
+        for pid in worker_pids:
+            worker = memory_kb(pid)
+            total_pss += worker["pss"]
+            print(f"{'worker':<10}{pid:>8}{worker['rss'] / 1024:>10.1f}{worker['pss'] / 1024:>10.1f}"
+                  f"{worker['shared'] / 1024:>12.1f}{worker['private'] / 1024:>13.1f}")
+
+        print(f"Total PSS for master + {len(worker_pids)} workers: {total_pss / 1024:.1f} MiB")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+import argparse
+import os
+import tempfile
+import time
+
+from src.storage import LocalStorage, download_blob, open_storage
+
+
+class ThrottledReader:
+
+    def __init__(self, blob_file, bytes_per_second):
+        self.blob_file = blob_file
+        self.bytes_per_second = bytes_per_second
+
+    def read(self, size=-1):
+        data = self.blob_file.read(size)
+        time.sleep(len(data) / self.bytes_per_second)
+        return data
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.blob_file.close()
+
+
+class ThrottledStorage(LocalStorage):
+    # Local stand-in for an object store: every request waits for its first byte and every
+    # connection is capped at the same bandwidth, which is what makes parallel ranges pay off
+
+    def __init__(self, root, latency_seconds, bytes_per_second):
+        super().__init__(root)
+        self.latency_seconds = latency_seconds
+        self.bytes_per_second = bytes_per_second
+
+    def open(self, info):
+        time.sleep(self.latency_seconds)
+        return ThrottledReader(super().open(info), self.bytes_per_second)
+
+    def read_range(self, info, start, end):
+        time.sleep(self.latency_seconds + (end - start) / self.bytes_per_second)
+        return super().read_range(info, start, end)
+
+
+def measure(storage, name, workdir, workers, slice_size):
+    path = os.path.join(workdir, "download.bin")
+    metadata_path = f"{path}.blob.json"
+    if os.path.exists(metadata_path):
+        os.remove(metadata_path)
+    start = time.perf_counter()
+    download_blob(storage, name, path, metadata_path, workers=workers, slice_size=slice_size,
+                  sliced_threshold=None if workers == 0 else 0)
+    return time.perf_counter() - start, os.path.getsize(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare a single-stream download with parallel ranged downloads")
+    parser.add_argument("--bucket", default=None,
+                        help="real bucket (or file:// dir) to download from instead of the throttled local store")
+    parser.add_argument("--blob", default=None, help="object to download from --bucket")
+    parser.add_argument("--size-mb", type=int, default=256, help="size of the generated local object")
+    parser.add_argument("--stream-mbps", type=float, default=40.0, help="bandwidth of one local connection, MB/s")
+    parser.add_argument("--latency-ms", type=float, default=30.0, help="time to first byte of a local request")
+    parser.add_argument("--slice-mb", type=int, default=8)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        if args.bucket:
+            storage, name = open_storage(args.bucket), args.blob
+        else:
+            name = "bookings.bin"
+            with open(os.path.join(workdir, name), "wb") as blob_file:
+                for _ in range(args.size_mb):
+                    blob_file.write(os.urandom(1 << 20))
+            storage = ThrottledStorage(workdir, args.latency_ms / 1000, args.stream_mbps * (1 << 20))
+
+        print(f"{'download':<24}{'seconds':>10}{'MB/s':>10}")
+        # workers 0 stands for the single streamed request
+        for workers in [0] + args.workers:
+            seconds, size = measure(storage, name, workdir, max(workers, 1), args.slice_mb << 20)
+            label = "single stream" if workers == 0 else f"{workers} threads x {args.slice_mb} MB"
+            print(f"{label:<24}{seconds:>10.2f}{size / (1 << 20) / seconds:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
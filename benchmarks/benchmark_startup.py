@@ -0,0 +1,74 @@
+import argparse
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+import numpy as np
+
+IMPORT_AND_WARM = "import application; print(application.startup_seconds)"
+
+
+def time_to_ready(port, workers, timeout=120):
+    # Wall time from launching serve.py until /readyz answers 200
+    start = time.perf_counter()
+    server = subprocess.Popen([sys.executable, "serve.py", "--workers", str(workers), "--bind", f"127.0.0.1:{port}"],
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                urllib.request.urlopen(f"http://127.0.0.1:{port}/readyz", timeout=1).read()
+                return time.perf_counter() - start
+            except (urllib.error.URLError, ConnectionError):
+                time.sleep(0.05)
+        raise RuntimeError(f"serve.py was not ready after {timeout}s")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def slowest_imports(top):
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import application"],
+                            capture_output=True, text=True)
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Top-level packages only, wherever they are first imported (lightgbm is pulled in by
+        # unpickling the model). application's own entry includes loading and warmup, so skip it
+        name = name.strip()
+        if "." not in name and not name.startswith("_") and name != "application":
+            rows.append((int(cumulative), name))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure serving cold start")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--port", type=int, default=8096)
+    args = parser.parse_args()
+
+    walls, internals = [], []
+    for _ in range(args.runs):
+        start = time.perf_counter()
+        output = subprocess.run([sys.executable, "-c", IMPORT_AND_WARM], capture_output=True, text=True, check=True)
+        walls.append(time.perf_counter() - start)
+        internals.append(float(output.stdout.strip().splitlines()[-1]))
+
+    print(f"python -c 'import application' (load + warmup), {args.runs} runs")
+    print(f"  process wall time:  median {np.median(walls):.2f}s  min {min(walls):.2f}s")
+    print(f"  imports to ready:   median {np.median(internals):.2f}s  min {min(internals):.2f}s")
+
+    ready = [time_to_ready(args.port, args.workers) for _ in range(max(1, args.runs // 2))]
+    print(f"serve.py with {args.workers} workers until /readyz: median {np.median(ready):.2f}s")
+
+    print("Slowest top-level imports (cumulative):")
+    for microseconds, name in slowest_imports(10):
+        print(f"  {microseconds / 1e6:6.3f}s  {name}")
+
+
+if __name__ == "__main__":
+    main()
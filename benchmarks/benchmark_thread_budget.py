@@ -0,0 +1,74 @@
+import argparse
+import os
+import threading
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from config.paths_config import MODEL_OUTPUT_PATH, PROCESSED_TEST_DATA_PATH
+from src.features import FEATURE_COLUMNS
+from src.predictor import score
+from src.prediction_executor import PredictionExecutor
+
+BATCH_SIZES = [1, 100, 10000]
+
+
+def run_clients(call, X, clients, duration):
+    # `clients` threads call call(X) back to back; returns rows/s and per-call latencies
+    latencies = [[] for _ in range(clients)]
+    deadline = time.perf_counter() + duration
+
+    def client(index):
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            call(X)
+            latencies[index].append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    flat = np.concatenate([np.array(values) for values in latencies])
+    return len(flat) * len(X) / elapsed, flat
+
+
+def main():
+    cpus = os.cpu_count()
+    parser = argparse.ArgumentParser(description="Throughput of LightGBM inference with and without a thread budget")
+    parser.add_argument("--clients", nargs="+", type=int, default=sorted({1, cpus, 4 * cpus}))
+    parser.add_argument("--batch-sizes", nargs="+", type=int, default=BATCH_SIZES)
+    parser.add_argument("--threads", nargs="+", type=int, default=sorted({1, max(1, cpus // 2), cpus}),
+                        help="fixed per-call thread counts to include in the curve")
+    parser.add_argument("--duration", type=float, default=3.0)
+    args = parser.parse_args()
+
+    model = joblib.load(MODEL_OUTPUT_PATH)
+    data = pd.read_parquet(PROCESSED_TEST_DATA_PATH, columns=FEATURE_COLUMNS).to_numpy(dtype=np.float64)
+    rows = np.resize(data, (max(args.batch_sizes), data.shape[1]))
+
+    print(f"{cpus} CPUs")
+    print(f"{'policy':<18}{'clients':>8}{'batch':>8}{'rows/s':>12}{'p50 ms':>10}{'p99 ms':>10}")
+    for batch_size in args.batch_sizes:
+        X = np.ascontiguousarray(rows[:batch_size])
+        for clients in args.clients:
+            policies = {"openmp default": lambda X: score(model, X)}
+            for threads in args.threads:
+                policies[f"{threads} thread(s)"] = lambda X, threads=threads: score(model, X, threads)
+            executor = PredictionExecutor()
+            policies["executor auto"] = lambda X: executor.score(model, X)
+
+            for name, call in policies.items():
+                throughput, latencies = run_clients(call, X, clients, args.duration)
+                p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+                print(f"{name:<18}{clients:>8}{batch_size:>8}{throughput:>12.0f}{p50:>10.2f}{p99:>10.2f}")
+            executor.shutdown()
+
+
+if __name__ == "__main__":
+    main()
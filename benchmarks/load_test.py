@@ -0,0 +1,304 @@
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import subprocess
+import time
+from collections import Counter
+from urllib.parse import urlsplit
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.benchmark_asgi_vs_wsgi import read_response
+from config.paths_config import PROCESSED_TEST_DATA_PATH
+from src.features import FEATURE_COLUMNS
+from src.metrics import Histogram, LATENCY_BUCKETS
+
+PERCENTILES = [50, 90, 99, 99.9]
+
+
+def load_replay(path):
+    # One request per line: a booking object posted to /predict, or {"path": ..., "body": ...}
+    requests = []
+    with open(path) as replay_file:
+        for line in replay_file:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if "body" in record:
+                requests.append((record.get("path", "/predict"), json.dumps(record["body"]).encode()))
+            else:
+                requests.append(("/predict", json.dumps(record).encode()))
+    if not requests:
+        raise ValueError(f"{path} does not contain any requests")
+    return requests
+
+
+def synthetic_requests(count, seed=0):
+    # Real bookings from the processed test split, in random order
+    bookings = pd.read_parquet(PROCESSED_TEST_DATA_PATH, columns=FEATURE_COLUMNS)
+    bookings = bookings.sample(n=min(count, len(bookings)), random_state=seed)
+    return [("/predict", json.dumps(booking).encode()) for booking in bookings.to_dict(orient="records")]
+
+
+def encode_request(host, path, body):
+    head = (f"POST {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n\r\n").encode()
+    return head + body
+
+
+class Recorder:
+    # Latency is measured twice: from when the request was actually sent (what a naive client
+    # sees) and from when the schedule intended to send it. A stalled server delays the sends
+    # that should have happened during the stall, so only the second one counts the time
+    # those requests spent waiting (coordinated omission).
+
+    def __init__(self, measure_from):
+        self.measure_from = measure_from
+        self.last_done = None
+        self.corrected = []
+        self.uncorrected = []
+        self.statuses = Counter()
+        self.errors = Counter()
+        # Requests the run ended on: scheduled but never sent (dropped) or still waiting for
+        # a response at the deadline (timeout). Not server errors, so not in the error rate.
+        self.unfinished = Counter()
+
+    def record(self, intended, sent, done, status):
+        if intended < self.measure_from:
+            return  # warmup
+        self.last_done = done if self.last_done is None else max(self.last_done, done)
+        self.statuses[status] += 1
+        if status == 200:
+            self.corrected.append(done - intended)
+            self.uncorrected.append(done - sent)
+        else:
+            self.errors[str(status)] += 1
+
+    def record_error(self, intended, kind):
+        if intended >= self.measure_from:
+            self.errors[kind] += 1
+
+    def record_unfinished(self, intended, kind):
+        if intended >= self.measure_from:
+            self.unfinished[kind] += 1
+
+    def measured_seconds(self):
+        # From the end of the warmup to the last response, not the planned duration: a server
+        # that can't keep up finishes fewer requests in the window, it doesn't stretch it
+        return self.last_done - self.measure_from if self.last_done is not None else 0.0
+
+
+class Connection:
+    # One keep-alive connection, reopened after errors or Connection: close
+
+    def __init__(self, host, port):
+        self.host, self.port = host, port
+        self.reader = self.writer = None
+
+    async def send(self, request):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        self.writer.write(request)
+        await self.writer.drain()
+        status, closed = await read_response(self.reader)
+        if closed:
+            self.close()
+        return status
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+
+async def send_one(connection, request, intended, recorder, deadline):
+    # Nothing is sent after the deadline (it counts as dropped) and a request still waiting
+    # for its response at the deadline counts as timed out
+    sent = time.perf_counter()
+    if sent >= deadline:
+        recorder.record_unfinished(intended, "dropped")
+        return
+    try:
+        status = await asyncio.wait_for(connection.send(request), deadline - sent)
+        recorder.record(intended, sent, time.perf_counter(), status)
+    except asyncio.TimeoutError:
+        connection.close()
+        recorder.record_unfinished(intended, "timeout")
+    except (OSError, asyncio.IncompleteReadError) as e:
+        connection.close()
+        recorder.record_error(intended, type(e).__name__)
+
+
+async def closed_loop(host, port, requests, connections, duration, warmup, rate=None):
+    # Every connection sends its next request as soon as the previous one is answered.
+    # With a rate, each connection is paced at rate / connections and latency is counted
+    # from its schedule, like wrk2.
+    start = time.perf_counter()
+    recorder = Recorder(start + warmup)
+    deadline = start + warmup + duration
+    interval = connections / rate if rate else None
+
+    async def worker(index):
+        connection = Connection(host, port)
+        next_send = start + (interval * index / connections if interval else 0.0)
+        while True:
+            now = time.perf_counter()
+            intended = next_send if interval else now
+            if intended >= deadline:
+                break
+            if intended > now:
+                await asyncio.sleep(intended - now)
+            await send_one(connection, next(requests), intended, recorder, deadline)
+            if interval:
+                next_send += interval
+        connection.close()
+
+    await asyncio.gather(*(worker(i) for i in range(connections)))
+    return recorder
+
+
+async def open_loop(host, port, requests, connections, duration, warmup, rate, poisson=False):
+    # Requests are released on a fixed (or Poisson) schedule no matter how the server keeps up.
+    # Up to `connections` are in flight; the rest wait in the queue and that wait is part of
+    # their corrected latency.
+    start = time.perf_counter()
+    recorder = Recorder(start + warmup)
+    deadline = start + warmup + duration
+    pending = asyncio.Queue()
+    rng = random.Random(0)
+
+    async def dispatcher():
+        intended = start
+        while intended < deadline:
+            now = time.perf_counter()
+            if intended > now:
+                await asyncio.sleep(intended - now)
+            pending.put_nowait((intended, next(requests)))
+            intended += rng.expovariate(rate) if poisson else 1.0 / rate
+        for _ in range(connections):
+            pending.put_nowait(None)
+
+    async def worker():
+        connection = Connection(host, port)
+        while (item := await pending.get()) is not None:
+            intended, request = item
+            await send_one(connection, request, intended, recorder, deadline)
+        connection.close()
+
+    await asyncio.gather(dispatcher(), *(worker() for _ in range(connections)))
+    return recorder
+
+
+def summarize(latencies):
+    if not latencies:
+        return {"count": 0}
+    histogram = Histogram(LATENCY_BUCKETS)
+    for latency in latencies:
+        histogram.observe_locked(latency)
+    values = np.asarray(latencies) * 1000
+    summary = {f"p{q}_ms": float(np.percentile(values, q)) for q in PERCENTILES}
+    summary.update({"count": len(values), "mean_ms": float(values.mean()), "max_ms": float(values.max()),
+                    "histogram_seconds": histogram.snapshot()["buckets"]})
+    return summary
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(url, mode, connections, duration, warmup=0.0, rate=None, poisson=False, requests=None):
+    target = urlsplit(url)
+    host, port = target.hostname, target.port or 80
+    prefix = target.path.rstrip("/")
+    requests = requests or synthetic_requests(10000)
+    encoded = itertools.cycle([encode_request(f"{host}:{port}", prefix + path, body) for path, body in requests])
+
+    if mode == "open":
+        if not rate:
+            raise ValueError("Open-loop mode needs a --rate")
+        recorder = asyncio.run(open_loop(host, port, encoded, connections, duration, warmup, rate, poisson))
+    else:
+        recorder = asyncio.run(closed_loop(host, port, encoded, connections, duration, warmup, rate))
+
+    completed = len(recorder.corrected)
+    errors = sum(recorder.errors.values())
+    return {
+        "target": url,
+        "mode": mode,
+        "connections": connections,
+        "target_rate": rate,
+        "arrivals": "poisson" if poisson else "uniform",
+        "duration_seconds": duration,
+        "warmup_seconds": warmup,
+        "git_commit": git_commit(),
+        "started_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "completed": completed,
+        "errors": dict(recorder.errors),
+        "unfinished": dict(recorder.unfinished),
+        "status_counts": {str(status): count for status, count in recorder.statuses.items()},
+        "measured_seconds": recorder.measured_seconds(),
+        "throughput_rps": completed / recorder.measured_seconds() if recorder.measured_seconds() else 0.0,
+        "error_rate": errors / (completed + errors) if completed + errors else 0.0,
+        "latency": {"corrected": summarize(recorder.corrected), "uncorrected": summarize(recorder.uncorrected)},
+    }
+
+
+def print_report(result, baseline=None):
+    unfinished = result.get("unfinished", {})
+    print(f"{result['mode']}-loop against {result['target']}: {result['throughput_rps']:.0f} req/s, "
+          f"error rate {result['error_rate']:.2%}, {unfinished.get('dropped', 0)} dropped, "
+          f"{unfinished.get('timeout', 0)} timed out")
+    columns = [f"p{q}_ms" for q in PERCENTILES] + ["max_ms"]
+    print(f"{'latency (ms)':<24}" + "".join(f"{column[:-3]:>10}" for column in columns))
+    rows = [("corrected", result["latency"]["corrected"]), ("uncorrected", result["latency"]["uncorrected"])]
+    if baseline is not None:
+        rows.append(("baseline corrected", baseline["latency"]["corrected"]))
+    for kind, summary in rows:
+        if summary["count"]:
+            print(f"{kind:<24}" + "".join(f"{summary[column]:>10.2f}" for column in columns))
+    if baseline is not None:
+        change = result["throughput_rps"] / baseline["throughput_rps"] - 1 if baseline["throughput_rps"] else 0.0
+        print(f"throughput vs baseline ({baseline.get('git_commit')}): {change:+.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay booking requests against the prediction service")
+    parser.add_argument("--url", default="http://127.0.0.1:8080")
+    parser.add_argument("--mode", choices=["open", "closed"], default="closed")
+    parser.add_argument("--connections", type=int, default=16, help="concurrent connections (max in flight)")
+    parser.add_argument("--rate", type=float, default=None,
+                        help="requests per second; required for open loop, paces each connection in closed loop")
+    parser.add_argument("--poisson", action="store_true", help="exponential inter-arrival times in open loop")
+    parser.add_argument("--duration", type=float, default=30.0, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=5.0, help="seconds sent but not measured")
+    parser.add_argument("--replay", default=None,
+                        help="JSONL file of recorded requests; defaults to synthetic bookings from the test split")
+    parser.add_argument("--output", default=None, help="write the results as JSON")
+    parser.add_argument("--baseline", default=None, help="results JSON of an earlier run to compare against")
+    args = parser.parse_args()
+
+    requests = load_replay(args.replay) if args.replay else synthetic_requests(10000)
+    result = run(args.url, args.mode, args.connections, args.duration, args.warmup, args.rate,
+                 args.poisson, requests)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+    print_report(result, baseline)
+
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(result, output_file, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,16 +4,28 @@ import os
 
 RAW_DIR = "artifacts/raw"
 RAW_FILE_PATH = os.path.join(RAW_DIR, "raw.csv")
-TRAIN_FILE_PATH = os.path.join(RAW_DIR, "train.csv")
-TEST_FILE_PATH = os.path.join(RAW_DIR, "test.csv")
+# Generation, size and checksums of the bucket object raw.csv was downloaded from
+RAW_METADATA_PATH = os.path.join(RAW_DIR, "raw.csv.blob.json")
+# Local copies of the objects matching bucket_file_pattern, concatenated into raw.csv
+RAW_PARTS_DIR = os.path.join(RAW_DIR, "parts")
+# Everything written between pipeline stages is zstd Parquet with an explicit schema (src/data_schema.py)
+TRAIN_FILE_PATH = os.path.join(RAW_DIR, "train.parquet")
+TEST_FILE_PATH = os.path.join(RAW_DIR, "test.parquet")
 
 CONFIG_PATH = "config/config.yaml"
 
 ################### Data Processing ###################
 
 PROCESSED_DIR = "artifacts/processed"
-PROCESSED_TRAIN_DATA_PATH = os.path.join(PROCESSED_DIR, "processed_train.csv")
-PROCESSED_TEST_DATA_PATH = os.path.join(PROCESSED_DIR, "processed_test.csv")
+PROCESSED_TRAIN_DATA_PATH = os.path.join(PROCESSED_DIR, "processed_train.parquet")
+PROCESSED_TEST_DATA_PATH = os.path.join(PROCESSED_DIR, "processed_test.parquet")
+# Preprocessed and balanced splits before feature selection, written by the pipeline DAG
+BALANCED_TRAIN_DATA_PATH = os.path.join(PROCESSED_DIR, "balanced_train.parquet")
+BALANCED_TEST_DATA_PATH = os.path.join(PROCESSED_DIR, "balanced_test.parquet")
 
 ##################### Model Training ###################
 MODEL_OUTPUT_PATH = "artifacts/models/lgbm_model.pkl"
+
+# Booster text model + manifest.json written next to the pickle, loaded by the serving apps
+SERVING_MODEL_DIR = "artifacts/models/serving"
+SERVING_MANIFEST_PATH = os.path.join(SERVING_MODEL_DIR, "manifest.json")
@@ -0,0 +1,129 @@
+import argparse
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from src.logger import get_logger
+from src.custom_exception import CustomException
+from src.features import FEATURE_COLUMNS
+from src.inference_engine import ENGINES
+from src.predictor import load_model, score
+from config.paths_config import SERVING_MANIFEST_PATH
+
+logger = get_logger(__name__)
+
+# Set in every worker process by init_worker, so the model is loaded once per process
+worker_model = None
+
+
+def init_worker(model_path, engine):
+    global worker_model
+    worker_model, _ = load_model(model_path, engine)
+
+
+def score_chunk(features):
+    # One OpenMP thread per process, the pool already uses every core
+    return score(worker_model, features, num_threads=1)
+
+
+def read_chunks(input_path, chunk_size, columns):
+    if input_path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+        parquet_file = pq.ParquetFile(input_path)
+        for batch in parquet_file.iter_batches(batch_size=chunk_size, columns=columns):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(input_path, chunksize=chunk_size, usecols=columns)
+
+
+class ChunkWriter:
+    # Appends scored chunks to a CSV or Parquet file, in the order they are written
+
+    def __init__(self, output_path):
+        self.output_path = output_path
+        self.parquet_writer = None
+        self.first_chunk = True
+
+    def write(self, df):
+        if self.output_path.endswith(".parquet"):
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self.parquet_writer is None:
+                self.parquet_writer = pq.ParquetWriter(self.output_path, table.schema, compression="zstd")
+            self.parquet_writer.write_table(table)
+        else:
+            df.to_csv(self.output_path, mode="w" if self.first_chunk else "a", header=self.first_chunk, index=False)
+        self.first_chunk = False
+
+    def close(self):
+        if self.parquet_writer is not None:
+            self.parquet_writer.close()
+
+
+def score_file(input_path, output_path, model_path=SERVING_MANIFEST_PATH, workers=None, chunk_size=100000,
+               id_column=None, engine="lightgbm"):
+    try:
+        workers = workers or os.cpu_count()
+        columns = FEATURE_COLUMNS + ([id_column] if id_column else [])
+        logger.info(f"Scoring {input_path} with {workers} workers in chunks of {chunk_size} rows")
+
+        writer = ChunkWriter(output_path)
+        total_rows = 0
+        start = time.perf_counter()
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                                 initargs=(model_path, engine)) as pool:
+            # Keep a bounded window of chunks in flight and write them back in input order
+            in_flight = deque()
+
+            def write_oldest():
+                chunk, future = in_flight.popleft()
+                labels, probabilities = future.result()
+                result = pd.DataFrame({"prediction": labels, "probability": probabilities})
+                if id_column:
+                    result.insert(0, id_column, chunk[id_column].to_numpy())
+                writer.write(result)
+                return len(result)
+
+            for chunk in read_chunks(input_path, chunk_size, columns):
+                features = np.ascontiguousarray(chunk[FEATURE_COLUMNS].to_numpy(dtype=np.float64))
+                in_flight.append((chunk, pool.submit(score_chunk, features)))
+                if len(in_flight) >= 2 * workers:
+                    total_rows += write_oldest()
+
+            while in_flight:
+                total_rows += write_oldest()
+
+        writer.close()
+        elapsed = time.perf_counter() - start
+        rows_per_second = total_rows / elapsed if elapsed > 0 else 0.0
+        logger.info(f"Scored {total_rows} rows in {elapsed:.2f}s ({rows_per_second:.0f} rows/s) into {output_path}")
+        return total_rows, elapsed
+
+    except Exception as e:
+        logger.error(f"Error occurred during batch scoring: {e}")
+        raise CustomException("Failed to score the booking file", e)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Score a CSV/Parquet file of label-encoded bookings with the trained model")
+    parser.add_argument("input_path", help="CSV or Parquet file containing the model feature columns")
+    parser.add_argument("output_path", help="CSV or Parquet file to write predictions to")
+    parser.add_argument("--model-path", default=SERVING_MANIFEST_PATH,
+                        help="serving manifest.json or a pickled LGBMClassifier")
+    parser.add_argument("--workers", type=int, default=None, help="number of processes, defaults to the CPU count")
+    parser.add_argument("--chunk-size", type=int, default=100000)
+    parser.add_argument("--id-column", default=None, help="column copied to the output to identify rows")
+    parser.add_argument("--engine", default="lightgbm", choices=ENGINES)
+    args = parser.parse_args()
+
+    rows, seconds = score_file(args.input_path, args.output_path, args.model_path, args.workers,
+                               args.chunk_size, args.id_column, args.engine)
+    rows_per_second = rows / seconds if seconds > 0 else 0.0
+    print(f"Scored {rows} rows in {seconds:.2f}s ({rows_per_second:.0f} rows/s)")
@@ -1,28 +1,116 @@
+import argparse
+import os
+from functools import partial
+
+from src.dag_executor import format_report, run_dag, select_groups
 from src.data_ingestion import DataIngestion
 from src.data_preprocessing import DataProcessor
+from src.logger import get_logger
 from src.model_training import ModelTraining
+from src.stage_cache import Stage
 from config.paths_config import *
 from utils.common_functions import read_yaml
 
+logger = get_logger(__name__)
 
-if __name__=='__main__':
-    ### 1. Data Ingestion ###
-    data_ingestion = DataIngestion(read_yaml(CONFIG_PATH))
-    data_ingestion.run()
+SHARED_CODE = ["utils/common_functions.py", "src/data_schema.py", "config/paths_config.py"]
+PROCESSING_CODE = ["src/data_preprocessing.py"] + SHARED_CODE
+PROCESSING_PACKAGES = ["pandas", "numpy", "pyarrow", "scikit-learn", "imbalanced-learn"]
 
-    ### 2. Data Processing ###
+
+def build_stages(config):
+    # The pipeline as a DAG: a stage runs once the stages producing its inputs are done, and
+    # an unchanged stage is skipped (src/stage_cache.py). group is the stage --from/--to select.
+    data_ingestion = DataIngestion(config)
     processor = DataProcessor(
             train_path=TRAIN_FILE_PATH,
             test_path=TEST_FILE_PATH,
             processed_dir=PROCESSED_DIR,
             config_path=CONFIG_PATH
         )
-    processor.process()
-
-    ### 3. Model Training ###
     model_trainer = ModelTraining(
             train_path=PROCESSED_TRAIN_DATA_PATH,
             test_path=PROCESSED_TEST_DATA_PATH,
             model_output_path=MODEL_OUTPUT_PATH
         )
-    model_trainer.run()
\ No newline at end of file
+
+    return [
+        ### 1. Data Ingestion ###
+        # The bucket file is fetched every run; the split only reruns when its contents changed
+        Stage("download", data_ingestion.download_csv_from_gcp,
+              inputs=[], outputs=[RAW_FILE_PATH], group="ingestion", cached=False),
+        Stage("split", data_ingestion.split_data,
+              inputs=[RAW_FILE_PATH],
+              outputs=[TRAIN_FILE_PATH, TEST_FILE_PATH],
+              code=["src/data_ingestion.py"] + SHARED_CODE,
+              # How the file is transferred doesn't change the split
+              config={key: value for key, value in config["data_ingestion"].items() if key != "download"},
+              packages=["pandas", "pyarrow", "scikit-learn"],
+              group="ingestion"),
+
+        ### 2. Data Processing ###
+        Stage("prepare_train", partial(processor.prepare_split, TRAIN_FILE_PATH, BALANCED_TRAIN_DATA_PATH),
+              inputs=[TRAIN_FILE_PATH],
+              outputs=[BALANCED_TRAIN_DATA_PATH],
+              code=PROCESSING_CODE,
+              config=config["data_processing"],
+              packages=PROCESSING_PACKAGES,
+              group="processing"),
+        Stage("prepare_test", partial(processor.prepare_split, TEST_FILE_PATH, BALANCED_TEST_DATA_PATH),
+              inputs=[TEST_FILE_PATH],
+              outputs=[BALANCED_TEST_DATA_PATH],
+              code=PROCESSING_CODE,
+              config=config["data_processing"],
+              packages=PROCESSING_PACKAGES,
+              group="processing"),
+        Stage("select_features",
+              partial(processor.select_and_save, BALANCED_TRAIN_DATA_PATH, BALANCED_TEST_DATA_PATH),
+              inputs=[BALANCED_TRAIN_DATA_PATH, BALANCED_TEST_DATA_PATH],
+              outputs=[PROCESSED_TRAIN_DATA_PATH, PROCESSED_TEST_DATA_PATH],
+              code=PROCESSING_CODE,
+              config=config["data_processing"],
+              packages=PROCESSING_PACKAGES,
+              group="processing"),
+
+        ### 3. Model Training ###
+        Stage("training", model_trainer.run,
+              inputs=[PROCESSED_TRAIN_DATA_PATH, PROCESSED_TEST_DATA_PATH],
+              outputs=[MODEL_OUTPUT_PATH] + [os.path.join(SERVING_MODEL_DIR, name)
+                                             for name in ("model.txt", "trees.bin", "manifest.json")],
+              code=["src/model_training.py", "config/model_params.py", "src/serving_artifact.py",
+                    "src/tree_engine.py"] + SHARED_CODE,
+              packages=["pandas", "scikit-learn", "lightgbm"]),
+    ]
+
+
+def plan(stages, start=None, end=None, force=()):
+    # The stages --from/--to select and the tasks --force reruns; forcing a stage forces every task in it
+    names = {stage.name for stage in stages}
+    groups = {stage.group for stage in stages}
+    unknown = set(force) - names - groups - {"all"}
+    if unknown:
+        raise ValueError(f"Unknown stages {sorted(unknown)}, expected one of {sorted(names | groups)} or all")
+    selected = select_groups(stages, start, end)
+    return selected, set(force) | {stage.name for stage in stages if stage.group in force}
+
+
+if __name__=='__main__':
+    parser = argparse.ArgumentParser(description="Run the training pipeline, skipping stages whose inputs are unchanged")
+    parser.add_argument("--from", dest="start", default=None, metavar="STAGE",
+                        help="first stage to run (ingestion, processing or training); earlier outputs must exist")
+    parser.add_argument("--to", dest="end", default=None, metavar="STAGE", help="last stage to run")
+    parser.add_argument("--force", nargs="+", default=[], metavar="STAGE",
+                        help="rerun these stages or tasks even if they are up to date, or all")
+    parser.add_argument("--workers", type=int, default=None, help="processes running tasks, defaults to the CPU count")
+    args = parser.parse_args()
+
+    stages = build_stages(read_yaml(CONFIG_PATH))
+    try:
+        selected, force = plan(stages, args.start, args.end, args.force)
+    except ValueError as e:
+        parser.error(str(e))
+
+    report = run_dag(stages, workers=args.workers, force=force, selected=selected)
+    for line in format_report(report):
+        logger.info(line)
+        print(line)
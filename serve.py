@@ -0,0 +1,72 @@
+import argparse
+import gc
+import multiprocessing
+import os
+
+from gunicorn.app.base import BaseApplication
+
+from config.paths_config import CONFIG_PATH
+from src.logger import get_logger
+from utils.common_functions import read_yaml
+
+logger = get_logger(__name__)
+
+
+def pre_fork(server, worker):
+    # Move everything allocated so far (the model included) out of the GC's reach, so
+    # collections in the workers do not write to those pages and break copy-on-write sharing
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    import application
+    application.start_background_threads()
+    logger.info(f"Worker {worker.pid} started")
+
+
+class PreforkServer(BaseApplication):
+    # Gunicorn master that imports application.py (and loads the model) once, then forks
+    # the workers. Dead workers are restarted by the gunicorn arbiter.
+
+    def __init__(self, options):
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        os.environ["PREFORK_MASTER"] = "1"
+        # Each worker's prediction executor takes its share of the host's thread budget
+        os.environ["SERVING_PROCESSES"] = str(self.options["workers"])
+        from application import app
+        return app
+
+
+def build_options(prefork_config):
+    workers = prefork_config["workers"] or multiprocessing.cpu_count()
+    return {
+        "bind": prefork_config["bind"],
+        "workers": workers,
+        "threads": prefork_config["threads"],
+        "worker_class": "gthread",
+        "timeout": prefork_config["timeout_seconds"],
+        "max_requests": prefork_config["max_requests"],
+        "preload_app": True,
+        "pre_fork": pre_fork,
+        "post_fork": post_fork,
+    }
+
+
+if __name__ == "__main__":
+    prefork_config = read_yaml(CONFIG_PATH)["serving"]["prefork"]
+
+    parser = argparse.ArgumentParser(description="Prefork production server for application.py")
+    parser.add_argument("--workers", type=int, default=prefork_config["workers"])
+    parser.add_argument("--bind", default=prefork_config["bind"])
+    args = parser.parse_args()
+
+    options = build_options({**prefork_config, "workers": args.workers, "bind": args.bind})
+    logger.info(f"Starting prefork server with {options['workers']} workers on {options['bind']}")
+    PreforkServer(options).run()
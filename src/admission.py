@@ -0,0 +1,143 @@
+import json
+import threading
+import time
+
+from werkzeug.wsgi import ClosingIterator
+
+SHED_QUEUE_FULL = "queue_full"
+SHED_DEADLINE = "deadline"
+
+SLOT_ENVIRON_KEY = "hotel_reservation.admission_slot"
+
+
+def upstream_queue_seconds(header_value, now=None):
+    # X-Request-Start as set by nginx/HAProxy/Heroku: "t=<seconds>.<millis>", "t=<microseconds>"
+    # or a bare timestamp. Returns how long the request already waited before reaching us.
+    if not header_value:
+        return 0.0
+    try:
+        stamp = float(header_value.strip().removeprefix("t="))
+    except ValueError:
+        return 0.0
+    # Scale microseconds or milliseconds since the epoch down to seconds
+    while stamp > 1e11:
+        stamp /= 1000.0
+    now = time.time() if now is None else now
+    return max(0.0, now - stamp)
+
+
+class AdmissionController:
+    # Bounds the number of requests being worked on at once.
+    #
+    # Up to max_in_flight requests run; up to max_queue more wait for a slot, each for at most
+    # queue_timeout_seconds since it arrived. Anything beyond that is rejected straight away,
+    # so under overload the server answers quickly with a 503 instead of letting every
+    # request's latency grow until clients time out.
+
+    def __init__(self, max_in_flight, max_queue, queue_timeout_seconds):
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout_seconds = queue_timeout_seconds
+
+        self.in_flight = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.shed = {SHED_QUEUE_FULL: 0, SHED_DEADLINE: 0}
+        self._condition = threading.Condition()
+
+    def acquire(self, already_waited=0.0):
+        # Returns None when admitted (release() must follow), otherwise the reason it was shed
+        with self._condition:
+            if self.in_flight < self.max_in_flight and self.waiting == 0:
+                self.in_flight += 1
+                self.admitted += 1
+                return None
+
+            remaining = self.queue_timeout_seconds - already_waited
+            if self.waiting >= self.max_queue or remaining <= 0:
+                reason = SHED_QUEUE_FULL if remaining > 0 else SHED_DEADLINE
+                self.shed[reason] += 1
+                return reason
+
+            self.waiting += 1
+            try:
+                deadline = time.monotonic() + remaining
+                while self.in_flight >= self.max_in_flight:
+                    timeout = deadline - time.monotonic()
+                    if timeout <= 0 or not self._condition.wait(timeout):
+                        if self.in_flight < self.max_in_flight:
+                            break
+                        self.shed[SHED_DEADLINE] += 1
+                        return SHED_DEADLINE
+            finally:
+                self.waiting -= 1
+
+            self.in_flight += 1
+            self.admitted += 1
+            return None
+
+    def release(self):
+        with self._condition:
+            self.in_flight -= 1
+            self._condition.notify()
+
+    def stats(self):
+        with self._condition:
+            return {
+                "max_in_flight": self.max_in_flight,
+                "max_queue": self.max_queue,
+                "queue_timeout_seconds": self.queue_timeout_seconds,
+                "in_flight": self.in_flight,
+                "queue_depth": self.waiting,
+                "admitted": self.admitted,
+                "shed": dict(self.shed),
+            }
+
+
+class AdmissionSlot:
+    # Released exactly once, by whichever comes first: the framework's request teardown or
+    # the server closing the response. Streamed responses set held_until_close, because
+    # their work happens after the view returned and teardown ran.
+
+    __slots__ = ("controller", "held", "held_until_close")
+
+    def __init__(self, controller):
+        self.controller = controller
+        self.held = True
+        self.held_until_close = False
+
+    def release(self):
+        if self.held:
+            self.held = False
+            self.controller.release()
+
+
+class AdmissionMiddleware:
+    # WSGI wrapper that runs admission before the framework sees the request, so a shed
+    # request costs a header check and a 503, not routing, context setup and body parsing.
+    # The admitted request's slot is stored in environ[SLOT_ENVIRON_KEY].
+
+    def __init__(self, wsgi_app, controller, paths, retry_after_seconds=1):
+        self.wsgi_app = wsgi_app
+        self.controller = controller
+        self.paths = frozenset(paths)
+        self.retry_after = str(retry_after_seconds)
+
+    def __call__(self, environ, start_response):
+        if environ.get("REQUEST_METHOD") != "POST" or environ.get("PATH_INFO") not in self.paths:
+            return self.wsgi_app(environ, start_response)
+
+        shed_reason = self.controller.acquire(upstream_queue_seconds(environ.get("HTTP_X_REQUEST_START")))
+        if shed_reason is not None:
+            body = json.dumps({"error": "Server is overloaded, please retry", "reason": shed_reason}).encode()
+            start_response("503 Service Unavailable", [("Content-Type", "application/json"),
+                                                       ("Content-Length", str(len(body))),
+                                                       ("Retry-After", self.retry_after)])
+            return [body]
+
+        slot = environ[SLOT_ENVIRON_KEY] = AdmissionSlot(self.controller)
+        try:
+            return ClosingIterator(self.wsgi_app(environ, start_response), slot.release)
+        except BaseException:
+            slot.release()
+            raise
@@ -0,0 +1,81 @@
+import struct
+
+import numpy as np
+
+from src.features import FEATURE_COLUMNS, NUM_FEATURES
+
+# Raw float32 protocol, all little-endian:
+#   header: magic b"HRPF", uint16 schema version, uint16 number of columns, uint32 number of rows, uint32 reserved
+#   body:   rows x columns float32 values in row-major order
+# Requests carry the feature matrix in FEATURE_COLUMNS order, responses one column of probabilities.
+MAGIC = b"HRPF"
+SCHEMA_VERSION = 1
+HEADER = struct.Struct("<4sHHII")
+
+FLOAT32_CONTENT_TYPE = "application/octet-stream"
+ARROW_CONTENT_TYPE = "application/vnd.apache.arrow.stream"
+
+
+def decode_float32_matrix(body):
+    # Returns a read-only view over body, no copy is made
+    if len(body) < HEADER.size:
+        raise ValueError("Body is shorter than the header")
+
+    magic, schema_version, n_columns, n_rows, _ = HEADER.unpack_from(body)
+    if magic != MAGIC:
+        raise ValueError("Body does not start with the expected magic bytes")
+    if schema_version != SCHEMA_VERSION:
+        raise ValueError(f"Unsupported schema version {schema_version}, expected {SCHEMA_VERSION}")
+    if n_columns != NUM_FEATURES:
+        raise ValueError(f"Expected {NUM_FEATURES} columns in the order {FEATURE_COLUMNS}, got {n_columns}")
+
+    expected_size = HEADER.size + n_rows * n_columns * 4
+    if len(body) != expected_size:
+        raise ValueError(f"Body has {len(body)} bytes, header announces {expected_size}")
+
+    features = np.frombuffer(body, dtype="<f4", count=n_rows * n_columns, offset=HEADER.size)
+    return features.reshape(n_rows, n_columns)
+
+
+def encode_float32_matrix(matrix):
+    matrix = np.ascontiguousarray(matrix, dtype="<f4")
+    if matrix.ndim == 1:
+        matrix = matrix.reshape(-1, 1)
+    header = HEADER.pack(MAGIC, SCHEMA_VERSION, matrix.shape[1], matrix.shape[0], 0)
+    return header + matrix.tobytes()
+
+
+def decode_arrow_stream(body):
+    # Each feature column is read zero-copy from the IPC buffer; they are stacked once into a row-major matrix
+    import pyarrow as pa
+
+    reader = pa.ipc.open_stream(pa.py_buffer(body))
+    metadata = reader.schema.metadata or {}
+    schema_version = int(metadata.get(b"schema_version", SCHEMA_VERSION))
+    if schema_version != SCHEMA_VERSION:
+        raise ValueError(f"Unsupported schema version {schema_version}, expected {SCHEMA_VERSION}")
+
+    missing = [column for column in FEATURE_COLUMNS if column not in reader.schema.names]
+    if missing:
+        raise ValueError(f"Arrow stream is missing the columns {missing}")
+
+    table = reader.read_all().combine_chunks()
+    columns = []
+    for name in FEATURE_COLUMNS:
+        column = table.column(name)
+        if column.null_count:
+            raise ValueError(f"Column {name} contains nulls")
+        columns.append(column.chunk(0).to_numpy(zero_copy_only=True) if column.num_chunks
+                       else np.empty(0))
+    return np.column_stack(columns).astype(np.float64, copy=False)
+
+
+def encode_arrow_probabilities(probabilities):
+    import pyarrow as pa
+
+    schema = pa.schema([("probability", pa.float64())], metadata={"schema_version": str(SCHEMA_VERSION)})
+    table = pa.table({"probability": probabilities}, schema=schema)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
@@ -0,0 +1,147 @@
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from src.logger import get_logger
+from src.custom_exception import CustomException
+
+logger = get_logger(__name__)
+
+RAN = "ran"
+CACHED = "cached"
+
+
+def execute(run):
+    # Runs in a pool worker. CustomException can't be rebuilt from a pickle in the parent,
+    # so a failure comes back as its message instead of as the exception.
+    started_at, start = time.time(), time.perf_counter()
+    try:
+        run()
+    except Exception as e:
+        return started_at, time.perf_counter() - start, f"{type(e).__name__}: {e}"
+    return started_at, time.perf_counter() - start, None
+
+
+def dependencies(stages):
+    # A stage depends on whichever stages produce its inputs
+    producers = {}
+    for stage in stages:
+        for output in stage.outputs:
+            if output in producers:
+                raise ValueError(f"{output} is produced by both {producers[output].name} and {stage.name}")
+            producers[output] = stage
+    return {stage.name: {producers[path].name for path in stage.inputs if path in producers} for stage in stages}
+
+
+def topological_order(stages, deps):
+    order, done = [], set()
+    remaining = [stage.name for stage in stages]
+    while remaining:
+        ready = [name for name in remaining if deps[name] <= done]
+        if not ready:
+            raise ValueError(f"The stages {remaining} depend on each other in a cycle")
+        order += ready
+        done.update(ready)
+        remaining = [name for name in remaining if name not in done]
+    return order
+
+
+def select_groups(stages, start=None, end=None):
+    # Names of the stages whose group lies between start and end, in pipeline order
+    groups = list(dict.fromkeys(stage.group for stage in stages))
+    for group in (start, end):
+        if group is not None and group not in groups:
+            raise ValueError(f"Unknown stage {group}, expected one of {groups}")
+    first = groups.index(start) if start else 0
+    last = groups.index(end) if end else len(groups) - 1
+    if first > last:
+        raise ValueError(f"Stage {start} comes after {end}")
+    return {stage.name for stage in stages if first <= groups.index(stage.group) <= last}
+
+
+def critical_path(timings, deps):
+    # Longest chain of dependent stages by duration; nothing can finish before it does
+    finish, previous = {}, {}
+    for name in timings:
+        upstream = [dep for dep in deps[name] if dep in timings]
+        before = max(upstream, key=lambda dep: finish[dep], default=None)
+        finish[name] = timings[name]["duration_seconds"] + (finish[before] if before else 0.0)
+        previous[name] = before
+
+    name = max(finish, key=finish.get, default=None)
+    path = []
+    while name is not None:
+        path.append(name)
+        name = previous[name]
+    return path[::-1], finish[path[0]] if path else 0.0
+
+
+def run_dag(stages, workers=None, force=(), selected=None):
+    # Runs the selected stages (all by default) as soon as their inputs are ready, on a process
+    # pool. Cache checks and records happen here in the parent. Returns the timing report.
+    try:
+        deps = dependencies(stages)
+        order = topological_order(stages, deps)
+        by_name = {stage.name: stage for stage in stages}
+        selected = set(order) if selected is None else set(selected)
+        pending = [name for name in order if name in selected]
+        timings = {}
+        start_time, start = time.time(), time.perf_counter()
+
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+            running = {}
+            while pending or running:
+                # Stages outside the selection count as done; their outputs must already exist
+                done = set(timings) | (set(order) - selected)
+                for name in [name for name in pending if deps[name] <= done]:
+                    pending.remove(name)
+                    stage = by_name[name]
+                    fingerprint, components, reasons = stage.check(force="all" in force or name in force)
+                    if not reasons:
+                        logger.info(f"Stage {name} is up to date ({fingerprint[:12]}), reusing its outputs")
+                        timings[name] = {"status": CACHED,
+                                         "started_seconds": time.perf_counter() - start, "duration_seconds": 0.0}
+                        break  # its dependents may be ready now
+                    logger.info(f"Running stage {name}: {'; '.join(reasons)}")
+                    stage.invalidate()
+                    future = pool.submit(execute, stage.run)
+                    running[future] = (stage, fingerprint, components)
+                else:
+                    if not running:
+                        continue
+                    finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        stage, fingerprint, components = running.pop(future)
+                        started_at, duration, error = future.result()
+                        if error is not None:
+                            for other in running:
+                                other.cancel()
+                            raise RuntimeError(f"Stage {stage.name} failed: {error}")
+                        stage.save_record(fingerprint, components, duration)
+                        timings[stage.name] = {"status": RAN, "started_seconds": started_at - start_time,
+                                               "duration_seconds": duration}
+                        logger.info(f"Stage {stage.name} completed in {duration:.1f}s")
+
+        wall = time.perf_counter() - start
+        path, path_seconds = critical_path({name: timings[name] for name in order if name in timings}, deps)
+        return {
+            "stages": {name: timings[name] for name in order if name in timings},
+            "wall_seconds": wall,
+            "total_stage_seconds": sum(timing["duration_seconds"] for timing in timings.values()),
+            "critical_path": path,
+            "critical_path_seconds": path_seconds,
+        }
+
+    except Exception as e:
+        logger.error(f"Error occurred while running the pipeline: {e}")
+        raise CustomException("Pipeline failed", e)
+
+
+def format_report(report):
+    lines = [f"{'stage':<20}{'status':>8}{'start s':>10}{'duration s':>12}"]
+    for name, timing in report["stages"].items():
+        lines.append(f"{name:<20}{timing['status']:>8}{timing['started_seconds']:>10.2f}"
+                     f"{timing['duration_seconds']:>12.2f}")
+    lines.append(f"wall {report['wall_seconds']:.2f}s, stage time {report['total_stage_seconds']:.2f}s")
+    lines.append(f"critical path ({report['critical_path_seconds']:.2f}s): {' -> '.join(report['critical_path'])}")
+    return lines
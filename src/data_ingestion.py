@@ -1,37 +1,55 @@
 import os
 import pandas as pd
 import numpy as np
-from google.cloud import storage
+import pyarrow as pa
 from sklearn.model_selection import train_test_split
 from src.logger import get_logger
 from src.custom_exception import CustomException
 from config.paths_config import *
-from utils.common_functions import read_yaml
-from google.oauth2 import service_account
+from src.data_schema import RAW_SCHEMA
+from src.storage import download_blob, download_matching, open_storage
+from utils.common_functions import read_yaml, save_parquet
 
 logger = get_logger(__name__)
 
 class DataIngestion:
-    def __init__(self, config):
+    def __init__(self, config, storage=None):
         self.config = config["data_ingestion"]
         self.bucket_name = self.config["bucket_name"]
         self.file_name = self.config["bucket_file_name"]
+        self.file_pattern = self.config["bucket_file_pattern"]
         self.train_test_ratio = self.config["train_ratio"]
+        self.storage = storage
+
+        download = self.config["download"]
+        self.download_workers = download["workers"]
+        self.slice_size = download["slice_size_mb"] << 20
+        self.sliced_threshold = download["sliced_threshold_mb"] << 20
+        self.parallel_files = download["parallel_files"]
+        self.max_connections = download["max_connections"]
 
         os.makedirs(RAW_DIR, exist_ok=True)
 
-        logger.info(f"Data Ingestion started with {self.bucket_name} and the file name {self.file_name}")
+        logger.info(f"Data Ingestion started with {self.bucket_name} and the file name {self.file_pattern or self.file_name}")
 
     
     def download_csv_from_gcp(self):
         try:
-            client = storage.Client()
-            bucket = client.bucket(self.bucket_name)
-            blob = bucket.blob(self.file_name)
-
-            blob.download_to_filename(RAW_FILE_PATH)
-
-            logger.info(f"CSV file is successfully downloaded to {RAW_FILE_PATH}")
+            # Skipped when raw.csv already holds the blob's current generation (see src/storage.py)
+            if self.storage is None:
+                self.storage = open_storage(self.bucket_name, self.max_connections)
+            options = {"workers": self.download_workers, "slice_size": self.slice_size,
+                       "sliced_threshold": self.sliced_threshold}
+
+            if self.file_pattern:
+                report = download_matching(self.storage, self.file_pattern, RAW_FILE_PATH, RAW_METADATA_PATH,
+                                           RAW_PARTS_DIR, self.parallel_files, **options)
+                downloaded = report["downloaded_files"] > 0
+            else:
+                downloaded = download_blob(self.storage, self.file_name, RAW_FILE_PATH, RAW_METADATA_PATH, **options)
+
+            if downloaded:
+                logger.info(f"CSV file is successfully downloaded to {RAW_FILE_PATH}")
 
         except Exception as e:
             logger.error(f"Error while downloading the csv file: {e}")
@@ -41,12 +59,15 @@ class DataIngestion:
     def split_data(self):
         try:
             logger.info("Splitting the data into train and test sets")
-            data = pd.read_csv(RAW_FILE_PATH) # Read the csv file into a pandas dataframe
+            # Parse the downloaded csv with the declared column types
+            dtypes = {field.name: "str" if field.type == pa.string() else field.type.to_pandas_dtype()
+                      for field in RAW_SCHEMA}
+            data = pd.read_csv(RAW_FILE_PATH, dtype=dtypes)
 
             train_data, test_data = train_test_split(data, test_size=1-self.train_test_ratio, random_state=42)
 
-            train_data.to_csv(TRAIN_FILE_PATH)
-            test_data.to_csv(TEST_FILE_PATH)
+            save_parquet(train_data, TRAIN_FILE_PATH, RAW_SCHEMA)
+            save_parquet(test_data, TEST_FILE_PATH, RAW_SCHEMA)
 
             logger.info(f"Train data saved to {TRAIN_FILE_PATH}")
             logger.info(f"Test data saved to {TEST_FILE_PATH}")
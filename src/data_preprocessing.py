@@ -4,10 +4,10 @@ import numpy as np
 from src.logger import get_logger
 from src.custom_exception import CustomException
 from config.paths_config import *
-from utils.common_functions import read_yaml, load_data
+from src.data_schema import processed_schema
+from utils.common_functions import read_yaml, load_data, save_parquet
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.preprocessing import LabelEncoder
-from imblearn.over_sampling import SMOTE
 
 
 logger = get_logger(__name__)
@@ -20,6 +20,8 @@ class DataProcessor:
         self.processed_dir = processed_dir
         self.config = read_yaml(config_path)
 
+        self.cat_cols = self.config['data_processing']['categorical_columns']
+        self.num_cols = self.config['data_processing']['numerical_columns']
 
         if not os.path.exists(self.processed_dir):
             os.makedirs(self.processed_dir, exist_ok=True)
@@ -32,11 +34,11 @@ class DataProcessor:
 
             # Drop unnecessary columns
             logger.info("Dropping unnecessary columns")
-            df.drop(columns=["Booking_ID"], inplace=True)
+            df.drop(columns=["Booking_ID"], inplace=True, errors="ignore")
             df.drop_duplicates(inplace=True)
 
-            cat_cols = self.config['data_processing']['categorical_columns']
-            num_cols = self.config['data_processing']['numerical_columns']
+            cat_cols = self.cat_cols
+            num_cols = self.num_cols
 
             logger.info("Applying Label Encoding")
             label_encoder = LabelEncoder()
@@ -73,10 +75,11 @@ class DataProcessor:
     def balanced_data(self, df):
         try:
             logger.info("Balancing the data using SMOTE")
+            from imblearn.over_sampling import SMOTE  # slow import, only needed for this step
             X = df.drop(columns=["booking_status"])
             y = df["booking_status"]
             
-            smote = SMOTE()
+            smote = SMOTE(random_state=42)  # seeded so an unchanged rerun writes identical files
             X_resampled, y_resampled = smote.fit_resample(X, y)
 
             balanced_df = pd.DataFrame(X_resampled, columns=X.columns)
@@ -121,37 +124,57 @@ class DataProcessor:
     def save_data(self, df, file_path):
         try:
             logger.info(f"Saving processed data to {file_path}")
-            df.to_csv(file_path, index=False)
+            save_parquet(df, file_path, processed_schema(df, self.cat_cols))
             logger.info("Data saved successfully")
         except Exception as e:
             logger.error(f"Error occurred while saving the data: {e}")
             raise CustomException("Failed to save the processed data", e)
         
-    def process(self):
+    def prepare_split(self, input_path, output_path=None):
+        # Preprocessing and balancing of one split; train and test are independent until feature selection
         try:
-            logger.info("Loading data from RAW directory")
+            # Booking_ID and anything not listed in the config is never read
+            df = load_data(input_path, self.cat_cols + self.num_cols)
+            df = self.balanced_data(self.preprocess_data(df))
+            if output_path is not None:
+                self.save_data(df, output_path)
+            return df
 
-            train_df = load_data(self.train_path)
-            test_df = load_data(self.test_path)
+        except Exception as e:
+            logger.error(f"Error occurred while preparing {input_path}: {e}")
+            raise CustomException("Failed to prepare the split", e)
 
-            train_df = self.preprocess_data(train_df)
-            test_df = self.preprocess_data(test_df)
+    def finalize(self, train_df, test_df):
+        train_df = self.select_feature(train_df)
+        # The test split keeps the features selected on the train split
+        test_df = test_df[train_df.columns]
+
+        self.save_data(train_df, PROCESSED_TRAIN_DATA_PATH)
+        self.save_data(test_df, PROCESSED_TEST_DATA_PATH)
+
+    def select_and_save(self, balanced_train_path, balanced_test_path):
+        # Second half of process() for the pipeline DAG, reading the splits prepare_split saved
+        try:
+            self.finalize(load_data(balanced_train_path), load_data(balanced_test_path))
 
-            train_df = self.balanced_data(train_df)
-            test_df = self.balanced_data(test_df)
+        except Exception as e:
+            logger.error(f"Error occurred during feature selection: {e}")
+            raise CustomException("Failed to select and save the features", e)
 
-            train_df = self.select_feature(train_df)
-            test_df = train_df[train_df.columns]
+    def process(self):
+        try:
+            logger.info("Loading data from RAW directory")
 
-            self.save_data(train_df, PROCESSED_TRAIN_DATA_PATH)
-            self.save_data(test_df, PROCESSED_TEST_DATA_PATH)
+            train_df = self.prepare_split(self.train_path)
+            test_df = self.prepare_split(self.test_path)
+            self.finalize(train_df, test_df)
 
             logger.info("Data processing completed successfully")
 
         except Exception as e:
             logger.error(f"Error occurred during data processing: {e}")
             raise CustomException("Failed to process the data", e)
-        
+
 
 if __name__ == "__main__":
     try:
@@ -0,0 +1,46 @@
+import pandas as pd
+import pyarrow as pa
+
+# Columns of the bookings file in the bucket, with the types every later stage relies on.
+# train/test splits are stored with exactly this schema (no index column).
+RAW_SCHEMA = pa.schema([
+    ("Booking_ID", pa.string()),
+    ("no_of_adults", pa.int64()),
+    ("no_of_children", pa.int64()),
+    ("no_of_weekend_nights", pa.int64()),
+    ("no_of_week_nights", pa.int64()),
+    ("type_of_meal_plan", pa.string()),
+    ("required_car_parking_space", pa.int64()),
+    ("room_type_reserved", pa.string()),
+    ("lead_time", pa.int64()),
+    ("arrival_year", pa.int64()),
+    ("arrival_month", pa.int64()),
+    ("arrival_date", pa.int64()),
+    ("market_segment_type", pa.string()),
+    ("repeated_guest", pa.int64()),
+    ("no_of_previous_cancellations", pa.int64()),
+    ("no_of_previous_bookings_not_canceled", pa.int64()),
+    ("avg_price_per_room", pa.float64()),
+    ("no_of_special_requests", pa.int64()),
+    ("booking_status", pa.string()),
+])
+
+
+def processed_schema(df, categorical_columns):
+    # Label encoded columns are integer codes. Numerical columns keep their integer type unless
+    # preprocessing made them fractional (avg_price_per_room, log-transformed skewed columns).
+    fields = []
+    for column in df.columns:
+        if column not in categorical_columns and pd.api.types.is_float_dtype(df[column]):
+            fields.append((column, pa.float64()))
+        else:
+            fields.append((column, pa.int64()))
+    return pa.schema(fields)
+
+
+def select_schema(schema, columns):
+    # Schema restricted to columns, in their order; fails on a column with no declared type
+    missing = [column for column in columns if schema.get_field_index(column) < 0]
+    if missing:
+        raise ValueError(f"No type declared for the columns {missing}")
+    return pa.schema([schema.field(column) for column in columns])
@@ -0,0 +1,92 @@
+import threading
+
+import numpy as np
+
+# Order of the columns the model was trained on (see artifacts/processed/*.parquet)
+FEATURE_COLUMNS = [
+    "lead_time",
+    "no_of_special_requests",
+    "avg_price_per_room",
+    "arrival_month",
+    "arrival_date",
+    "market_segment_type",
+    "no_of_week_nights",
+    "no_of_weekend_nights",
+    "type_of_meal_plan",
+]
+
+FLOAT_FEATURES = {"avg_price_per_room"}
+
+NUM_FEATURES = len(FEATURE_COLUMNS)
+
+
+def build_feature_row(data):
+    # data is any mapping with the feature names as keys (request.form, a JSON object, ...)
+    return [
+        float(data[column]) if column in FLOAT_FEATURES else int(data[column])
+        for column in FEATURE_COLUMNS
+    ]
+
+
+def build_feature_matrix(records):
+    # records is a list of JSON objects keyed by feature name, or a list of
+    # rows already in FEATURE_COLUMNS order. Returns one contiguous float64 matrix.
+    if not isinstance(records, list) or len(records) == 0:
+        raise ValueError("bookings must be a non-empty list")
+
+    if isinstance(records[0], dict):
+        try:
+            rows = [[record[column] for column in FEATURE_COLUMNS] for record in records]
+        except KeyError as e:
+            raise ValueError(f"Missing feature {e} in booking") from None
+        except TypeError:
+            raise ValueError("Every booking must be an object keyed by feature name") from None
+    else:
+        rows = records
+
+    try:
+        features = np.array(rows, dtype=np.float64)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Bookings must contain only numeric values: {e}") from None
+
+    if features.ndim != 2 or features.shape[1] != NUM_FEATURES:
+        raise ValueError(f"Every booking must have exactly {NUM_FEATURES} features in the order {FEATURE_COLUMNS}")
+
+    if not np.isfinite(features).all():
+        raise ValueError("Bookings must not contain NaN or infinite values")
+
+    return np.ascontiguousarray(features)
+
+
+class FeatureSchema:
+    # Request schema compiled once at startup: one (name, column, converter) entry per feature.
+    # fill() writes a parsed JSON payload straight into a preallocated 1 x NUM_FEATURES row,
+    # one buffer per thread, so the single-prediction path allocates no feature arrays.
+
+    def __init__(self, columns=FEATURE_COLUMNS, float_features=FLOAT_FEATURES):
+        self.fields = tuple(
+            (name, index, float if name in float_features else int) for index, name in enumerate(columns)
+        )
+        self._local = threading.local()
+
+    def row_buffer(self):
+        buffer = getattr(self._local, "row", None)
+        if buffer is None:
+            buffer = self._local.row = np.empty((1, len(self.fields)), dtype=np.float64)
+        return buffer
+
+    def fill(self, payload):
+        # Raises KeyError for a missing feature and TypeError/ValueError for a bad value.
+        # The returned buffer is reused by the next call on the same thread.
+        if not isinstance(payload, dict):
+            raise TypeError("Payload must be a JSON object keyed by feature name")
+        row = self.row_buffer()
+        values = row[0]
+        for name, index, converter in self.fields:
+            value = payload[name]
+            if isinstance(value, bool):
+                raise TypeError(f"{name} must be a number")
+            values[index] = converter(value)
+        if not np.isfinite(values).all():
+            raise ValueError("Features must be finite numbers")
+        return row
@@ -0,0 +1,63 @@
+import numpy as np
+
+from src.logger import get_logger
+from src.tree_engine import TreeEnsemble
+from src.quickscorer import QuickScorer
+
+logger = get_logger(__name__)
+
+ENGINES = ("lightgbm", "numpy", "quickscorer")
+
+
+class BoosterClassifier:
+    # Scores with a raw LightGBM Booster loaded from its text model file, so serving
+    # does not unpickle the sklearn wrapper. Mirrors the LGBMClassifier interface the rest
+    # of the serving code uses (booster_, classes_, predict_proba, predict).
+
+    def __init__(self, booster, classes):
+        self.booster_ = booster
+        self.classes_ = classes
+
+    def predict_proba(self, X, num_threads=None):
+        params = {} if num_threads is None else {"num_threads": num_threads}
+        positive = self.booster_.predict(X, **params)
+        return np.column_stack((1.0 - positive, positive))
+
+    def predict(self, X, num_threads=None):
+        return self.classes_[np.argmax(self.predict_proba(X, num_threads), axis=1)]
+
+
+def check_engine(engine):
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown inference engine '{engine}', expected one of {ENGINES}")
+    logger.info(f"Using the {engine} inference engine")
+
+
+def load_inference_engine(model, engine="lightgbm"):
+    # Every engine exposes predict, predict_proba and classes_ like the LGBMClassifier it replaces
+    check_engine(engine)
+
+    if engine == "numpy":
+        return TreeEnsemble.from_lightgbm(model)
+    if engine == "quickscorer":
+        return QuickScorer.from_lightgbm(model)
+    return model
+
+
+def load_inference_engine_from_text(model_text, classes, engine="lightgbm"):
+    # Same engines built from a LightGBM text model; only the lightgbm engine imports lightgbm
+    check_engine(engine)
+    classes = np.asarray(classes)
+
+    if engine == "lightgbm":
+        import lightgbm as lgb
+        return BoosterClassifier(lgb.Booster(model_str=model_text), classes)
+
+    return engine_from_trees(TreeEnsemble.from_model_text(model_text, classes), engine)
+
+
+def engine_from_trees(ensemble, engine):
+    # numpy and quickscorer engines over an already built TreeEnsemble
+    if engine not in ("numpy", "quickscorer"):
+        raise ValueError(f"The {engine} engine cannot be built from exported tree arrays")
+    return QuickScorer(ensemble) if engine == "quickscorer" else ensemble
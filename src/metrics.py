@@ -0,0 +1,260 @@
+from bisect import bisect_left
+import threading
+import time
+
+import numpy as np
+
+
+class Histogram:
+    # Fixed-bucket histogram, cheap enough to call on every request.
+    # Buckets are upper bounds; values above the last bound go to an overflow bucket.
+
+    def __init__(self, buckets):
+        self.buckets = sorted(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        with self._lock:
+            self.observe_locked(value)
+
+    def observe_locked(self, value):
+        # Caller must hold the histogram's lock, or be the only thread that records into it
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    def percentile(self, q):
+        # Upper bound of the bucket holding the q-th percentile (q in [0, 100])
+        with self._lock:
+            counts = list(self.counts)
+        total = sum(counts)
+        if total == 0:
+            return 0.0
+
+        rank = q / 100 * total
+        running = 0
+        for index, bucket_count in enumerate(counts):
+            running += bucket_count
+            if running >= rank and bucket_count > 0:
+                return self.buckets[index] if index < len(self.buckets) else float("inf")
+        return float("inf")
+
+    def snapshot(self):
+        with self._lock:
+            counts = list(self.counts)
+            value_sum = self.sum
+        total = sum(counts)
+
+        bounds = [str(b) for b in self.buckets] + ["+Inf"]
+        return {
+            "count": total,
+            "sum": value_sum,
+            "mean": value_sum / total if total else 0.0,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "buckets": dict(zip(bounds, counts)),
+        }
+
+
+def exponential_buckets(start, factor, count):
+    return [start * factor ** i for i in range(count)]
+
+
+LATENCY_BUCKETS = exponential_buckets(0.00001, 2, 22)  # 10us .. ~21s, sorted like Histogram.buckets
+
+
+def _labels(**labels):
+    return "{" + ",".join(f'{key}="{value}"' for key, value in labels.items()) + "}"
+
+
+class RequestTimer:
+    # Records the time since the previous stage() call (or since start) under a stage name, with
+    # one perf_counter() per stage boundary. start is normally the timestamp taken when the request
+    # began, so the first stage does not need one of its own. Stages go straight into the stage
+    # histograms of the thread that created the timer, so a timer must stay on that thread.
+
+    __slots__ = ("route", "last", "histograms")
+
+    def __init__(self, route, histograms, start=None):
+        self.route = route
+        self.histograms = histograms
+        self.last = time.perf_counter() if start is None else start
+
+    def stage(self, name):
+        now = time.perf_counter()
+        elapsed = now - self.last
+        self.last = now
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Histogram(LATENCY_BUCKETS)
+        # Histogram.observe inlined, without its lock: only this thread writes here
+        histogram.counts[bisect_left(LATENCY_BUCKETS, elapsed)] += 1
+        histogram.sum += elapsed
+
+
+class MetricsShard:
+    # The metrics recorded by one thread. Only that thread writes to it, so recording takes no
+    # lock; a scrape reads every shard and adds them up, at worst missing a request in progress.
+    # stage_histograms maps a route to its {stage: Histogram}.
+
+    __slots__ = ("thread", "started", "finished", "stage_histograms", "request_histograms", "prediction_counts")
+
+    def __init__(self, thread=None):
+        self.thread = thread
+        self.started = 0
+        self.finished = 0
+        self.stage_histograms = {}
+        self.request_histograms = {}
+        self.prediction_counts = {}
+
+
+def _add_histogram(histograms, key, histogram):
+    total = histograms.get(key)
+    if total is None:
+        total = histograms[key] = Histogram(LATENCY_BUCKETS)
+    total.counts = [a + b for a, b in zip(total.counts, histogram.counts)]
+    total.sum += histogram.sum
+
+
+def add_shards(shards):
+    # Adds up shards into a new one. list() so a thread adding a route, stage or class while
+    # we read does not break the iteration.
+    total = MetricsShard()
+    for shard in shards:
+        total.started += shard.started
+        total.finished += shard.finished
+        for route, histogram in list(shard.request_histograms.items()):
+            _add_histogram(total.request_histograms, route, histogram)
+        for route, stages in list(shard.stage_histograms.items()):
+            route_total = total.stage_histograms.setdefault(route, {})
+            for name, histogram in list(stages.items()):
+                _add_histogram(route_total, name, histogram)
+        for label, count in list(shard.prediction_counts.items()):
+            total.prediction_counts[label] = total.prediction_counts.get(label, 0) + count
+    return total
+
+
+class ServingMetrics:
+    # Stage and request latency histograms, prediction counts per class and in-flight requests,
+    # rendered in the Prometheus text exposition format. Each thread records into its own
+    # MetricsShard, so the request path never waits on a lock shared with other threads.
+
+    def __init__(self, namespace="hotel_reservation"):
+        self.namespace = namespace
+        self.shards = []
+        self.retired = MetricsShard()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def _shard(self):
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = self._local.shard = MetricsShard(threading.current_thread())
+            with self._lock:
+                self.shards.append(shard)
+            return shard
+
+    def timer(self, route, start=None):
+        stage_histograms = self._shard().stage_histograms
+        histograms = stage_histograms.get(route)
+        if histograms is None:
+            histograms = stage_histograms[route] = {}
+        return RequestTimer(route, histograms, start)
+
+    def request_started(self):
+        self._shard().started += 1
+
+    def request_finished(self, route, seconds):
+        shard = self._shard()
+        shard.finished += 1
+        histogram = shard.request_histograms.get(route)
+        if histogram is None:
+            histogram = shard.request_histograms[route] = Histogram(LATENCY_BUCKETS)
+        histogram.counts[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        histogram.sum += seconds
+
+    def count_predictions(self, labels):
+        prediction_counts = self._shard().prediction_counts
+        if type(labels) is int or isinstance(labels, np.integer):
+            # Fast path for the single-row routes
+            label = int(labels)
+            prediction_counts[label] = prediction_counts.get(label, 0) + 1
+            return
+
+        values, totals = np.unique(labels, return_counts=True)
+        for label, count in zip(values.tolist(), totals.tolist()):
+            prediction_counts[label] = prediction_counts.get(label, 0) + count
+
+    def collect(self):
+        # Every thread's metrics added up. Shards of threads that have exited are folded into one,
+        # so a server that starts a thread per request does not keep a shard per request.
+        with self._lock:
+            exited = [shard for shard in self.shards if not shard.thread.is_alive()]
+            if exited:
+                self.retired = add_shards([self.retired] + exited)
+                self.shards = [shard for shard in self.shards if shard.thread.is_alive()]
+            shards = [self.retired] + self.shards
+        return add_shards(shards)
+
+    def _render_histogram(self, lines, name, histogram, labels):
+        snapshot = histogram.snapshot()
+        running = 0
+        for bound, count in snapshot["buckets"].items():
+            running += count
+            lines.append(f"{name}_bucket{_labels(**labels, le=bound)} {running}")
+        lines.append(f"{name}_sum{_labels(**labels)} {snapshot['sum']}")
+        lines.append(f"{name}_count{_labels(**labels)} {snapshot['count']}")
+        return snapshot
+
+    def render_prometheus(self, model_version, gauges=None):
+        ns = self.namespace
+        lines = []
+
+        total = self.collect()
+        stage_histograms = sorted(((route, name), histogram) for route, stages in total.stage_histograms.items()
+                                  for name, histogram in stages.items())
+        request_histograms = sorted(total.request_histograms.items())
+        prediction_counts = sorted(total.prediction_counts.items())
+        in_flight = total.started - total.finished
+
+        quantiles = []
+        lines.append(f"# HELP {ns}_stage_seconds Time spent in each stage of the request path")
+        lines.append(f"# TYPE {ns}_stage_seconds histogram")
+        for (route, stage), histogram in stage_histograms:
+            snapshot = self._render_histogram(lines, f"{ns}_stage_seconds", histogram, {"route": route, "stage": stage})
+            quantiles.append(({"route": route, "stage": stage}, snapshot))
+
+        lines.append(f"# HELP {ns}_request_seconds Total time spent handling a request")
+        lines.append(f"# TYPE {ns}_request_seconds histogram")
+        for route, histogram in request_histograms:
+            snapshot = self._render_histogram(lines, f"{ns}_request_seconds", histogram, {"route": route})
+            quantiles.append(({"route": route, "stage": "total"}, snapshot))
+
+        lines.append(f"# HELP {ns}_latency_quantile_seconds p50/p95/p99 estimated from the histogram buckets")
+        lines.append(f"# TYPE {ns}_latency_quantile_seconds gauge")
+        for labels, snapshot in quantiles:
+            for quantile, key in (("0.5", "p50"), ("0.95", "p95"), ("0.99", "p99")):
+                lines.append(f"{ns}_latency_quantile_seconds{_labels(**labels, quantile=quantile)} {snapshot[key]}")
+
+        lines.append(f"# HELP {ns}_predictions_total Predictions served per class")
+        lines.append(f"# TYPE {ns}_predictions_total counter")
+        for label, count in prediction_counts:
+            lines.append(f"{ns}_predictions_total{_labels(**{'class': label})} {count}")
+
+        lines.append(f"# HELP {ns}_requests_in_flight Requests currently being handled")
+        lines.append(f"# TYPE {ns}_requests_in_flight gauge")
+        lines.append(f"{ns}_requests_in_flight {in_flight}")
+
+        lines.append(f"# HELP {ns}_model_info Version of the model being served")
+        lines.append(f"# TYPE {ns}_model_info gauge")
+        lines.append(f"{ns}_model_info{_labels(version=model_version)} 1")
+
+        for name, (help_text, value) in sorted((gauges or {}).items()):
+            lines.append(f"# HELP {ns}_{name} {help_text}")
+            lines.append(f"# TYPE {ns}_{name} gauge")
+            lines.append(f"{ns}_{name} {value}")
+
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,111 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+from src.logger import get_logger
+from src.metrics import Histogram, exponential_buckets
+from src.predictor import score
+
+logger = get_logger(__name__)
+
+
+class MicroBatcher:
+    # Coalesces concurrent single-row predictions into one model call.
+    # A batch is flushed when max_batch_size rows are queued or flush_interval_ms
+    # has passed since the first row of the batch arrived, whichever comes first.
+    # Every result carries the version of the model that scored it (see use_model).
+
+    def __init__(self, model, max_batch_size=64, flush_interval_ms=2.0, max_queue_size=1024, executor=None,
+                 version=None):
+        self.current = (model, version)
+        self.executor = executor
+        self.max_batch_size = max_batch_size
+        self.flush_interval = flush_interval_ms / 1000
+        self.queue = queue.Queue(maxsize=max_queue_size)
+
+        self.batch_size_histogram = Histogram(exponential_buckets(1, 2, 12))
+        self.wait_time_histogram = Histogram(exponential_buckets(0.0001, 2, 16))
+
+        self._stopped = threading.Event()
+        self._worker = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self._worker.start()
+
+        logger.info(f"Micro batcher started with max_batch_size={max_batch_size}, "
+                    f"flush_interval_ms={flush_interval_ms}, max_queue_size={max_queue_size}")
+
+    def submit(self, row):
+        # Raises queue.Full when the queue is at max_queue_size, so the caller can shed load
+        future = Future()
+        self.queue.put_nowait((row, time.perf_counter(), future))
+        return future
+
+    def predict(self, row, timeout=None):
+        # Returns (label, probability of the positive class, model version) for one feature row
+        return self.submit(row).result(timeout=timeout)
+
+    def use_model(self, model, version=None):
+        # Batches flushed from now on use this model; one assignment so model and version always agree
+        self.current = (model, version)
+
+    def stats(self):
+        return {
+            "queue_depth": self.queue.qsize(),
+            "batch_size": self.batch_size_histogram.snapshot(),
+            "wait_time_seconds": self.wait_time_histogram.snapshot(),
+        }
+
+    def is_alive(self):
+        return self._worker.is_alive()
+
+    def stop(self):
+        self._stopped.set()
+        self._worker.join()
+
+    def _collect_batch(self):
+        try:
+            first = self.queue.get(timeout=0.1)
+        except queue.Empty:
+            return []
+
+        batch = [first]
+        deadline = first[1] + self.flush_interval
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self.queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while not self._stopped.is_set():
+            batch = self._collect_batch()
+            if not batch:
+                continue
+
+            flushed_at = time.perf_counter()
+            self.batch_size_histogram.observe(len(batch))
+            for _, enqueued_at, _ in batch:
+                self.wait_time_histogram.observe(flushed_at - enqueued_at)
+
+            try:
+                features = np.array([row for row, _, _ in batch], dtype=np.float64)
+                # self.current may be replaced by a hot reload; a batch always uses one model
+                model, version = self.current
+                if self.executor is not None:
+                    labels, probabilities = self.executor.score(model, features)
+                else:
+                    labels, probabilities = score(model, features)
+            except Exception as e:
+                logger.error(f"Micro batch of {len(batch)} rows failed: {e}")
+                for _, _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            for i, (_, _, future) in enumerate(batch):
+                future.set_result((labels[i].item(), probabilities[i].item(), version))
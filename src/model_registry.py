@@ -0,0 +1,125 @@
+import os
+import threading
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from src.logger import get_logger
+from src.features import NUM_FEATURES
+from src.predictor import load_model, score
+
+logger = get_logger(__name__)
+
+# Everything a request needs from one model version; swapped as a single reference
+ModelHandle = namedtuple("ModelHandle", ["model", "version", "path", "loaded_at"])
+
+WARMUP_ROWS = np.zeros((16, NUM_FEATURES), dtype=np.float64)
+
+
+class ModelRegistry:
+    # Holds the model being served and hot-swaps it when the artifact changes.
+    #
+    # A watcher thread polls either the model artifact itself or, when pointer_path is set,
+    # a small text file holding the path of the artifact to serve. A new artifact is loaded
+    # and warmed up in the background and then published by replacing self._handle. Requests
+    # read `current` once and keep using that handle, so in-flight requests finish on the
+    # model they started with.
+
+    def __init__(self, model_path, engine="lightgbm", pointer_path=None, poll_interval_seconds=5.0):
+        self.model_path = model_path
+        self.engine = engine
+        self.pointer_path = pointer_path
+        self.poll_interval_seconds = poll_interval_seconds
+
+        self.reloads = 0
+        self.last_reload_error = None
+        self._listeners = []
+        self._stop = threading.Event()
+        self._watcher = None
+
+        path = self._resolve_path()
+        self._stamp = self._stat(path)
+        self._handle = self._load(path)
+
+    @property
+    def current(self):
+        return self._handle
+
+    def add_listener(self, callback):
+        # callback(handle) is called after every swap
+        self._listeners.append(callback)
+
+    def _resolve_path(self):
+        if self.pointer_path is None:
+            return self.model_path
+        with open(self.pointer_path) as pointer:
+            return pointer.read().strip()
+
+    @staticmethod
+    def _stat(path):
+        stat = os.stat(path)
+        return (path, stat.st_mtime_ns, stat.st_size)
+
+    def _load(self, path):
+        model, version = load_model(path, self.engine)
+
+        # Run a few predictions so lazy initialization does not land on the first real request
+        score(model, WARMUP_ROWS[:1])
+        score(model, WARMUP_ROWS)
+
+        return ModelHandle(model=model, version=version, path=path, loaded_at=time.time())
+
+    def check_for_update(self):
+        # Returns True when a new model version was swapped in
+        try:
+            path = self._resolve_path()
+            stamp = self._stat(path)
+            if stamp == self._stamp:
+                return False
+
+            handle = self._load(path)
+            self._stamp = stamp
+            if handle.version == self._handle.version:
+                return False
+
+            previous = self._handle
+            self._handle = handle
+            self.reloads += 1
+            self.last_reload_error = None
+            logger.info(f"Swapped model {previous.version} for {handle.version} from {path}")
+
+            for callback in self._listeners:
+                callback(handle)
+            return True
+
+        except Exception as e:
+            # Keep serving the current model; a half-written artifact is retried on the next poll
+            self.last_reload_error = str(e)
+            logger.error(f"Model reload failed, keeping version {self._handle.version}: {e}")
+            return False
+
+    def start_watching(self):
+        self._stop.clear()
+        self._watcher = threading.Thread(target=self._watch, name="model-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self):
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join()
+
+    def _watch(self):
+        while not self._stop.wait(self.poll_interval_seconds):
+            self.check_for_update()
+
+    def status(self):
+        handle = self._handle
+        return {
+            "model_version": handle.version,
+            "model_path": handle.path,
+            "engine": self.engine,
+            "loaded_at": handle.loaded_at,
+            "reloads": self.reloads,
+            "last_reload_error": self.last_reload_error,
+        }
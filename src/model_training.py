@@ -1,4 +1,5 @@
 import os
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
 import joblib
 from sklearn.model_selection import RandomizedSearchCV
@@ -6,22 +7,21 @@ import lightgbm as lgb
 from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score
 from src.logger import get_logger
 from src.custom_exception import CustomException
+from src.serving_artifact import save_serving_artifact
 from config.paths_config import *
 from config.model_params import *
 from utils.common_functions import read_yaml, load_data
 from scipy.stats import randint, uniform
 
-import mlflow
-import mlflow.sklearn
-
 logger = get_logger(__name__)
 
 class ModelTraining:
 
-    def __init__(self, train_path, test_path, model_output_path):
+    def __init__(self, train_path, test_path, model_output_path, serving_model_dir=SERVING_MODEL_DIR):
         self.train_path = train_path
         self.test_path = test_path
         self.model_output_path = model_output_path
+        self.serving_model_dir = serving_model_dir
 
         self.params_dist = LIGHTGBM_PARAMS
         self.random_search_params = RANDOM_SEARCH_PARAMS
@@ -37,10 +37,6 @@ class ModelTraining:
             logger.info(f"Loading the data from {self.test_path}")
             test_df = load_data(self.test_path)
 
-            logger.info("Deleting the unnecessary columns")
-            train_df = train_df.drop(columns=["Unnamed: 0"])
-            test_df = test_df.drop(columns=["Unnamed: 0"])
-
             X_train = train_df.drop(columns=["booking_status"])
             y_train = train_df["booking_status"]
 
@@ -119,37 +115,52 @@ class ModelTraining:
             raise CustomException("Failed to evaluate the model", e)
 
 
-    def save_model(self,model):
+    def save_model(self, model, metrics=None):
         try:
             os.makedirs(os.path.dirname(self.model_output_path), exist_ok=True)
 
             logger.info(f"Saving the model to {self.model_output_path}")
-            joblib.dump(model, self.model_output_path)
+            # Write to a temporary file and rename it, so a serving process watching the
+            # artifact never loads a half-written model
+            tmp_path = f"{self.model_output_path}.tmp"
+            joblib.dump(model, tmp_path)
+            os.replace(tmp_path, self.model_output_path)
             logger.info(f"Model saved successfully to {self.model_output_path}")
 
+            # Lean copy for serving: booster text model + manifest, no sklearn wrapper to unpickle
+            save_serving_artifact(model, self.serving_model_dir, self.train_path, metrics)
+
         except Exception as e:
             logger.error(f"Error occurred while saving the model: {e}")
             raise CustomException("Failed to save the model", e)
         
     def run(self):
         try:
-            with mlflow.start_run():
+            import mlflow  # training-only dependency, imported when a training run starts
+            from mlflow.tracking import MlflowClient
+            with mlflow.start_run() as run, ThreadPoolExecutor(max_workers=1) as uploads:
                 logger.info("Starting the model training process")
 
                 logger.info("Starting our MLFLOW experiment")
 
                 logger.info("Logging the training and testing dataset to MLFLOW")
 
-                mlflow.log_artifact(self.train_path, artifact_path="datasets")
-                mlflow.log_artifact(self.test_path, artifact_path="datasets")
+                # The uploads run in the background while the hyperparameter search runs
+                client = MlflowClient()
+                dataset_uploads = [uploads.submit(client.log_artifact, run.info.run_id, path, "datasets")
+                                   for path in (self.train_path, self.test_path)]
 
                 X_train, y_train, X_test, y_test = self.load_and_split_data()
                 best_lgbm_model = self.train_lgbm(X_train, y_train)
                 metrics = self.evaluate_model(best_lgbm_model, X_test, y_test)
-                self.save_model(best_lgbm_model)
+                self.save_model(best_lgbm_model, metrics)
+
+                for upload in dataset_uploads:
+                    upload.result()
                 
                 logger.info("Logging the model parameters and metrics to MLFLOW")
                 mlflow.log_artifact(self.model_output_path)
+                mlflow.log_artifacts(self.serving_model_dir, artifact_path="serving")
 
                 mlflow.log_params(best_lgbm_model.get_params())
 
@@ -0,0 +1,105 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class PredictionCache:
+    # Bounded LRU cache of predictions keyed on (model version, normalized feature tuple).
+    # Entries optionally expire after ttl_seconds, and the whole cache is dropped when the
+    # model artifact on disk changes (checked at most every check_interval_seconds).
+
+    def __init__(self, max_size=10000, ttl_seconds=None, model_path=None, check_interval_seconds=1.0):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.model_path = model_path
+        self.check_interval_seconds = check_interval_seconds
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._artifact_stamp = self._stat_artifact()
+        self._next_check = time.monotonic() + check_interval_seconds
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def make_key(model_version, features):
+        # 161 and 161.0 must share an entry, so every value is normalized to float
+        return (model_version, tuple(float(value) for value in features))
+
+    def _stat_artifact(self):
+        if self.model_path is None:
+            return None
+        try:
+            stat = os.stat(self.model_path)
+            return (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            return None
+
+    def _check_artifact(self, now):
+        if self.model_path is None or now < self._next_check:
+            return
+        self._next_check = now + self.check_interval_seconds
+
+        stamp = self._stat_artifact()
+        if stamp != self._artifact_stamp:
+            self._artifact_stamp = stamp
+            self._entries.clear()
+            self.invalidations += 1
+            logger.info(f"Model artifact {self.model_path} changed, prediction cache cleared")
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            self._check_artifact(now)
+
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            value, expires_at = entry
+            if expires_at is not None and now >= expires_at:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
@@ -0,0 +1,67 @@
+import math
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from src.logger import get_logger
+from src.predictor import score
+
+logger = get_logger(__name__)
+
+
+class PredictionExecutor:
+    # Runs predictions on a fixed number of worker threads and gives each call its own
+    # OpenMP thread count, so concurrent requests never use more threads than thread_budget.
+    #
+    # Single rows and small batches want one thread (starting an OpenMP team costs more than
+    # scoring them); larger batches want one thread per rows_per_thread rows. A call takes
+    # its threads from the budget shared by all workers when it starts and gives them back
+    # when it is done, so one big batch on an idle executor gets the whole budget while a
+    # busy executor hands out what is left and makes a call wait when nothing is.
+    #
+    # thread_budget is for the host: with several serving processes (serve.py) each one
+    # gets thread_budget // processes.
+
+    def __init__(self, max_workers=None, thread_budget=None, rows_per_thread=2000, processes=1):
+        self.thread_budget = max(1, (thread_budget or os.cpu_count()) // max(1, processes))
+        self.max_workers = max_workers or self.thread_budget
+        self.rows_per_thread = rows_per_thread
+        self.threads_in_use = 0
+        self.threads_released = threading.Condition()
+        self.pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="predict")
+
+        logger.info(f"Prediction executor with {self.max_workers} workers "
+                    f"sharing {self.thread_budget} OpenMP threads")
+
+    def threads_for(self, n_rows):
+        # Threads a batch of n_rows asks for; it may be granted fewer when the budget is in use
+        return max(1, min(self.thread_budget, math.ceil(n_rows / self.rows_per_thread)))
+
+    def acquire_threads(self, wanted):
+        with self.threads_released:
+            while self.threads_in_use >= self.thread_budget:
+                self.threads_released.wait()
+            granted = min(wanted, self.thread_budget - self.threads_in_use)
+            self.threads_in_use += granted
+            return granted
+
+    def release_threads(self, count):
+        with self.threads_released:
+            self.threads_in_use -= count
+            self.threads_released.notify_all()
+
+    def run(self, model, features):
+        threads = self.acquire_threads(self.threads_for(len(features)))
+        try:
+            return score(model, features, threads)
+        finally:
+            self.release_threads(threads)
+
+    def submit(self, model, features):
+        return self.pool.submit(self.run, model, features)
+
+    def score(self, model, features, timeout=None):
+        return self.submit(model, features).result(timeout=timeout)
+
+    def shutdown(self):
+        self.pool.shutdown(wait=True)
@@ -0,0 +1,34 @@
+import numpy as np
+
+from src.logger import get_logger
+from src.inference_engine import load_inference_engine
+from src.serving_artifact import load_serving_artifact
+from utils.common_functions import compute_model_version
+
+logger = get_logger(__name__)
+
+
+def load_model(model_path, engine="lightgbm"):
+    # Shared by every serving entry point so they all load and version the model the same way.
+    # model_path is either a serving manifest (booster text model, no sklearn unpickling)
+    # or the pickled LGBMClassifier written by ModelTraining.
+    if model_path.endswith(".json"):
+        model, manifest = load_serving_artifact(model_path, engine)
+        model_version = manifest["model_version"]
+    else:
+        import joblib
+        model = load_inference_engine(joblib.load(model_path), engine)
+        model_version = compute_model_version(model_path)
+    logger.info(f"Loaded model {model_path} (version {model_version})")
+    return model, model_version
+
+
+def score(model, features, num_threads=None):
+    # Returns the predicted labels and the probability of the positive class for a feature matrix.
+    # num_threads caps the OpenMP threads LightGBM uses for this call; the NumPy engines ignore it.
+    if num_threads is not None and hasattr(model, "booster_"):
+        probabilities = model.predict_proba(features, num_threads=num_threads)
+    else:
+        probabilities = model.predict_proba(features)
+    labels = model.classes_[np.argmax(probabilities, axis=1)]
+    return labels, probabilities[:, 1]
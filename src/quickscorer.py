@@ -0,0 +1,151 @@
+import numpy as np
+
+from src.logger import get_logger
+from src.custom_exception import CustomException
+from src.tree_engine import TreeEnsemble, MISSING_NONE
+
+logger = get_logger(__name__)
+
+WORD_BITS = 64
+ROWS_PER_CHUNK = 512
+
+
+class QuickScorer:
+    # QuickScorer (Lucchese et al., SIGIR 2015) over a TreeEnsemble.
+    #
+    # Leaves of every tree are numbered left to right and each tree keeps a bitvector
+    # with one bit per leaf. A split node is "false" for a row when x > threshold; a
+    # false node rules out its whole left subtree, so it carries a mask with the bits
+    # of those leaves cleared. ANDing the masks of all false nodes leaves the exit leaf
+    # as the lowest set bit.
+    #
+    # Thresholds are pre-sorted per (tree, feature) together with the running AND of
+    # their masks, so for a batch the false nodes of a group are found with one
+    # searchsorted and their combined mask with one lookup, instead of walking nodes.
+
+    def __init__(self, ensemble):
+        try:
+            if (ensemble.missing_type != MISSING_NONE).any():
+                raise ValueError("QuickScorer only supports splits without missing value handling")
+
+            self.classes_ = ensemble.classes_
+            self.sigmoid = ensemble.sigmoid
+            self.feature_names = ensemble.feature_names
+            self.n_trees = ensemble.n_trees
+            self.n_features = len(ensemble.feature_names)
+            self._build(ensemble)
+
+            logger.info(f"QuickScorer built for {self.n_trees} trees, {self.n_words} bitvector words per tree")
+
+        except Exception as e:
+            logger.error(f"Error occurred while building QuickScorer: {e}")
+            raise CustomException("Failed to build QuickScorer", e)
+
+    @classmethod
+    def from_lightgbm(cls, model):
+        return cls(TreeEnsemble.from_lightgbm(model))
+
+    def _build(self, ensemble):
+        ends = np.append(ensemble.roots[1:], ensemble.n_nodes)
+        is_leaf = ensemble.feature < 0
+
+        # Leaves come out of the pre-order export left to right, so leaf ids are just their rank in the tree
+        leaf_counts = [int(is_leaf[start:end].sum()) for start, end in zip(ensemble.roots, ends)]
+        max_leaves = max(leaf_counts)
+        self.n_words = (max_leaves + WORD_BITS - 1) // WORD_BITS
+
+        self.leaf_values = np.zeros((self.n_trees, max_leaves), dtype=np.float64)
+        # Thresholds and masks of every split node, per (tree, feature) group
+        groups = [[] for _ in range(self.n_trees * self.n_features)]
+
+        for tree, (start, end) in enumerate(zip(ensemble.roots, ends)):
+            leaf_id = np.full(end - start, -1)
+            leaf_id[is_leaf[start:end]] = np.arange(leaf_counts[tree])
+            self.leaf_values[tree, :leaf_counts[tree]] = ensemble.value[start:end][is_leaf[start:end]]
+
+            # First and last leaf under every node, filled bottom-up (children come after parents in pre-order)
+            first_leaf = leaf_id.copy()
+            last_leaf = leaf_id.copy()
+            for node in range(end - 1, start - 1, -1):
+                if not is_leaf[node]:
+                    first_leaf[node - start] = first_leaf[ensemble.left[node] - start]
+                    last_leaf[node - start] = last_leaf[ensemble.right[node] - start]
+
+            for node in range(start, end):
+                if is_leaf[node]:
+                    continue
+                left = ensemble.left[node] - start
+                mask = np.full(self.n_words, np.iinfo(np.uint64).max, dtype=np.uint64)
+                for leaf in range(first_leaf[left], last_leaf[left] + 1):
+                    mask[leaf // WORD_BITS] &= ~np.uint64(1 << (leaf % WORD_BITS))
+                groups[tree * self.n_features + ensemble.feature[node]].append((ensemble.threshold[node], mask))
+
+        # Distinct thresholds per feature; a row's value is turned into its rank among them
+        self.feature_thresholds = [
+            np.unique([threshold for tree in range(self.n_trees)
+                       for threshold, _ in groups[tree * self.n_features + feature]])
+            for feature in range(self.n_features)
+        ]
+        self.key_stride = max(len(t) for t in self.feature_thresholds) + 1
+
+        keys = []
+        prefix_masks = []
+        self.group_offset = np.zeros(len(groups), dtype=np.int64)
+        self.prefix_start = np.zeros(len(groups), dtype=np.int64)
+        for group, nodes in enumerate(groups):
+            feature = group % self.n_features
+            nodes.sort(key=lambda item: item[0])
+            self.group_offset[group] = len(keys)
+            self.prefix_start[group] = len(prefix_masks)
+
+            running = np.full(self.n_words, np.iinfo(np.uint64).max, dtype=np.uint64)
+            prefix_masks.append(running.copy())
+            for threshold, mask in nodes:
+                rank = np.searchsorted(self.feature_thresholds[feature], threshold)
+                keys.append(group * self.key_stride + rank)
+                running &= mask
+                prefix_masks.append(running.copy())
+
+        self.group_keys = np.array(keys, dtype=np.int64)
+        self.group_base = np.arange(len(groups), dtype=np.int64) * self.key_stride
+        self.group_feature = np.arange(len(groups)) % self.n_features
+        self.prefix_masks = np.array(prefix_masks, dtype=np.uint64)
+
+    def _exit_leaves(self, X):
+        ranks = np.column_stack([
+            np.searchsorted(self.feature_thresholds[f], X[:, f], side="left") for f in range(self.n_features)
+        ])
+        # Number of false nodes (threshold < x) in every (tree, feature) group
+        counts = np.searchsorted(self.group_keys, self.group_base + ranks[:, self.group_feature]) - self.group_offset
+        masks = self.prefix_masks[self.prefix_start + counts]
+        bitvectors = np.bitwise_and.reduce(masks.reshape(len(X), self.n_trees, self.n_features, self.n_words), axis=2)
+
+        # Exit leaf is the lowest set bit across the words of each tree's bitvector
+        exit_leaves = np.full((len(X), self.n_trees), -1, dtype=np.int64)
+        for word in range(self.n_words - 1, -1, -1):
+            bits = bitvectors[:, :, word]
+            lowest = bits & (~bits + np.uint64(1))
+            position = np.log2(np.where(lowest == 0, 1, lowest).astype(np.float64)).astype(np.int64)
+            exit_leaves = np.where(bits != 0, word * WORD_BITS + position, exit_leaves)
+        return exit_leaves
+
+    def predict_raw(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        # Splits without missing value handling treat NaN as 0, same as LightGBM
+        X = np.nan_to_num(X, nan=0.0)
+
+        raw = np.empty(len(X), dtype=np.float64)
+        trees = np.arange(self.n_trees)
+        for start in range(0, len(X), ROWS_PER_CHUNK):
+            chunk = X[start:start + ROWS_PER_CHUNK]
+            raw[start:start + len(chunk)] = self.leaf_values[trees, self._exit_leaves(chunk)].sum(axis=1)
+        return raw
+
+    def predict_proba(self, X):
+        positive = 1.0 / (1.0 + np.exp(-self.sigmoid * self.predict_raw(X)))
+        return np.column_stack([1.0 - positive, positive])
+
+    def predict(self, X):
+        return self.classes_[(self.predict_proba(X)[:, 1] > 0.5).astype(int)]
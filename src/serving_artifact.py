@@ -0,0 +1,111 @@
+import hashlib
+import json
+import os
+import time
+
+from src.logger import get_logger
+from src.custom_exception import CustomException
+from src.features import FEATURE_COLUMNS
+from src.inference_engine import check_engine, engine_from_trees, load_inference_engine_from_text
+from src.tree_engine import TreeEnsemble
+from utils.common_functions import file_sha256
+
+logger = get_logger(__name__)
+
+MANIFEST_FORMAT_VERSION = 1
+MODEL_FILE_NAME = "model.txt"
+MANIFEST_FILE_NAME = "manifest.json"
+TREE_FILE_NAME = "trees.bin"
+
+
+def write_atomic(path, write):
+    # write(tmp_path) produces the file; the rename publishes it in one step
+    tmp_path = f"{path}.tmp"
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def save_serving_artifact(model, output_dir, train_path, metrics=None):
+    # Writes the booster as a LightGBM text model plus a manifest describing it.
+    # The manifest is written last and is what serving watches, so a reader never
+    # sees a manifest pointing at a model file that is not fully written.
+    try:
+        os.makedirs(output_dir, exist_ok=True)
+        model_path = os.path.join(output_dir, MODEL_FILE_NAME)
+        manifest_path = os.path.join(output_dir, MANIFEST_FILE_NAME)
+
+        booster = model.booster_
+        write_atomic(model_path, lambda path: booster.save_model(path))
+        model_sha256 = file_sha256(model_path)
+
+        # Flat node arrays for the numpy/quickscorer engines, memory-mapped by every worker
+        tree_path = os.path.join(output_dir, TREE_FILE_NAME)
+        ensemble = TreeEnsemble.from_lightgbm(model)
+        write_atomic(tree_path, lambda path: ensemble.save_flat(path, source_sha256=model_sha256))
+
+        manifest = {
+            "format_version": MANIFEST_FORMAT_VERSION,
+            "model_file": MODEL_FILE_NAME,
+            "model_version": model_sha256[:12],
+            "model_sha256": model_sha256,
+            "tree_file": TREE_FILE_NAME,
+            "objective": model.objective_,
+            "num_trees": booster.num_trees(),
+            "feature_names": booster.feature_name(),
+            "classes": [c.item() for c in model.classes_],
+            "training_data": os.path.basename(train_path),
+            "training_data_sha256": file_sha256(train_path),
+            "metrics": {name: float(value) for name, value in (metrics or {}).items()},
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        }
+
+        def write_manifest(path):
+            with open(path, "w") as manifest_file:
+                json.dump(manifest, manifest_file, indent=2)
+
+        write_atomic(manifest_path, write_manifest)
+        logger.info(f"Serving artifact {manifest['model_version']} saved to {output_dir}")
+        return manifest_path
+
+    except Exception as e:
+        logger.error(f"Error occurred while saving the serving artifact: {e}")
+        raise CustomException("Failed to save the serving artifact", e)
+
+
+def read_manifest(manifest_path):
+    with open(manifest_path) as manifest_file:
+        manifest = json.load(manifest_file)
+
+    if manifest.get("format_version") != MANIFEST_FORMAT_VERSION:
+        raise ValueError(f"Unsupported serving manifest version {manifest.get('format_version')}, "
+                         f"expected {MANIFEST_FORMAT_VERSION}")
+    if manifest["feature_names"] != FEATURE_COLUMNS:
+        raise ValueError(f"Model features {manifest['feature_names']} do not match the serving schema {FEATURE_COLUMNS}")
+    return manifest
+
+
+def load_serving_artifact(manifest_path, engine="lightgbm"):
+    # Returns (model, manifest) with the model wrapped in the requested inference engine.
+    # The model file is checked against the manifest hash so a manifest is never paired
+    # with a different model.
+    manifest = read_manifest(manifest_path)
+
+    if engine != "lightgbm" and "tree_file" in manifest:
+        # Map the exported arrays instead of parsing the text model: nothing to build,
+        # and the pages are shared with every other process serving the same file
+        check_engine(engine)
+        tree_path = os.path.join(os.path.dirname(manifest_path), manifest["tree_file"])
+        ensemble, source_sha256 = TreeEnsemble.load_flat(tree_path)
+        if source_sha256 != manifest["model_sha256"]:
+            raise ValueError(f"{tree_path} was exported from a different model than {manifest_path}")
+        return engine_from_trees(ensemble, engine), manifest
+
+    model_path = os.path.join(os.path.dirname(manifest_path), manifest["model_file"])
+    with open(model_path, "rb") as model_file:
+        model_bytes = model_file.read()
+
+    if hashlib.sha256(model_bytes).hexdigest() != manifest["model_sha256"]:
+        raise ValueError(f"{model_path} does not match the hash recorded in {manifest_path}")
+
+    model = load_inference_engine_from_text(model_bytes.decode(), manifest["classes"], engine)
+    return model, manifest
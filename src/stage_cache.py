@@ -0,0 +1,112 @@
+import hashlib
+import json
+import os
+import time
+from importlib import metadata
+
+from src.logger import get_logger
+from utils.common_functions import file_sha256
+
+logger = get_logger(__name__)
+
+RECORD_SUFFIX = ".stage.json"
+
+
+class Stage:
+    # One pipeline step and everything its outputs depend on.
+    #
+    # The fingerprint hashes the contents of the input files, the stage's config section, the
+    # source files of the code that runs it and the versions of the packages it uses. After a
+    # successful run the fingerprint and the hashes of the outputs are written to
+    # <name>.stage.json next to the first output. A later run with the same fingerprint, and
+    # outputs that still match, is skipped and the files already on disk are used.
+    #
+    # group is the pipeline stage the task belongs to (for --from/--to), cached=False makes
+    # it run every time. run must be picklable, the DAG executor calls it in a worker process.
+
+    def __init__(self, name, run, inputs, outputs, code=(), config=None, packages=(), record_dir=None,
+                 group=None, cached=True):
+        self.name = name
+        self.group = group or name
+        self.cached = cached
+        self.run = run
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.code = list(code)
+        self.config = config
+        self.packages = list(packages)
+        record_dir = record_dir or os.path.dirname(self.outputs[0])
+        self.record_path = os.path.join(record_dir, f"{name}{RECORD_SUFFIX}")
+
+    def components(self):
+        return {
+            "inputs": {path: file_sha256(path) for path in self.inputs},
+            "config_sha256": hashlib.sha256(json.dumps(self.config, sort_keys=True, default=str).encode()).hexdigest(),
+            "code": {path: file_sha256(path) for path in self.code},
+            "packages": {package: metadata.version(package) for package in self.packages},
+        }
+
+    def fingerprint(self, components=None):
+        components = components or self.components()
+        return hashlib.sha256(json.dumps(components, sort_keys=True).encode()).hexdigest()
+
+    def read_record(self):
+        if not os.path.exists(self.record_path):
+            return None
+        try:
+            with open(self.record_path) as record_file:
+                return json.load(record_file)
+        except (OSError, ValueError):
+            return None
+
+    def stale_reasons(self, components):
+        # Why the recorded run can't be reused; empty when it can
+        record = self.read_record()
+        if record is None:
+            return ["no record of a previous run"]
+
+        reasons = []
+        for key in ("inputs", "code"):
+            changed = [path for path, digest in components[key].items() if record.get(key, {}).get(path) != digest]
+            if changed or set(record.get(key, {})) != set(components[key]):
+                reasons.append(f"{key} changed: {', '.join(changed) or 'file list'}")
+        if record.get("config_sha256") != components["config_sha256"]:
+            reasons.append("config changed")
+        if record.get("packages") != components["packages"]:
+            reasons.append("package versions changed")
+
+        recorded_outputs = record.get("outputs", {})
+        modified = [path for path in self.outputs
+                    if not os.path.exists(path) or recorded_outputs.get(path) != file_sha256(path)]
+        if modified:
+            reasons.append(f"outputs missing or modified: {', '.join(modified)}")
+        return reasons
+
+    def invalidate(self):
+        if os.path.exists(self.record_path):
+            os.remove(self.record_path)
+            logger.info(f"Stage {self.name}: cache invalidated")
+
+    def check(self, force=False):
+        # (fingerprint, components, reasons to run); no reasons means the recorded outputs are reused
+        components = self.components()
+        if not self.cached:
+            return None, components, ["not cached"]
+        return self.fingerprint(components), components, ["forced"] if force else self.stale_reasons(components)
+
+    def save_record(self, fingerprint, components, duration):
+        if not self.cached:
+            return
+        record = {
+            "stage": self.name,
+            "fingerprint": fingerprint,
+            **components,
+            "outputs": {path: file_sha256(path) for path in self.outputs},
+            "duration_seconds": round(duration, 3),
+            "completed_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        }
+        os.makedirs(os.path.dirname(self.record_path) or ".", exist_ok=True)
+        tmp_path = f"{self.record_path}.tmp"
+        with open(tmp_path, "w") as record_file:
+            json.dump(record, record_file, indent=2)
+        os.replace(tmp_path, self.record_path)
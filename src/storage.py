@@ -0,0 +1,455 @@
+import base64
+import fnmatch
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from src.logger import get_logger
+from src.custom_exception import CustomException
+
+logger = get_logger(__name__)
+
+CHUNK_SIZE = 1 << 20
+DEFAULT_SLICE_SIZE = 32 << 20
+LOCAL_BUCKET_PREFIX = "file://"
+
+
+class BlobInfo:
+    # What identifies one version of an object. Checksums are base64 encoded big-endian digests,
+    # as GCS reports them; composite objects have no md5_hash.
+
+    __slots__ = ("name", "generation", "size", "md5_hash", "crc32c")
+
+    def __init__(self, name, generation, size, md5_hash=None, crc32c=None):
+        self.name = name
+        self.generation = generation
+        self.size = size
+        self.md5_hash = md5_hash
+        self.crc32c = crc32c
+
+    def to_dict(self):
+        return {field: getattr(self, field) for field in self.__slots__}
+
+
+class ChecksumVerifier:
+    # Hashes a download as it streams and checks it against the object's metadata at the end
+
+    def __init__(self, info):
+        import google_crc32c  # installed with google-cloud-storage
+        self.info = info
+        self.size = 0
+        self.md5 = hashlib.md5() if info.md5_hash else None
+        self.crc32c = google_crc32c.Checksum() if info.crc32c else None
+
+    def update(self, chunk):
+        self.size += len(chunk)
+        if self.md5 is not None:
+            self.md5.update(chunk)
+        if self.crc32c is not None:
+            self.crc32c.update(chunk)
+
+    def verify(self):
+        if self.size != self.info.size:
+            raise ValueError(f"{self.info.name}: received {self.size} bytes, expected {self.info.size}")
+        if self.md5 is not None and encode_digest(self.md5.digest()) != self.info.md5_hash:
+            raise ValueError(f"{self.info.name}: MD5 mismatch, the download is corrupt")
+        if self.crc32c is not None and encode_digest(self.crc32c.digest()) != self.info.crc32c:
+            raise ValueError(f"{self.info.name}: CRC32C mismatch, the download is corrupt")
+
+
+def encode_digest(digest):
+    return base64.b64encode(digest).decode()
+
+
+class GCSStorage:
+    # One client for every request. With max_connections its HTTP pool holds that many
+    # connections, and threads beyond it wait for one instead of opening throwaway connections.
+
+    def __init__(self, bucket_name, max_connections=None):
+        from google.cloud import storage  # imported here so nothing else pays for the GCS client
+        self.session = None
+        if max_connections:
+            # The client takes its HTTP transport as _http; build an authorized session with the
+            # bounded pool rather than reaching into the one the client creates for itself
+            import google.auth
+            from google.auth.transport.requests import AuthorizedSession
+            from requests.adapters import HTTPAdapter
+            credentials, project = google.auth.default(scopes=storage.Client.SCOPE)
+            self.session = AuthorizedSession(credentials)
+            self.session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=max_connections,
+                                                       pool_block=True))
+            client = storage.Client(project=project, credentials=credentials, _http=self.session)
+        else:
+            client = storage.Client()
+        self.bucket = client.bucket(bucket_name)
+
+    def list(self, prefix):
+        blobs = self.bucket.client.list_blobs(self.bucket, prefix=prefix)
+        return [BlobInfo(blob.name, blob.generation, blob.size, blob.md5_hash, blob.crc32c)
+                for blob in blobs if not blob.name.endswith("/")]
+
+    def stat(self, name):
+        blob = self.bucket.get_blob(name)
+        if blob is None:
+            raise FileNotFoundError(f"gs://{self.bucket.name}/{name} does not exist")
+        return BlobInfo(name, blob.generation, blob.size, blob.md5_hash, blob.crc32c)
+
+    def open(self, info):
+        # Pinned to the generation that was stat'ed: an upload racing the download makes the
+        # read fail instead of mixing two versions. raw_download keeps the stored bytes, which
+        # are what the checksums cover.
+        blob = self.bucket.blob(info.name, generation=info.generation)
+        return blob.open("rb", chunk_size=CHUNK_SIZE, raw_download=True)
+
+    def read_range(self, info, start, end):
+        # Bytes [start, end) of that generation; GCS ranges include their end
+        blob = self.bucket.blob(info.name, generation=info.generation)
+        return blob.download_as_bytes(start=start, end=end - 1, raw_download=True)
+
+
+class LocalStorage:
+    # A directory standing in for a bucket, for tests and offline runs. The file's mtime plays
+    # the part of the generation: it changes whenever the object is rewritten.
+
+    def __init__(self, root):
+        self.root = root
+
+    def list(self, prefix):
+        names = []
+        for directory, _, files in os.walk(self.root):
+            for file_name in files:
+                name = os.path.relpath(os.path.join(directory, file_name), self.root).replace(os.sep, "/")
+                if name.startswith(prefix):
+                    names.append(name)
+        return [self.stat(name) for name in sorted(names)]
+
+    def stat(self, name):
+        import google_crc32c
+        path = os.path.join(self.root, name)
+        generation = os.stat(path).st_mtime_ns
+        md5, crc32c = hashlib.md5(), google_crc32c.Checksum()
+        with open(path, "rb") as blob_file:
+            for chunk in iter(lambda: blob_file.read(CHUNK_SIZE), b""):
+                md5.update(chunk)
+                crc32c.update(chunk)
+        return BlobInfo(name, generation, os.path.getsize(path), encode_digest(md5.digest()),
+                        encode_digest(crc32c.digest()))
+
+    def open_file(self, info):
+        path = os.path.join(self.root, info.name)
+        blob_file = open(path, "rb")
+        if os.fstat(blob_file.fileno()).st_mtime_ns != info.generation:
+            blob_file.close()
+            raise FileNotFoundError(f"{path} generation {info.generation} no longer exists")
+        return blob_file
+
+    def open(self, info):
+        return self.open_file(info)
+
+    def read_range(self, info, start, end):
+        with self.open_file(info) as blob_file:
+            blob_file.seek(start)
+            return blob_file.read(end - start)
+
+
+def open_storage(bucket_name, max_connections=None):
+    # file:///some/dir is a local fake bucket, anything else a GCS bucket name
+    if bucket_name.startswith(LOCAL_BUCKET_PREFIX):
+        return LocalStorage(bucket_name[len(LOCAL_BUCKET_PREFIX):])
+    return GCSStorage(bucket_name, max_connections)
+
+
+def read_download_record(metadata_path):
+    try:
+        with open(metadata_path) as metadata_file:
+            return json.load(metadata_file)
+    except (OSError, ValueError):
+        return None
+
+
+def is_current(record, source, path):
+    # The local copy was written from source (the blob or blobs it came from) and nobody
+    # touched it since
+    if record is None or any(record.get(key) != value for key, value in source.items()) or not os.path.exists(path):
+        return False
+    local = os.stat(path)
+    return record.get("local_size") == local.st_size and record.get("local_mtime_ns") == local.st_mtime_ns
+
+
+def write_download_record(metadata_path, source, path):
+    local = os.stat(path)
+    with open(metadata_path, "w") as metadata_file:
+        json.dump({**source, "local_size": local.st_size, "local_mtime_ns": local.st_mtime_ns}, metadata_file, indent=2)
+
+
+def verify_file(path, info):
+    verifier = ChecksumVerifier(info)
+    with open(path, "rb") as local_file:
+        for chunk in iter(lambda: local_file.read(CHUNK_SIZE), b""):
+            verifier.update(chunk)
+    verifier.verify()
+
+
+class DownloadProgress:
+    # Which slices of a sliced download are on disk, saved after every slice so that an
+    # interrupted download resumes with the missing ones. Only valid for the same blob
+    # generation and slice size.
+
+    def __init__(self, path, info, slice_size):
+        self.path = path
+        self.key = {"blob": info.to_dict(), "slice_size": slice_size}
+        self.done = set()
+        self._lock = threading.Lock()
+
+    def load(self):
+        record = read_download_record(self.path)
+        if record is None or {key: record.get(key) for key in self.key} != self.key:
+            return False
+        self.done = set(record["done"])
+        return True
+
+    def mark_done(self, index):
+        with self._lock:
+            self.done.add(index)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w") as progress_file:
+                json.dump({**self.key, "done": sorted(self.done)}, progress_file)
+            os.replace(tmp_path, self.path)
+
+    def clear(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def preallocate(fd, size):
+    try:
+        os.posix_fallocate(fd, 0, size)
+    except (AttributeError, OSError):
+        os.ftruncate(fd, size)  # filesystems without fallocate get a sparse file
+
+
+def download_sliced(storage, info, tmp_path, slice_size, workers):
+    # Fetches the object as byte ranges on a thread pool, each written at its offset in a
+    # preallocated tmp_path. Checksums can only be checked once all slices are in.
+    ranges = [(start, min(start + slice_size, info.size)) for start in range(0, info.size, slice_size)]
+    progress = DownloadProgress(f"{tmp_path}.progress.json", info, slice_size)
+    resume = os.path.exists(tmp_path) and os.path.getsize(tmp_path) == info.size and progress.load()
+
+    fd = os.open(tmp_path, os.O_RDWR | os.O_CREAT)
+    try:
+        if not resume:
+            progress.clear()
+            os.ftruncate(fd, 0)
+            preallocate(fd, info.size)
+        pending = [index for index in range(len(ranges)) if index not in progress.done]
+        logger.info(f"Fetching {len(pending)} of {len(ranges)} slices of {info.name} with {workers} threads"
+                    + (" (resumed)" if resume else ""))
+
+        def fetch(index):
+            start, end = ranges[index]
+            data = storage.read_range(info, start, end)
+            if len(data) != end - start:
+                raise ValueError(f"{info.name}: range {start}-{end} returned {len(data)} bytes")
+            os.pwrite(fd, data, start)
+            progress.mark_done(index)
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(fetch, index) for index in pending]
+            try:
+                for future in as_completed(futures):
+                    future.result()
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+    finally:
+        os.close(fd)
+
+    try:
+        verify_file(tmp_path, info)
+    except ValueError:
+        # Some slice is wrong and there is no telling which, start from scratch next time
+        progress.clear()
+        os.remove(tmp_path)
+        raise
+    progress.clear()
+
+
+def download_stream(storage, info, tmp_path):
+    verifier = ChecksumVerifier(info)
+    try:
+        with storage.open(info) as blob_file, open(tmp_path, "wb") as local_file:
+            for chunk in iter(lambda: blob_file.read(CHUNK_SIZE), b""):
+                verifier.update(chunk)
+                local_file.write(chunk)
+        verifier.verify()
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def download_blob(storage, name, path, metadata_path, workers=1, slice_size=DEFAULT_SLICE_SIZE,
+                  sliced_threshold=None, info=None):
+    # Fetches name into path unless the local copy already matches the blob's generation,
+    # size and checksums (recorded in metadata_path). Returns True when it downloaded.
+    # Objects of at least sliced_threshold bytes are fetched in slices by `workers` threads
+    # and resume after an interruption; smaller ones (or all, without a threshold) are
+    # streamed in one request. info skips the stat when a listing already returned it.
+    try:
+        info = info or storage.stat(name)
+        if is_current(read_download_record(metadata_path), {"blob": info.to_dict()}, path):
+            logger.info(f"{path} is up to date with {name} generation {info.generation}, skipping the download")
+            return False
+
+        logger.info(f"Downloading {name} generation {info.generation} ({info.size} bytes) to {path}")
+        tmp_path = f"{path}.part"
+        if sliced_threshold is not None and info.size >= sliced_threshold:
+            download_sliced(storage, info, tmp_path, slice_size, workers)
+        else:
+            download_stream(storage, info, tmp_path)
+        os.replace(tmp_path, path)
+        write_download_record(metadata_path, {"blob": info.to_dict()}, path)
+        return True
+
+    except Exception as e:
+        logger.error(f"Error while downloading {name}: {e}")
+        raise CustomException(f"Failed to download {name}", e)
+
+
+def split_pattern(pattern):
+    # Literal prefix to list and the glob the names must match: "exports/2024-*/hotel_*.csv"
+    # lists "exports/2024-". Without wildcards the pattern is a plain prefix. As in
+    # fnmatch, * also matches "/".
+    wildcards = [pattern.index(char) for char in "*?[" if char in pattern]
+    if not wildcards:
+        return pattern, None
+    return pattern[:min(wildcards)], pattern
+
+
+def list_matching(storage, pattern):
+    prefix, glob = split_pattern(pattern)
+    blobs = [info for info in storage.list(prefix) if glob is None or fnmatch.fnmatchcase(info.name, glob)]
+    if not blobs:
+        raise FileNotFoundError(f"No objects match {pattern}")
+    return sorted(blobs, key=lambda info: info.name)
+
+
+def part_path(parts_dir, name):
+    path = os.path.normpath(os.path.join(parts_dir, name))
+    if not path.startswith(os.path.normpath(parts_dir) + os.sep):
+        raise ValueError(f"Object name {name} points outside {parts_dir}")
+    return path
+
+
+def fetch_part(storage, info, path, download_options):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    start = time.perf_counter()
+    downloaded = download_blob(storage, info.name, path, f"{path}.blob.json", info=info, **download_options)
+    seconds = time.perf_counter() - start
+    return {"name": info.name, "bytes": info.size, "downloaded": downloaded, "seconds": seconds,
+            "mb_per_second": info.size / (1 << 20) / seconds if downloaded and seconds else None}
+
+
+def remove_stale_parts(parts_dir, names):
+    # Deletes the parts of objects that no longer match, with their download records and
+    # unfinished downloads
+    keep = {part_path(parts_dir, name) for name in names}
+    suffixes = (".blob.json", ".part", ".part.progress.json")
+    for directory, _, filenames in os.walk(parts_dir, topdown=False):
+        for filename in filenames:
+            path = os.path.join(directory, filename)
+            owners = {path} | {path[:-len(suffix)] for suffix in suffixes if path.endswith(suffix)}
+            if not owners & keep:
+                logger.info(f"Removing {path}, its object no longer matches")
+                os.remove(path)
+        if directory != parts_dir and not os.listdir(directory):
+            os.rmdir(directory)
+
+
+class CsvConcatenator:
+    # Appends CSV files to one output a chunk at a time, keeping only the first header.
+    # Every file must have the same header.
+
+    def __init__(self, output_file):
+        self.output_file = output_file
+        self.header = None
+
+    def append(self, path):
+        with open(path, "rb") as part:
+            header = part.readline()
+            if not header:
+                return
+            if self.header is None:
+                self.header = header
+                self.output_file.write(header.rstrip(b"\r\n") + b"\n")
+            elif header.rstrip(b"\r\n") != self.header.rstrip(b"\r\n"):
+                raise ValueError(f"{path} has a different header than the first file")
+            last = b"\n"
+            for chunk in iter(lambda: part.read(CHUNK_SIZE), b""):
+                self.output_file.write(chunk)
+                last = chunk[-1:]
+            if last != b"\n":
+                self.output_file.write(b"\n")
+
+
+def download_matching(storage, pattern, path, metadata_path, parts_dir, parallel_files=8, **download_options):
+    # Every object matching pattern, fetched parallel_files at a time into parts_dir (where
+    # unchanged objects are kept and not fetched again) and concatenated in name order into
+    # path while the rest are still downloading. Returns the per-file and total throughput.
+    try:
+        start = time.perf_counter()
+        blobs = list_matching(storage, pattern)
+        source = {"parts": [info.to_dict() for info in blobs]}
+        logger.info(f"{len(blobs)} objects match {pattern}, {sum(info.size for info in blobs)} bytes")
+        if os.path.isdir(parts_dir):
+            remove_stale_parts(parts_dir, [info.name for info in blobs])
+
+        if is_current(read_download_record(metadata_path), source, path):
+            logger.info(f"{path} is up to date with the objects matching {pattern}, skipping the download")
+            files = [{"name": info.name, "bytes": info.size, "downloaded": False, "seconds": 0.0,
+                      "mb_per_second": None} for info in blobs]
+        else:
+            tmp_path = f"{path}.part"
+            with ThreadPoolExecutor(max_workers=parallel_files) as pool, open(tmp_path, "wb") as output_file:
+                futures = [pool.submit(fetch_part, storage, info, part_path(parts_dir, info.name), download_options)
+                           for info in blobs]
+                concatenator = CsvConcatenator(output_file)
+                files = []
+                try:
+                    for info, future in zip(blobs, futures):
+                        files.append(future.result())
+                        concatenator.append(part_path(parts_dir, info.name))
+                except BaseException:
+                    for future in futures:
+                        future.cancel()
+                    output_file.close()
+                    os.remove(tmp_path)
+                    raise
+            os.replace(tmp_path, path)
+            write_download_record(metadata_path, source, path)
+
+        seconds = time.perf_counter() - start
+        downloaded_bytes = sum(entry["bytes"] for entry in files if entry["downloaded"])
+        report = {
+            "files": files,
+            "total_files": len(files),
+            "downloaded_files": sum(entry["downloaded"] for entry in files),
+            "total_bytes": sum(entry["bytes"] for entry in files),
+            "downloaded_bytes": downloaded_bytes,
+            "seconds": seconds,
+            "mb_per_second": downloaded_bytes / (1 << 20) / seconds if seconds else 0.0,
+        }
+        for entry in files:
+            throughput = "unchanged" if entry["mb_per_second"] is None else f"{entry['mb_per_second']:.1f} MB/s"
+            logger.info(f"{entry['name']}: {entry['bytes']} bytes, {entry['seconds']:.2f}s, {throughput}")
+        logger.info(f"Fetched {report['downloaded_files']} of {report['total_files']} objects, "
+                    f"{downloaded_bytes} bytes in {seconds:.2f}s ({report['mb_per_second']:.1f} MB/s)")
+        return report
+
+    except Exception as e:
+        logger.error(f"Error while downloading the objects matching {pattern}: {e}")
+        raise CustomException(f"Failed to download {pattern}", e)
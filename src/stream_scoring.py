@@ -0,0 +1,107 @@
+import csv
+import json
+import math
+
+import numpy as np
+
+from src.logger import get_logger
+from src.features import FEATURE_COLUMNS, build_feature_row
+from src.predictor import score
+
+logger = get_logger(__name__)
+
+
+def _ndjson_records(lines):
+    for line in lines:
+        if isinstance(line, bytes):
+            line = line.decode("utf-8", errors="replace")
+        if line.strip():
+            yield line
+
+
+def _parse_ndjson(line):
+    record = json.loads(line)
+    if not isinstance(record, dict):
+        raise ValueError("Every line must be a JSON object keyed by feature name")
+    return build_feature_row(record)
+
+
+def _csv_records(lines):
+    reader = csv.reader(line.decode("utf-8", errors="replace") if isinstance(line, bytes) else line for line in lines)
+    header = next(reader, None)
+    if header is None:
+        return
+
+    missing = [column for column in FEATURE_COLUMNS if column not in header]
+    if missing:
+        raise ValueError(f"CSV header is missing the columns {missing}")
+
+    for fields in reader:
+        if fields:
+            yield dict(zip(header, fields)) if len(fields) == len(header) else fields
+
+
+def _parse_csv(fields):
+    if not isinstance(fields, dict):
+        raise ValueError(f"Expected {len(fields)} fields to match the header")
+    return build_feature_row(fields)
+
+
+def score_stream(model, lines, input_format="ndjson", chunk_size=1000, executor=None):
+    # Scores an iterable of input lines in fixed-size chunks and yields one result dict per
+    # row, in input order. Rows that cannot be parsed get an error record instead of a score,
+    # so one bad row never fails the stream. Memory is bounded by chunk_size.
+    if input_format == "csv":
+        records, parse = _csv_records(lines), _parse_csv
+    else:
+        records, parse = _ndjson_records(lines), _parse_ndjson
+
+    chunk_rows, chunk_index = [], []
+    pending_errors = []
+    row_number = 0
+
+    def flush():
+        results = {index: error for index, error in pending_errors}
+        if chunk_rows:
+            features = np.array(chunk_rows, dtype=np.float64)
+            if executor is not None:
+                labels, probabilities = executor.score(model, features)
+            else:
+                labels, probabilities = score(model, features)
+            for index, label, probability in zip(chunk_index, labels, probabilities):
+                results[index] = {"row": index, "prediction": label.item(), "probability": probability.item()}
+        for index in sorted(results):
+            yield results[index]
+        chunk_rows.clear()
+        chunk_index.clear()
+        pending_errors.clear()
+
+    records = iter(records)
+    while True:
+        # Only reading the stream is guarded here; a scoring error in flush() is not a bad stream
+        try:
+            record = next(records)
+        except StopIteration:
+            break
+        except ValueError as e:
+            # Errors in the stream itself (e.g. a CSV header without the feature columns)
+            logger.error(f"Stopped scoring stream: {e}")
+            yield from flush()
+            yield {"row": None, "error": str(e)}
+            return
+
+        try:
+            row = parse(record)
+            if not all(math.isfinite(value) for value in row):
+                raise ValueError("Features must be finite numbers")
+            chunk_rows.append(row)
+            chunk_index.append(row_number)
+        except (KeyError, TypeError, ValueError) as e:
+            pending_errors.append((row_number, {"row": row_number, "error": f"{type(e).__name__}: {e}"}))
+        row_number += 1
+
+        if len(chunk_rows) + len(pending_errors) >= chunk_size:
+            yield from flush()
+
+    yield from flush()
+    logger.info(f"Scored a stream of {row_number} rows")
@@ -0,0 +1,317 @@
+import json
+import struct
+
+import numpy as np
+
+from src.logger import get_logger
+from src.custom_exception import CustomException
+
+logger = get_logger(__name__)
+
+# Same encoding LightGBM uses internally for the missing value handling of a split
+MISSING_NONE = 0
+MISSING_ZERO = 1
+MISSING_NAN = 2
+MISSING_TYPES = {"None": MISSING_NONE, "Zero": MISSING_ZERO, "NaN": MISSING_NAN}
+
+# LightGBM treats |x| <= kZeroThreshold as zero when missing_type is Zero
+ZERO_THRESHOLD = 1e-35
+
+ROWS_PER_CHUNK = 4096
+
+# Flat array file for np.memmap, all little-endian:
+#   header:   magic b"HRTA", uint16 format version, uint16 reserved, uint32 metadata length, uint32 data offset
+#   metadata: JSON with the scalars, feature names, classes and the dtype/offset/length of every array
+#   data:     the node arrays back to back, each starting on a 64 byte boundary
+# Loading maps the file read-only, so every process serving the same file shares its page cache pages.
+FLAT_MAGIC = b"HRTA"
+FLAT_FORMAT_VERSION = 1
+FLAT_HEADER = struct.Struct("<4sHHII")
+FLAT_ALIGNMENT = 64
+FLAT_ARRAYS = ("feature", "threshold", "left", "right", "default_left", "missing_type", "value", "roots")
+
+# Bit layout of decision_type in the LightGBM text model format
+CATEGORICAL_MASK = 1
+DEFAULT_LEFT_MASK = 2
+MISSING_TYPE_NAMES = {MISSING_NONE: "None", MISSING_ZERO: "Zero", MISSING_NAN: "NaN"}
+
+
+def parse_model_text(model_text):
+    # Reads a LightGBM text model (Booster.save_model) into the same nested layout
+    # Booster.dump_model() returns, so both sources go through TreeEnsemble.from_dump.
+    header, _, rest = model_text.partition("\nTree=")
+    trees_text = ("Tree=" + rest).split("end of trees")[0]
+
+    fields = dict(line.split("=", 1) for line in header.splitlines() if "=" in line)
+    dump = {
+        "num_tree_per_iteration": int(fields["num_tree_per_iteration"]),
+        "objective": fields["objective"],
+        "feature_names": fields["feature_names"].split(),
+        "tree_info": [],
+    }
+
+    for block in trees_text.split("Tree=")[1:]:
+        tree = dict(line.split("=", 1) for line in block.splitlines() if "=" in line)
+        leaf_value = [float(v) for v in tree["leaf_value"].split()]
+        if int(tree["num_leaves"]) == 1:
+            dump["tree_info"].append({"tree_structure": {"leaf_value": leaf_value[0]}})
+            continue
+
+        split_feature = [int(v) for v in tree["split_feature"].split()]
+        threshold = [float(v) for v in tree["threshold"].split()]
+        decision_type = [int(v) for v in tree["decision_type"].split()]
+        left_child = [int(v) for v in tree["left_child"].split()]
+        right_child = [int(v) for v in tree["right_child"].split()]
+
+        def build(child):
+            # Non-negative children are internal nodes, negative ones encode leaf ~child
+            if child < 0:
+                return {"leaf_value": leaf_value[~child]}
+            flags = decision_type[child]
+            return {
+                "split_feature": split_feature[child],
+                "threshold": threshold[child],
+                "decision_type": "==" if flags & CATEGORICAL_MASK else "<=",
+                "default_left": bool(flags & DEFAULT_LEFT_MASK),
+                "missing_type": MISSING_TYPE_NAMES[(flags >> 2) & 3],
+                "left_child": build(left_child[child]),
+                "right_child": build(right_child[child]),
+            }
+
+        dump["tree_info"].append({"tree_structure": build(0)})
+
+    return dump
+
+
+class TreeEnsemble:
+    # Struct-of-arrays form of a LightGBM binary classifier.
+    # Node i of the flattened forest is described by feature[i], threshold[i],
+    # left[i], right[i], default_left[i], missing_type[i] and value[i].
+    # Leaves have feature -1 and point to themselves, so every tree can be walked
+    # for max_depth levels without checking which rows already reached a leaf.
+
+    def __init__(self, feature, threshold, left, right, default_left, missing_type, value,
+                 roots, max_depth, sigmoid, feature_names, classes):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.default_left = default_left
+        self.missing_type = missing_type
+        self.value = value
+        self.roots = roots
+        self.max_depth = max_depth
+        self.sigmoid = sigmoid
+        self.feature_names = feature_names
+        self.classes_ = classes
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    @property
+    def n_nodes(self):
+        return len(self.feature)
+
+    @classmethod
+    def from_lightgbm(cls, model):
+        # model is the LGBMClassifier saved by ModelTraining (or its booster)
+        booster = model.booster_ if hasattr(model, "booster_") else model
+        classes = np.asarray(getattr(model, "classes_", [0, 1]))
+        return cls.from_dump(booster.dump_model(), classes)
+
+    @classmethod
+    def from_model_text(cls, model_text, classes=(0, 1)):
+        # Builds the arrays from a LightGBM text model file without importing lightgbm
+        return cls.from_dump(parse_model_text(model_text), np.asarray(classes))
+
+    @classmethod
+    def from_dump(cls, dump, classes):
+        # dump has the layout of Booster.dump_model()
+        try:
+            if dump["num_tree_per_iteration"] != 1 or not dump["objective"].startswith("binary"):
+                raise ValueError(f"Only binary models are supported, got objective {dump['objective']}")
+
+            sigmoid = 1.0
+            for token in dump["objective"].split()[1:]:
+                if token.startswith("sigmoid:"):
+                    sigmoid = float(token.split(":")[1])
+
+            nodes = {name: [] for name in ("feature", "threshold", "left", "right",
+                                           "default_left", "missing_type", "value")}
+            roots = []
+            max_depth = 0
+
+            for tree in dump["tree_info"]:
+                roots.append(len(nodes["feature"]))
+                # Iterative pre-order walk, children are patched in once their index is known
+                stack = [(tree["tree_structure"], None, None, 0)]
+                while stack:
+                    node, parent, side, depth = stack.pop()
+                    index = len(nodes["feature"])
+                    if parent is not None:
+                        nodes[side][parent] = index
+
+                    if "split_feature" in node:
+                        if node["decision_type"] != "<=":
+                            raise ValueError("Categorical splits are not supported")
+                        nodes["feature"].append(node["split_feature"])
+                        nodes["threshold"].append(node["threshold"])
+                        nodes["left"].append(-1)
+                        nodes["right"].append(-1)
+                        nodes["default_left"].append(node["default_left"])
+                        nodes["missing_type"].append(MISSING_TYPES[node["missing_type"]])
+                        nodes["value"].append(0.0)
+                        stack.append((node["right_child"], index, "right", depth + 1))
+                        stack.append((node["left_child"], index, "left", depth + 1))
+                    else:
+                        nodes["feature"].append(-1)
+                        nodes["threshold"].append(0.0)
+                        nodes["left"].append(index)
+                        nodes["right"].append(index)
+                        nodes["default_left"].append(True)
+                        nodes["missing_type"].append(MISSING_NONE)
+                        nodes["value"].append(node["leaf_value"])
+                        max_depth = max(max_depth, depth)
+
+            ensemble = cls(
+                feature=np.array(nodes["feature"], dtype=np.int32),
+                threshold=np.array(nodes["threshold"], dtype=np.float64),
+                left=np.array(nodes["left"], dtype=np.int32),
+                right=np.array(nodes["right"], dtype=np.int32),
+                default_left=np.array(nodes["default_left"], dtype=bool),
+                missing_type=np.array(nodes["missing_type"], dtype=np.int8),
+                value=np.array(nodes["value"], dtype=np.float64),
+                roots=np.array(roots, dtype=np.int32),
+                max_depth=max_depth,
+                sigmoid=sigmoid,
+                feature_names=list(dump["feature_names"]),
+                classes=classes
+            )
+            logger.info(f"Exported {ensemble.n_trees} trees with {ensemble.n_nodes} nodes (max depth {max_depth})")
+            return ensemble
+
+        except Exception as e:
+            logger.error(f"Error occurred while exporting the LightGBM trees: {e}")
+            raise CustomException("Failed to export the LightGBM trees", e)
+
+    def save(self, path):
+        np.savez(
+            path,
+            feature=self.feature, threshold=self.threshold, left=self.left, right=self.right,
+            default_left=self.default_left, missing_type=self.missing_type, value=self.value,
+            roots=self.roots, max_depth=self.max_depth, sigmoid=self.sigmoid,
+            feature_names=np.array(self.feature_names), classes=self.classes_
+        )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(
+                feature=data["feature"], threshold=data["threshold"], left=data["left"],
+                right=data["right"], default_left=data["default_left"],
+                missing_type=data["missing_type"], value=data["value"], roots=data["roots"],
+                max_depth=int(data["max_depth"]), sigmoid=float(data["sigmoid"]),
+                feature_names=data["feature_names"].tolist(), classes=data["classes"]
+            )
+
+    def save_flat(self, path, source_sha256=None):
+        # source_sha256 identifies the model file the trees were exported from
+        arrays = {}
+        for name in FLAT_ARRAYS:
+            array = np.asarray(getattr(self, name))
+            arrays[name] = np.ascontiguousarray(array, dtype=array.dtype.newbyteorder("<"))
+        layout, offset = {}, 0
+        for name, array in arrays.items():
+            layout[name] = {"dtype": array.dtype.str, "offset": offset, "length": len(array)}
+            offset += -(-array.nbytes // FLAT_ALIGNMENT) * FLAT_ALIGNMENT
+
+        metadata = json.dumps({
+            "max_depth": self.max_depth,
+            "sigmoid": self.sigmoid,
+            "feature_names": list(self.feature_names),
+            "classes": [c.item() for c in np.asarray(self.classes_)],
+            "source_sha256": source_sha256,
+            "arrays": layout,
+        }).encode()
+        data_offset = -(-(FLAT_HEADER.size + len(metadata)) // FLAT_ALIGNMENT) * FLAT_ALIGNMENT
+
+        with open(path, "wb") as flat_file:
+            flat_file.write(FLAT_HEADER.pack(FLAT_MAGIC, FLAT_FORMAT_VERSION, 0, len(metadata), data_offset))
+            flat_file.write(metadata)
+            for name, array in arrays.items():
+                flat_file.seek(data_offset + layout[name]["offset"])
+                flat_file.write(array.tobytes())
+            flat_file.truncate(data_offset + offset)
+
+    @classmethod
+    def load_flat(cls, path):
+        # Returns (ensemble, source_sha256). The node arrays are read-only views of one
+        # shared memory map, nothing is copied into the process.
+        mapped = np.memmap(path, dtype=np.uint8, mode="r")
+        if len(mapped) < FLAT_HEADER.size:
+            raise ValueError(f"{path} is shorter than the tree file header")
+
+        magic, version, _, metadata_length, data_offset = FLAT_HEADER.unpack_from(mapped)
+        if magic != FLAT_MAGIC:
+            raise ValueError(f"{path} is not a flat tree file")
+        if version != FLAT_FORMAT_VERSION:
+            raise ValueError(f"Unsupported tree file format version {version}, expected {FLAT_FORMAT_VERSION}")
+
+        metadata = json.loads(bytes(mapped[FLAT_HEADER.size:FLAT_HEADER.size + metadata_length]))
+        arrays = {}
+        for name, spec in metadata["arrays"].items():
+            start = data_offset + spec["offset"]
+            dtype = np.dtype(spec["dtype"])
+            if start + spec["length"] * dtype.itemsize > len(mapped):
+                raise ValueError(f"{path} is truncated")
+            arrays[name] = np.frombuffer(mapped, dtype=dtype, count=spec["length"], offset=start)
+
+        ensemble = cls(
+            **arrays,
+            max_depth=metadata["max_depth"],
+            sigmoid=metadata["sigmoid"],
+            feature_names=metadata["feature_names"],
+            classes=np.asarray(metadata["classes"])
+        )
+        return ensemble, metadata["source_sha256"]
+
+    def _leaves(self, X):
+        # Walk every tree for every row one level at a time; returns leaf node ids (rows x trees)
+        rows = np.arange(len(X))[:, None]
+        nodes = np.broadcast_to(self.roots, (len(X), self.n_trees)).copy()
+        check_missing = (self.missing_type != MISSING_NONE).any() or np.isnan(X).any()
+
+        for _ in range(self.max_depth):
+            values = X[rows, self.feature[nodes]]
+            if check_missing:
+                missing_type = self.missing_type[nodes]
+                is_nan = np.isnan(values)
+                # Like LightGBM, NaN counts as 0 unless the split routes NaN explicitly
+                values = np.where(is_nan & (missing_type != MISSING_NAN), 0.0, values)
+                is_missing = ((missing_type == MISSING_ZERO) & (np.abs(values) <= ZERO_THRESHOLD)) | \
+                             ((missing_type == MISSING_NAN) & is_nan)
+                go_left = np.where(is_missing, self.default_left[nodes], values <= self.threshold[nodes])
+            else:
+                go_left = values <= self.threshold[nodes]
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+
+        return nodes
+
+    def predict_raw(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+
+        raw = np.empty(len(X), dtype=np.float64)
+        for start in range(0, len(X), ROWS_PER_CHUNK):
+            chunk = X[start:start + ROWS_PER_CHUNK]
+            raw[start:start + len(chunk)] = self.value[self._leaves(chunk)].sum(axis=1)
+        return raw
+
+    def predict_proba(self, X):
+        positive = 1.0 / (1.0 + np.exp(-self.sigmoid * self.predict_raw(X)))
+        return np.column_stack([1.0 - positive, positive])
+
+    def predict(self, X):
+        return self.classes_[(self.predict_proba(X)[:, 1] > 0.5).astype(int)]
@@ -0,0 +1,76 @@
+import threading
+import time
+
+import application
+from application import app
+from src.admission import AdmissionController, upstream_queue_seconds
+
+BOOKING = {"lead_time": 26, "no_of_special_requests": 0, "avg_price_per_room": 161.0, "arrival_month": 10,
+           "arrival_date": 17, "market_segment_type": 4, "no_of_week_nights": 1, "no_of_weekend_nights": 2,
+           "type_of_meal_plan": 0}
+
+
+def test_sheds_when_the_queue_is_full_or_the_deadline_passes():
+    admission = AdmissionController(max_in_flight=1, max_queue=1, queue_timeout_seconds=0.05)
+    assert admission.acquire() is None
+
+    # One waiter fills the queue, the next request is shed immediately
+    waiter_result = []
+    waiter = threading.Thread(target=lambda: waiter_result.append(admission.acquire()))
+    waiter.start()
+    while admission.stats()["queue_depth"] == 0:
+        time.sleep(0.001)
+    assert admission.acquire() == "queue_full"
+
+    waiter.join()
+    assert waiter_result == ["deadline"]
+    # Time already spent queued upstream counts against the deadline
+    assert admission.acquire(already_waited=1.0) == "deadline"
+    assert admission.stats()["shed"] == {"queue_full": 1, "deadline": 2}
+
+
+def test_a_released_slot_goes_to_the_waiting_request():
+    admission = AdmissionController(max_in_flight=1, max_queue=4, queue_timeout_seconds=5)
+    admission.acquire()
+    waiter_result = []
+    waiter = threading.Thread(target=lambda: waiter_result.append(admission.acquire()))
+    waiter.start()
+    while admission.stats()["queue_depth"] == 0:
+        time.sleep(0.001)
+
+    admission.release()
+    waiter.join()
+    assert waiter_result == [None]
+    assert admission.stats()["in_flight"] == 1
+
+
+def test_upstream_queue_time_from_x_request_start():
+    assert upstream_queue_seconds(None) == 0.0
+    now = 1_700_000_001.0
+    assert abs(upstream_queue_seconds("t=1700000000.250", now=now) - 0.75) < 1e-6
+    # nginx sends microseconds, some proxies milliseconds
+    assert abs(upstream_queue_seconds("t=1700000000250000", now=now) - 0.75) < 1e-6
+    assert abs(upstream_queue_seconds("1700000000250", now=now) - 0.75) < 1e-6
+    assert upstream_queue_seconds("garbage") == 0.0
+
+
+def test_overloaded_app_answers_503_with_retry_after(monkeypatch):
+    overloaded = AdmissionController(0, 0, 0.1)
+    monkeypatch.setattr(application, "admission", overloaded)
+    monkeypatch.setattr(app.wsgi_app, "controller", overloaded)
+    client = app.test_client()
+
+    response = client.post("/predict", json=BOOKING)
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    assert response.get_json()["reason"] == "queue_full"
+
+    assert client.get("/healthz").status_code == 200
+    assert b"admission_shed_queue_full 1" in client.get("/metrics").data
+
+
+def test_admitted_requests_release_their_slot():
+    client = app.test_client()
+    for _ in range(3):
+        assert client.post("/predict", json=BOOKING).status_code == 200
+    assert application.admission.stats()["in_flight"] == 0
@@ -0,0 +1,74 @@
+import asyncio
+import json
+from urllib.parse import urlencode
+
+import asgi_app
+from asgi_app import app, model_registry
+
+BOOKING = {"lead_time": 26, "no_of_special_requests": 0, "avg_price_per_room": 161.0, "arrival_month": 10,
+           "arrival_date": 17, "market_segment_type": 4, "no_of_week_nights": 1, "no_of_weekend_nights": 2,
+           "type_of_meal_plan": 0}
+
+
+async def call(method, path, body=b"", content_type="application/json"):
+    # Drives the ASGI callable the way a server would and returns (status, headers, JSON body)
+    scope = {"type": "http", "method": method, "path": path,
+             "headers": [(b"content-type", content_type.encode())]}
+    messages = [{"type": "http.request", "body": body, "more_body": False}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    await app(scope, receive, send)
+    return sent[0]["status"], dict(sent[0]["headers"]), json.loads(sent[1]["body"])
+
+
+def request(*args, **kwargs):
+    return asyncio.run(call(*args, **kwargs))
+
+
+def test_predict_uses_the_feature_schema():
+    status, _, body = request("POST", "/predict", json.dumps(BOOKING).encode())
+    expected = model_registry.current.model.predict_proba([list(BOOKING.values())])[0, 1]
+    assert status == 200 and body["prediction"] == 1
+    assert abs(body["probability"] - expected) < 1e-12
+    assert body["model_version"] == model_registry.current.version
+
+    status, _, _ = request("POST", "/", urlencode(BOOKING).encode(), "application/x-www-form-urlencoded")
+    assert status == 200
+
+    for bad in ({**BOOKING, "lead_time": True}, {"lead_time": 1}, {**BOOKING, "avg_price_per_room": "NaN"}):
+        status, _, body = request("POST", "/predict", json.dumps(bad).encode())
+        assert status == 400, bad
+
+
+def test_health_and_readiness_follow_the_lifespan(monkeypatch):
+    monkeypatch.setattr(asgi_app, "ready", False)
+    assert request("GET", "/healthz")[0] == 200
+    assert request("GET", "/readyz")[0] == 503
+
+    async def start():
+        events = asyncio.Queue()
+        sent = []
+        await events.put({"type": "lifespan.startup"})
+
+        async def send(message):
+            sent.append(message)
+
+        task = asyncio.create_task(app({"type": "lifespan"}, events.get, send))
+        while not sent:
+            await asyncio.sleep(0.01)
+        task.cancel()
+        return sent
+
+    try:
+        assert asyncio.run(start()) == [{"type": "lifespan.startup.complete"}]
+    finally:
+        model_registry.stop_watching()
+
+    status, _, body = request("GET", "/readyz")
+    assert status == 200 and body["model_version"] == model_registry.current.version
@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+from application import app, model_registry
+from src.features import FEATURE_COLUMNS, build_feature_matrix
+from config.paths_config import PROCESSED_TEST_DATA_PATH
+
+loaded_model = model_registry.current.model
+
+
+def load_bookings(n_rows):
+    return pd.read_parquet(PROCESSED_TEST_DATA_PATH, columns=FEATURE_COLUMNS).head(n_rows)
+
+
+def test_batch_matches_single_row_predictions():
+    bookings = load_bookings(200)
+    client = app.test_client()
+
+    response = client.post("/predict/batch", json={"bookings": bookings.to_dict(orient="records")})
+    assert response.status_code == 200
+
+    body = response.get_json()
+    expected = [int(loaded_model.predict(row.reshape(1, -1))[0]) for row in bookings.to_numpy(dtype=np.float64)]
+    assert body["predictions"] == expected
+    assert len(body["probabilities"]) == len(bookings)
+
+
+def test_batch_accepts_rows_in_feature_order():
+    bookings = load_bookings(5)
+    response = app.test_client().post("/predict/batch", json=bookings.values.tolist())
+    assert response.status_code == 200
+    assert len(response.get_json()["predictions"]) == 5
+
+
+def test_batch_rejects_malformed_bookings():
+    client = app.test_client()
+    assert client.post("/predict/batch", json={"bookings": [{"lead_time": 1}]}).status_code == 400
+    assert client.post("/predict/batch", json={"bookings": []}).status_code == 400
+    assert client.post("/predict/batch", data="not json").status_code == 400
+
+
+def test_feature_matrix_is_contiguous_float():
+    features = build_feature_matrix([[1, 2, 3.5, 4, 5, 6, 7, 8, 0]] * 3)
+    assert features.dtype == np.float64
+    assert features.flags["C_CONTIGUOUS"]
+    assert features.shape == (3, len(FEATURE_COLUMNS))
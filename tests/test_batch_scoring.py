@@ -0,0 +1,36 @@
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from config.paths_config import MODEL_OUTPUT_PATH, PROCESSED_TEST_DATA_PATH
+from pipeline.batch_scoring import score_file
+from src.features import FEATURE_COLUMNS
+from src.inference_engine import ENGINES
+
+
+@pytest.fixture(scope="module")
+def bookings():
+    bookings = pd.read_parquet(PROCESSED_TEST_DATA_PATH, columns=FEATURE_COLUMNS).head(500)
+    # Shuffled ids, so output order is checked against input order and not a sorted column
+    bookings.insert(0, "Booking_ID", [f"INN{i:05d}" for i in np.random.default_rng(0).permutation(len(bookings))])
+    return bookings
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize("suffix", [".csv", ".parquet"])
+def test_scored_file_keeps_row_order_and_matches_the_model(tmp_path, bookings, engine, suffix):
+    input_path, output_path = str(tmp_path / f"input{suffix}"), str(tmp_path / f"output{suffix}")
+    if suffix == ".csv":
+        bookings.to_csv(input_path, index=False)
+    else:
+        bookings.to_parquet(input_path, index=False)
+
+    rows, _ = score_file(input_path, output_path, workers=2, chunk_size=64, id_column="Booking_ID", engine=engine)
+
+    scored = pd.read_csv(output_path) if suffix == ".csv" else pd.read_parquet(output_path)
+    model = joblib.load(MODEL_OUTPUT_PATH)
+    features = bookings[FEATURE_COLUMNS].to_numpy(dtype=np.float64)
+    assert rows == len(bookings)
+    assert scored["Booking_ID"].tolist() == bookings["Booking_ID"].tolist()
+    assert scored["prediction"].tolist() == model.predict(features).tolist()
+    np.testing.assert_allclose(scored["probability"], model.predict_proba(features)[:, 1], rtol=0, atol=1e-9)
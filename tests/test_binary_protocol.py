@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from application import app, model_registry
+from config.paths_config import PROCESSED_TEST_DATA_PATH
+from src import binary_protocol
+from src.features import FEATURE_COLUMNS
+
+
+def load_bookings(n_rows):
+    return pd.read_parquet(PROCESSED_TEST_DATA_PATH, columns=FEATURE_COLUMNS).head(n_rows)
+
+
+def test_float32_round_trip():
+    bookings = load_bookings(100)
+    body = binary_protocol.encode_float32_matrix(bookings.to_numpy())
+
+    features = binary_protocol.decode_float32_matrix(body)
+    assert features.base is not None and not features.flags["OWNDATA"]
+
+    response = app.test_client().post("/predict/binary", data=body, content_type=binary_protocol.FLOAT32_CONTENT_TYPE)
+    assert response.status_code == 200
+
+    _, _, n_columns, n_rows, _ = binary_protocol.HEADER.unpack_from(response.data)
+    probabilities = np.frombuffer(response.data, dtype="<f4", offset=binary_protocol.HEADER.size)
+    assert (n_columns, n_rows) == (1, 100)
+
+    expected = model_registry.current.model.predict_proba(bookings.to_numpy(dtype=np.float32))[:, 1]
+    np.testing.assert_allclose(probabilities, expected, rtol=1e-6)
+
+
+def test_arrow_stream():
+    bookings = load_bookings(50)
+    table = pa.Table.from_pandas(bookings, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+
+    response = app.test_client().post("/predict/binary", data=sink.getvalue().to_pybytes(),
+                                      content_type=binary_protocol.ARROW_CONTENT_TYPE)
+    assert response.status_code == 200
+
+    result = pa.ipc.open_stream(response.data).read_all()
+    expected = model_registry.current.model.predict_proba(bookings.to_numpy(dtype=np.float64))[:, 1]
+    np.testing.assert_allclose(result.column("probability").to_numpy(), expected)
+
+
+def test_rejects_bad_headers():
+    client = app.test_client()
+    body = binary_protocol.encode_float32_matrix(np.zeros((2, len(FEATURE_COLUMNS))))
+
+    assert client.post("/predict/binary", data=body[:-4]).status_code == 400
+    assert client.post("/predict/binary", data=b"XXXX" + body[4:]).status_code == 400
+    wrong_columns = binary_protocol.encode_float32_matrix(np.zeros((2, 3)))
+    assert client.post("/predict/binary", data=wrong_columns).status_code == 400
@@ -0,0 +1,83 @@
+import time
+from functools import partial
+
+import pytest
+from src.custom_exception import CustomException
+from src.dag_executor import critical_path, dependencies, run_dag, select_groups, topological_order
+from src.stage_cache import Stage
+
+
+def concat(inputs, output, delay=0.0):
+    time.sleep(delay)
+    with open(output, "w") as output_file:
+        output_file.write("+".join(open(path).read() for path in inputs) or "seed")
+
+
+def fail():
+    raise RuntimeError("disk full")
+
+
+def make_stages(tmp_path, delay=0.0):
+    raw, left, right, joined = (str(tmp_path / name) for name in ("raw", "left", "right", "joined"))
+    return [
+        Stage("load", partial(concat, [], raw), inputs=[], outputs=[raw], group="ingestion"),
+        Stage("left", partial(concat, [raw], left, delay), inputs=[raw], outputs=[left], group="processing"),
+        Stage("right", partial(concat, [raw], right, delay), inputs=[raw], outputs=[right], group="processing"),
+        Stage("join", partial(concat, [left, right], joined), inputs=[left, right], outputs=[joined],
+              group="training"),
+    ]
+
+
+def test_runs_stages_in_dependency_order(tmp_path):
+    report = run_dag(make_stages(tmp_path), workers=2)
+
+    assert (tmp_path / "joined").read_text() == "seed+seed"
+    assert list(report["stages"]) == ["load", "left", "right", "join"]
+    assert report["critical_path"][0] == "load" and report["critical_path"][-1] == "join"
+
+    report = run_dag(make_stages(tmp_path), workers=2)
+    assert {timing["status"] for timing in report["stages"].values()} == {"cached"}
+
+
+def test_independent_stages_run_concurrently(tmp_path):
+    report = run_dag(make_stages(tmp_path, delay=0.5), workers=2)
+
+    left, right = report["stages"]["left"], report["stages"]["right"]
+    assert abs(left["started_seconds"] - right["started_seconds"]) < 0.4
+    assert report["critical_path_seconds"] < report["total_stage_seconds"]
+
+
+def test_from_to_selects_stages_and_reuses_earlier_outputs(tmp_path):
+    stages = make_stages(tmp_path)
+    run_dag(stages, workers=1)
+    (tmp_path / "raw").write_text("edited")
+
+    selected = select_groups(stages, "processing", "processing")
+    report = run_dag(stages, workers=1, selected=selected)
+
+    assert list(report["stages"]) == ["left", "right"]
+    assert (tmp_path / "left").read_text() == "edited"
+    assert (tmp_path / "joined").read_text() == "seed+seed"
+    with pytest.raises(ValueError):
+        select_groups(stages, "training", "ingestion")
+
+
+def test_failed_stage_stops_the_pipeline(tmp_path):
+    stages = make_stages(tmp_path)
+    stages[1] = Stage("left", fail, inputs=stages[1].inputs, outputs=stages[1].outputs, group="processing")
+
+    with pytest.raises(CustomException):
+        run_dag(stages, workers=2)
+    assert not (tmp_path / "joined").exists()
+    assert not (tmp_path / "left.stage.json").exists()
+
+
+def test_cycles_and_critical_path():
+    a = Stage("a", fail, inputs=["y"], outputs=["x"])
+    b = Stage("b", fail, inputs=["x"], outputs=["y"])
+    with pytest.raises(ValueError):
+        topological_order([a, b], dependencies([a, b]))
+
+    deps = {"a": set(), "b": {"a"}, "c": {"a"}, "d": {"b", "c"}}
+    timings = {name: {"duration_seconds": seconds} for name, seconds in zip("abcd", [1.0, 5.0, 2.0, 1.0])}
+    assert critical_path(timings, deps) == (["a", "b", "d"], 7.0)
@@ -0,0 +1,41 @@
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+from config.paths_config import PROCESSED_TRAIN_DATA_PATH, TRAIN_FILE_PATH
+from src.custom_exception import CustomException
+from src.data_schema import RAW_SCHEMA, processed_schema
+from src.features import FEATURE_COLUMNS
+from utils.common_functions import load_data, save_parquet
+
+
+def test_artifacts_are_stored_with_the_declared_schema():
+    assert pq.read_schema(TRAIN_FILE_PATH).remove_metadata() == RAW_SCHEMA
+
+    processed = pq.read_schema(PROCESSED_TRAIN_DATA_PATH)
+    assert "Unnamed: 0" not in processed.names
+    assert set(FEATURE_COLUMNS) <= set(processed.names)
+
+
+def test_round_trip_keeps_types_and_drops_the_index(tmp_path):
+    df = pd.DataFrame({"market_segment_type": [1, 4], "lead_time": [26, 3], "avg_price_per_room": [161.0, 70.5]},
+                      index=[10, 20])
+    schema = processed_schema(df, ["market_segment_type"])
+    path = str(tmp_path / "part.parquet")
+
+    save_parquet(df, path, schema)
+    loaded = load_data(path)
+
+    assert list(loaded.columns) == ["market_segment_type", "lead_time", "avg_price_per_room"]
+    assert list(loaded.index) == [0, 1]
+    assert loaded.dtypes.astype(str).tolist() == ["int64", "int64", "float64"]
+    assert load_data(path, columns=["lead_time"]).columns.tolist() == ["lead_time"]
+
+
+def test_lossy_or_undeclared_columns_are_rejected(tmp_path):
+    schema = processed_schema(pd.DataFrame({"market_segment_type": [1]}), ["market_segment_type"])
+    path = str(tmp_path / "part.parquet")
+
+    with pytest.raises(CustomException):
+        save_parquet(pd.DataFrame({"market_segment_type": [1.5]}), path, schema)
+    with pytest.raises(CustomException):
+        save_parquet(pd.DataFrame({"unknown": [1]}), path, schema)
@@ -0,0 +1,76 @@
+from concurrent.futures import Future
+
+import application
+from application import app, model_registry
+from src.prediction_cache import PredictionCache
+
+BOOKING = {"lead_time": 26, "no_of_special_requests": 0, "avg_price_per_room": 161.0, "arrival_month": 10,
+           "arrival_date": 17, "market_segment_type": 4, "no_of_week_nights": 1, "no_of_weekend_nights": 2,
+           "type_of_meal_plan": 0}
+
+
+def test_json_route_returns_label_probability_and_version():
+    body = app.test_client().post("/predict", json=BOOKING).get_json()
+
+    expected = model_registry.current.model.predict_proba([list(BOOKING.values())])[0, 1]
+    assert body["prediction"] == 1
+    assert abs(body["probability"] - expected) < 1e-12
+    assert body["model_version"] == model_registry.current.version
+
+
+def test_index_negotiates_json():
+    client = app.test_client()
+
+    assert client.post("/", json=BOOKING).get_json()["prediction"] == 1
+    response = client.post("/", data=BOOKING, headers={"Accept": "application/json"})
+    assert response.get_json()["prediction"] == 1
+
+    html = client.post("/", data=BOOKING)
+    assert html.mimetype == "text/html"
+
+
+def test_json_route_rejects_bad_payloads():
+    client = app.test_client()
+    assert client.post("/predict", json={"lead_time": 1}).status_code == 400
+    assert client.post("/predict", json={**BOOKING, "lead_time": "soon"}).status_code == 400
+    assert client.post("/predict", json=[1, 2, 3]).status_code == 400
+    assert client.post("/predict", data="{", content_type="application/json").status_code == 400
+
+
+class StalledBatcher:
+    # Accepts rows but never scores them
+
+    def predict(self, row, timeout=None):
+        return Future().result(timeout=timeout)
+
+
+def test_stalled_batcher_answers_503(monkeypatch):
+    monkeypatch.setattr(application, "batcher", StalledBatcher())
+    monkeypatch.setattr(application, "prediction_cache", None)
+    monkeypatch.setitem(application.batching_config, "request_timeout_seconds", 0.05)
+    client = app.test_client()
+
+    response = client.post("/predict", json=BOOKING)
+    assert response.status_code == 503 and response.headers["Retry-After"] == "1"
+    response = client.post("/", data=BOOKING)
+    assert response.status_code == 503 and response.headers["Retry-After"] == "1"
+
+
+class SwappedBatcher:
+    # Scores with a model newer than the handle the request took
+
+    def predict(self, row, timeout=None):
+        return 0, 0.25, "reloaded"
+
+
+def test_cache_and_response_use_the_version_that_scored(monkeypatch):
+    cache = PredictionCache()
+    monkeypatch.setattr(application, "batcher", SwappedBatcher())
+    monkeypatch.setattr(application, "prediction_cache", cache)
+
+    body = app.test_client().post("/predict", json=BOOKING).get_json()
+
+    assert body["model_version"] == "reloaded"
+    row = application.feature_schema.fill(BOOKING)[0]
+    assert cache.get(PredictionCache.make_key("reloaded", row)) == (0, 0.25, "reloaded")
+    assert cache.get(PredictionCache.make_key(model_registry.current.version, row)) is None
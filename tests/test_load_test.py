@@ -0,0 +1,75 @@
+import json
+import threading
+import time
+
+import pytest
+from werkzeug.serving import make_server
+
+from application import app
+from benchmarks.load_test import Recorder, load_replay, run
+
+BOOKING = {"lead_time": 26, "no_of_special_requests": 0, "avg_price_per_room": 161.0, "arrival_month": 10,
+           "arrival_date": 17, "market_segment_type": 4, "no_of_week_nights": 1, "no_of_weekend_nights": 2,
+           "type_of_meal_plan": 0}
+
+
+@pytest.fixture(scope="module")
+def server_url():
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+
+
+def test_corrected_latency_counts_time_behind_schedule():
+    recorder = Recorder(measure_from=0.0)
+    # Scheduled at t=1 but only sent at t=3 because the previous request stalled
+    recorder.record(intended=1.0, sent=3.0, done=3.5, status=200)
+    recorder.record(intended=4.0, sent=4.0, done=4.1, status=503)
+
+    assert recorder.corrected == [2.5]
+    assert recorder.uncorrected == [0.5]
+    assert dict(recorder.errors) == {"503": 1}
+
+
+@pytest.mark.parametrize("mode, rate", [("closed", None), ("open", 50.0)])
+def test_replays_requests_against_the_app(tmp_path, server_url, mode, rate):
+    replay = tmp_path / "replay.jsonl"
+    replay.write_text(json.dumps(BOOKING) + "\n" + json.dumps({"path": "/predict/batch", "body": [BOOKING]}) + "\n")
+
+    result = run(server_url, mode, connections=2, duration=0.5, rate=rate, requests=load_replay(replay))
+
+    assert result["completed"] > 0
+    assert result["error_rate"] == 0.0
+    assert result["latency"]["corrected"]["count"] == result["completed"]
+    json.dumps(result)
+
+
+def slow_app(environ, start_response):
+    # 50 ms per request on a single thread: the server can answer about 20 requests a second
+    time.sleep(0.05)
+    start_response("200 OK", [("Content-Type", "application/json"), ("Content-Length", "2")])
+    return [b"{}"]
+
+
+@pytest.fixture
+def slow_server_url():
+    server = make_server("127.0.0.1", 0, slow_app)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+
+
+@pytest.mark.parametrize("mode", ["open", "closed"])
+def test_overloaded_server_reports_what_it_served(slow_server_url, mode):
+    start = time.perf_counter()
+    result = run(slow_server_url, mode, connections=1, duration=1.0, rate=100.0, requests=[("/predict", b"{}")])
+    elapsed = time.perf_counter() - start
+
+    # Sending stops at the deadline instead of working through the whole schedule
+    assert elapsed < 1.5
+    assert 10 <= result["throughput_rps"] <= 25
+    assert result["unfinished"]["dropped"] > 50
+    assert result["measured_seconds"] <= 1.0
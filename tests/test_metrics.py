@@ -0,0 +1,69 @@
+import threading
+
+from application import app
+from src.metrics import Histogram, ServingMetrics
+
+
+def test_histogram_percentiles():
+    histogram = Histogram([0.001, 0.01, 0.1, 1])
+    for _ in range(90):
+        histogram.observe(0.0005)
+    for _ in range(10):
+        histogram.observe(0.05)
+
+    snapshot = histogram.snapshot()
+    assert snapshot["count"] == 100
+    assert snapshot["p50"] == 0.001
+    assert snapshot["p99"] == 0.1
+
+
+def test_prometheus_exposition():
+    metrics = ServingMetrics(namespace="test")
+    metrics.request_started()
+    timer = metrics.timer("/")
+    timer.stage("parse")
+    timer.stage("predict")
+    metrics.count_predictions([0, 1, 1])
+    metrics.request_finished("/", 0.002)
+
+    body = metrics.render_prometheus("abc123")
+    assert 'test_stage_seconds_count{route="/",stage="parse"} 1' in body
+    assert 'test_request_seconds_bucket{route="/",le="+Inf"} 1' in body
+    assert 'test_predictions_total{class="1"} 2' in body
+    assert "test_requests_in_flight 0" in body
+    assert 'test_model_info{version="abc123"} 1' in body
+
+
+def test_metrics_endpoint_reports_request_stages():
+    client = app.test_client()
+    client.post("/predict/batch", json=[[26, 0, 161.0, 10, 17, 4, 1, 2, 0]])
+
+    body = client.get("/metrics").get_data(as_text=True)
+    assert 'stage_seconds_count{route="/predict/batch",stage="predict"}' in body
+    assert "predictions_total" in body
+
+
+def test_threads_record_separately_and_scrapes_add_them_up():
+    metrics = ServingMetrics(namespace="test")
+
+    def serve(requests):
+        for _ in range(requests):
+            metrics.request_started()
+            timer = metrics.timer("/predict")
+            timer.stage("predict")
+            metrics.count_predictions(1)
+            metrics.request_finished("/predict", 0.001)
+
+    threads = [threading.Thread(target=serve, args=(250,)) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    metrics.request_started()
+
+    body = metrics.render_prometheus("abc123")
+    # The four exited threads are folded together, only the running one keeps its shard
+    assert len(metrics.shards) == 1
+    assert 'test_stage_seconds_count{route="/predict",stage="predict"} 1000' in body
+    assert 'test_predictions_total{class="1"} 1000' in body
+    assert "test_requests_in_flight 1" in body
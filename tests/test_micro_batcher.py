@@ -0,0 +1,40 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import joblib
+import numpy as np
+import pandas as pd
+from config.paths_config import MODEL_OUTPUT_PATH, PROCESSED_TEST_DATA_PATH
+from src.features import FEATURE_COLUMNS
+from src.micro_batcher import MicroBatcher
+
+
+def test_concurrent_rows_get_their_own_result():
+    model = joblib.load(MODEL_OUTPUT_PATH)
+    rows = pd.read_parquet(PROCESSED_TEST_DATA_PATH, columns=FEATURE_COLUMNS).head(300).to_numpy(dtype=np.float64)
+    expected = model.predict(rows)
+
+    batcher = MicroBatcher(model, max_batch_size=32, flush_interval_ms=5, max_queue_size=1000)
+    try:
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            results = list(pool.map(lambda row: batcher.predict(row, timeout=10), rows))
+    finally:
+        batcher.stop()
+
+    assert [label for label, _, _ in results] == expected.tolist()
+
+    stats = batcher.stats()
+    assert stats["batch_size"]["count"] < len(rows)
+    assert stats["wait_time_seconds"]["count"] == len(rows)
+
+
+def test_results_carry_the_version_that_scored_them():
+    model = joblib.load(MODEL_OUTPUT_PATH)
+    row = pd.read_parquet(PROCESSED_TEST_DATA_PATH, columns=FEATURE_COLUMNS).head(1).to_numpy(dtype=np.float64)[0]
+
+    batcher = MicroBatcher(model, flush_interval_ms=1, version="v1")
+    try:
+        assert batcher.predict(row, timeout=10)[2] == "v1"
+        batcher.use_model(model, "v2")
+        assert batcher.predict(row, timeout=10)[2] == "v2"
+    finally:
+        batcher.stop()
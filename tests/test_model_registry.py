@@ -0,0 +1,54 @@
+import shutil
+
+import joblib
+from config.paths_config import MODEL_OUTPUT_PATH
+from src.model_registry import ModelRegistry
+
+
+def test_swaps_in_a_changed_artifact(tmp_path):
+    model_path = tmp_path / "model.pkl"
+    shutil.copy(MODEL_OUTPUT_PATH, model_path)
+
+    registry = ModelRegistry(str(model_path), poll_interval_seconds=0.01)
+    swapped = []
+    registry.add_listener(swapped.append)
+    old_handle = registry.current
+
+    assert registry.check_for_update() is False
+
+    # Same model, different bytes on disk, so a new version
+    joblib.dump(joblib.load(model_path), model_path, compress=3)
+    assert registry.check_for_update() is True
+
+    assert registry.current.version != old_handle.version
+    assert swapped == [registry.current]
+    assert registry.status()["reloads"] == 1
+    # A request holding the old handle can still finish on it
+    assert old_handle.model.predict([[26, 0, 161.0, 10, 17, 4, 1, 2, 0]])[0] == 1
+
+
+def test_keeps_serving_when_the_new_artifact_is_broken(tmp_path):
+    model_path = tmp_path / "model.pkl"
+    shutil.copy(MODEL_OUTPUT_PATH, model_path)
+    registry = ModelRegistry(str(model_path))
+    version = registry.current.version
+
+    model_path.write_bytes(b"half written")
+    assert registry.check_for_update() is False
+    assert registry.current.version == version
+    assert registry.status()["last_reload_error"] is not None
+
+
+def test_follows_a_version_pointer(tmp_path):
+    first, second = tmp_path / "v1.pkl", tmp_path / "v2.pkl"
+    shutil.copy(MODEL_OUTPUT_PATH, first)
+    joblib.dump(joblib.load(first), second, compress=3)
+
+    pointer = tmp_path / "CURRENT"
+    pointer.write_text(str(first))
+    registry = ModelRegistry(MODEL_OUTPUT_PATH, pointer_path=str(pointer))
+    assert registry.current.path == str(first)
+
+    pointer.write_text(str(second))
+    assert registry.check_for_update() is True
+    assert registry.current.path == str(second)
@@ -0,0 +1,53 @@
+import os
+import time
+
+from src.prediction_cache import PredictionCache
+
+
+def test_lru_eviction_and_counters():
+    cache = PredictionCache(max_size=2)
+    a = PredictionCache.make_key("v1", [1, 2, 161])
+    b = PredictionCache.make_key("v1", [1, 2, 162])
+    c = PredictionCache.make_key("v1", [1, 2, 163])
+
+    cache.put(a, 0)
+    cache.put(b, 1)
+    assert cache.get(a) == 0  # a is now most recently used
+    cache.put(c, 1)
+
+    assert cache.get(b) is None
+    assert cache.get(PredictionCache.make_key("v1", [1.0, 2.0, 161.0])) == 0
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"]) == (2, 1, 1)
+
+
+def test_model_version_is_part_of_the_key():
+    cache = PredictionCache()
+    cache.put(PredictionCache.make_key("v1", [1, 2]), 1)
+    assert cache.get(PredictionCache.make_key("v2", [1, 2])) is None
+
+
+def test_ttl_expiry():
+    cache = PredictionCache(ttl_seconds=0.01)
+    key = PredictionCache.make_key("v1", [1])
+    cache.put(key, 1)
+    time.sleep(0.02)
+    assert cache.get(key) is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_cleared_when_model_artifact_changes(tmp_path):
+    model_path = tmp_path / "model.pkl"
+    model_path.write_bytes(b"old model")
+
+    cache = PredictionCache(model_path=str(model_path), check_interval_seconds=0)
+    key = PredictionCache.make_key("v1", [1])
+    cache.put(key, 1)
+    assert cache.get(key) == 1
+
+    model_path.write_bytes(b"retrained model")
+    os.utime(model_path, ns=(0, time.time_ns() + 10**9))
+
+    assert cache.get(key) is None
+    assert cache.stats()["invalidations"] == 1
@@ -0,0 +1,53 @@
+import threading
+import time
+
+import numpy as np
+import src.prediction_executor as prediction_executor
+from src.prediction_executor import PredictionExecutor
+
+
+def test_threads_for_scales_with_batch_size_up_to_the_budget():
+    executor = PredictionExecutor(max_workers=2, thread_budget=4, rows_per_thread=100)
+
+    assert executor.threads_for(1) == 1
+    assert executor.threads_for(100) == 1
+    assert executor.threads_for(101) == 2
+    assert executor.threads_for(10_000) == 4
+    executor.shutdown()
+
+
+def test_budget_is_shared_between_serving_processes():
+    assert PredictionExecutor(thread_budget=8, processes=4).thread_budget == 2
+    assert PredictionExecutor(thread_budget=2, processes=4).thread_budget == 1
+
+
+def test_concurrent_calls_never_exceed_the_budget(monkeypatch):
+    lock = threading.Lock()
+    in_use = []
+    granted = []
+    peak = []
+
+    def slow_score(model, features, num_threads):
+        with lock:
+            in_use.append(num_threads)
+            granted.append(num_threads)
+            peak.append(sum(in_use))
+        time.sleep(0.05)
+        with lock:
+            in_use.remove(num_threads)
+        return np.zeros(len(features)), np.zeros(len(features))
+
+    monkeypatch.setattr(prediction_executor, "score", slow_score)
+    executor = PredictionExecutor(max_workers=4, thread_budget=4, rows_per_thread=10)
+
+    # One big batch alone gets the whole budget
+    executor.score(None, np.zeros((100, 3)))
+    assert granted == [4]
+
+    futures = [executor.submit(None, np.zeros((30, 3))) for _ in range(8)]
+    for future in futures:
+        future.result()
+    executor.shutdown()
+
+    assert max(peak) <= 4
+    assert executor.threads_in_use == 0
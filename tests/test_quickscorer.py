@@ -0,0 +1,27 @@
+import joblib
+import numpy as np
+import pandas as pd
+from config.paths_config import MODEL_OUTPUT_PATH, PROCESSED_TEST_DATA_PATH
+from src.features import FEATURE_COLUMNS
+from src.quickscorer import QuickScorer
+
+
+def test_parity_with_lightgbm_booster():
+    model = joblib.load(MODEL_OUTPUT_PATH)
+    X = pd.read_parquet(PROCESSED_TEST_DATA_PATH, columns=FEATURE_COLUMNS).to_numpy(dtype=np.float64)
+
+    scorer = QuickScorer.from_lightgbm(model)
+
+    np.testing.assert_allclose(scorer.predict_raw(X), model.booster_.predict(X, raw_score=True), rtol=0, atol=1e-10)
+    np.testing.assert_array_equal(scorer.predict(X), model.predict(X))
+
+
+def test_values_on_thresholds_go_left():
+    model = joblib.load(MODEL_OUTPUT_PATH)
+    scorer = QuickScorer.from_lightgbm(model)
+
+    # Rows whose values sit exactly on split thresholds exercise the x <= threshold boundary
+    rng = np.random.default_rng(0)
+    X = np.column_stack([rng.choice(thresholds, size=500) for thresholds in scorer.feature_thresholds])
+
+    np.testing.assert_allclose(scorer.predict_raw(X), model.booster_.predict(X, raw_score=True), rtol=0, atol=1e-10)
@@ -0,0 +1,19 @@
+import application
+from application import app
+
+
+def test_healthz_and_readyz_after_warmup():
+    client = app.test_client()
+
+    assert client.get("/healthz").status_code == 200
+    response = client.get("/readyz")
+    assert response.status_code == 200
+    assert response.get_json()["model_version"] == application.model_registry.current.version
+
+
+def test_readyz_reports_not_ready_before_warmup(monkeypatch):
+    monkeypatch.setattr(application, "ready", False)
+
+    response = app.test_client().get("/readyz")
+    assert response.status_code == 503
+    assert response.get_json()["warmed_up"] is False
@@ -0,0 +1,47 @@
+import gc
+import multiprocessing
+import threading
+from types import SimpleNamespace
+
+from serve import PreforkServer, build_options, post_fork, pre_fork
+
+PREFORK_CONFIG = {"workers": 3, "threads": 4, "bind": "127.0.0.1:0", "timeout_seconds": 30, "max_requests": 0}
+
+
+def test_options_install_the_fork_hooks():
+    server = PreforkServer(build_options(PREFORK_CONFIG))
+
+    assert server.cfg.workers == 3 and server.cfg.preload_app
+    assert server.cfg.pre_fork is pre_fork and server.cfg.post_fork is post_fork
+
+
+def test_pre_fork_freezes_the_heap():
+    try:
+        pre_fork(None, None)
+        assert gc.get_freeze_count() > 0
+    finally:
+        gc.unfreeze()
+
+
+def worker_threads(results):
+    # Threads do not survive fork: list them before and after the hook in the forked child
+    before = {thread.name for thread in threading.enumerate()}
+    post_fork(None, SimpleNamespace(pid=multiprocessing.current_process().pid))
+    after = {thread.name for thread in threading.enumerate()}
+    results.put((before, after))
+
+
+def test_post_fork_restarts_background_threads_in_the_worker():
+    import application  # loaded in this process like the prefork master does
+
+    context = multiprocessing.get_context("fork")
+    results = context.Queue()
+    child = context.Process(target=worker_threads, args=(results,))
+    child.start()
+    before, after = results.get(timeout=60)
+    child.join(timeout=60)
+
+    assert child.exitcode == 0
+    assert "micro-batcher" not in before and "model-watcher" not in before
+    assert {"micro-batcher", "model-watcher"} <= after
+    assert application.batching_config["enabled"] and application.reload_config["enabled"]
@@ -0,0 +1,62 @@
+import json
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from config.paths_config import MODEL_OUTPUT_PATH, PROCESSED_TEST_DATA_PATH, PROCESSED_TRAIN_DATA_PATH
+from src.features import FEATURE_COLUMNS
+from src.predictor import load_model
+from src.serving_artifact import save_serving_artifact
+from src.tree_engine import TreeEnsemble
+
+
+@pytest.fixture(scope="module")
+def saved(tmp_path_factory):
+    model = joblib.load(MODEL_OUTPUT_PATH)
+    manifest_path = save_serving_artifact(model, str(tmp_path_factory.mktemp("serving")),
+                                          PROCESSED_TRAIN_DATA_PATH, {"accuracy": 0.9})
+    return model, manifest_path
+
+
+@pytest.mark.parametrize("engine", ["lightgbm", "numpy", "quickscorer"])
+def test_serving_artifact_matches_the_pickled_model(saved, engine):
+    model, manifest_path = saved
+    X = pd.read_parquet(PROCESSED_TEST_DATA_PATH, columns=FEATURE_COLUMNS).head(500).to_numpy(dtype=np.float64)
+
+    served, version = load_model(manifest_path, engine)
+
+    np.testing.assert_allclose(served.predict_proba(X), model.predict_proba(X), rtol=0, atol=1e-12)
+    np.testing.assert_array_equal(served.predict(X), model.predict(X))
+    with open(manifest_path) as manifest_file:
+        manifest = json.load(manifest_file)
+    assert version == manifest["model_version"]
+    assert manifest["feature_names"] == FEATURE_COLUMNS
+    assert manifest["metrics"] == {"accuracy": 0.9}
+
+
+def test_text_model_builds_the_same_trees(saved):
+    model, manifest_path = saved
+    with open(manifest_path.replace("manifest.json", "model.txt")) as model_file:
+        from_text = TreeEnsemble.from_model_text(model_file.read())
+    from_booster = TreeEnsemble.from_lightgbm(model)
+
+    for field in ("feature", "threshold", "left", "right", "default_left", "missing_type", "value", "roots"):
+        np.testing.assert_array_equal(getattr(from_text, field), getattr(from_booster, field))
+
+
+def test_rejects_a_model_file_that_does_not_match_the_manifest(tmp_path):
+    manifest_path = save_serving_artifact(joblib.load(MODEL_OUTPUT_PATH), str(tmp_path), PROCESSED_TRAIN_DATA_PATH)
+    with open(tmp_path / "model.txt", "a") as model_file:
+        model_file.write("\n")
+
+    with pytest.raises(ValueError, match="does not match"):
+        load_model(manifest_path)
+
+
+def test_rejects_a_tree_file_exported_from_another_model(tmp_path):
+    manifest_path = save_serving_artifact(joblib.load(MODEL_OUTPUT_PATH), str(tmp_path), PROCESSED_TRAIN_DATA_PATH)
+    TreeEnsemble.from_lightgbm(joblib.load(MODEL_OUTPUT_PATH)).save_flat(tmp_path / "trees.bin", "0" * 64)
+
+    with pytest.raises(ValueError, match="different model"):
+        load_model(manifest_path, "numpy")
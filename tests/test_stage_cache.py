@@ -0,0 +1,90 @@
+import json
+
+import pytest
+from src.stage_cache import Stage
+
+
+@pytest.fixture
+def files(tmp_path):
+    source = tmp_path / "input.txt"
+    source.write_text("1,2,3")
+    code = tmp_path / "stage_code.py"
+    code.write_text("VERSION = 1")
+    return source, code, tmp_path / "output.txt"
+
+
+def make_stage(files, calls, config=None):
+    source, code, output = files
+
+    def run():
+        calls.append(1)
+        output.write_text(source.read_text().upper())
+
+    return Stage("copy", run, inputs=[str(source)], outputs=[str(output)], code=[str(code)],
+                 config=config or {"ratio": 0.8}, packages=["pandas"])
+
+
+def run_once(stage, force=False):
+    # What run_dag does with one stage, in this process; True when the stage ran
+    fingerprint, components, reasons = stage.check(force)
+    if not reasons:
+        return False
+    stage.invalidate()
+    stage.run()
+    stage.save_record(fingerprint, components, 0.0)
+    return True
+
+
+def test_unchanged_stage_is_skipped(files):
+    calls = []
+    assert run_once(make_stage(files, calls)) is True
+    assert run_once(make_stage(files, calls)) is False
+    assert len(calls) == 1
+
+    record = json.loads((files[2].parent / "copy.stage.json").read_text())
+    assert set(record["inputs"]) == {str(files[0])}
+    assert "pandas" in record["packages"]
+
+
+@pytest.mark.parametrize("change", ["input", "code", "config", "output", "deleted output"])
+def test_changes_invalidate_the_stage(files, change):
+    source, code, output = files
+    calls = []
+    run_once(make_stage(files, calls))
+
+    config = None
+    if change == "input":
+        source.write_text("4,5,6")
+    elif change == "code":
+        code.write_text("VERSION = 2")
+    elif change == "config":
+        config = {"ratio": 0.7}
+    elif change == "output":
+        output.write_text("edited by hand")
+    else:
+        output.unlink()
+
+    assert run_once(make_stage(files, calls, config)) is True
+    assert len(calls) == 2
+
+
+def test_force_and_invalidate_rerun_the_stage(files):
+    calls = []
+    stage = make_stage(files, calls)
+    run_once(stage)
+
+    assert run_once(stage, force=True) is True
+    stage.invalidate()
+    assert run_once(stage) is True
+    assert len(calls) == 3
+
+
+def test_check_reports_why_a_stage_runs(files):
+    calls = []
+    stage = make_stage(files, calls)
+    assert stage.check()[2] == ["no record of a previous run"]
+
+    run_once(stage)
+    files[1].write_text("VERSION = 2")
+    assert stage.check()[2] == [f"code changed: {files[1]}"]
+    assert stage.check(force=True)[2] == ["forced"]
@@ -0,0 +1,216 @@
+import io
+import os
+from pathlib import Path
+
+import pytest
+from src.custom_exception import CustomException
+from src.storage import GCSStorage, LocalStorage, download_blob, download_matching, open_storage, split_pattern
+
+CSV = b"Booking_ID,lead_time\nINN00001,224\nINN00002,5\n"
+
+
+class CountingStorage(LocalStorage):
+    # Local fake bucket that counts transfers and can hand out corrupted bytes
+
+    def __init__(self, root):
+        super().__init__(root)
+        self.opened = 0
+        self.corrupt = False
+
+    def open(self, info):
+        self.opened += 1
+        blob_file = super().open(info)
+        if not self.corrupt:
+            return blob_file
+        data = bytearray(blob_file.read())
+        blob_file.close()
+        data[0] ^= 0xFF
+        return io.BytesIO(bytes(data))
+
+
+@pytest.fixture
+def bucket(tmp_path):
+    (tmp_path / "bucket").mkdir()
+    (tmp_path / "bucket" / "bookings.csv").write_bytes(CSV)
+    storage = CountingStorage(str(tmp_path / "bucket"))
+    paths = str(tmp_path / "raw.csv"), str(tmp_path / "raw.csv.blob.json")
+    return storage, paths
+
+
+def test_unchanged_blob_is_not_downloaded_again(bucket):
+    storage, (path, metadata_path) = bucket
+
+    assert download_blob(storage, "bookings.csv", path, metadata_path) is True
+    assert download_blob(storage, "bookings.csv", path, metadata_path) is False
+    assert storage.opened == 1
+    assert open(path, "rb").read() == CSV
+
+
+def test_new_generation_or_edited_copy_is_fetched(bucket):
+    storage, (path, metadata_path) = bucket
+    download_blob(storage, "bookings.csv", path, metadata_path)
+
+    blob_path = os.path.join(storage.root, "bookings.csv")
+    with open(blob_path, "ab") as blob_file:
+        blob_file.write(b"INN00003,12\n")
+    os.utime(blob_path, ns=(1, 1))
+    assert download_blob(storage, "bookings.csv", path, metadata_path) is True
+    assert open(path, "rb").read().endswith(b"INN00003,12\n")
+
+    with open(path, "ab") as local_file:
+        local_file.write(b"edited")
+    assert download_blob(storage, "bookings.csv", path, metadata_path) is True
+    assert storage.opened == 3
+
+
+def test_corrupt_download_keeps_the_previous_copy(bucket):
+    storage, (path, metadata_path) = bucket
+    download_blob(storage, "bookings.csv", path, metadata_path)
+    os.remove(metadata_path)
+
+    storage.corrupt = True
+    with pytest.raises(CustomException, match="Failed to download"):
+        download_blob(storage, "bookings.csv", path, metadata_path)
+
+    assert open(path, "rb").read() == CSV
+    assert not os.path.exists(f"{path}.part")
+
+
+def test_file_bucket_names_use_local_storage(tmp_path):
+    storage = open_storage(f"file://{tmp_path}")
+    assert isinstance(storage, LocalStorage) and storage.root == str(tmp_path)
+
+
+class FlakyStorage(LocalStorage):
+    # Fails the range requests listed in fail_at (counted from 1), records the ranges served
+
+    def __init__(self, root, fail_at=()):
+        super().__init__(root)
+        self.fail_at = set(fail_at)
+        self.requests = []
+
+    def read_range(self, info, start, end):
+        self.requests.append(start)
+        if len(self.requests) in self.fail_at:
+            raise ConnectionError("connection reset")
+        return super().read_range(info, start, end)
+
+
+@pytest.fixture
+def large_bucket(tmp_path):
+    (tmp_path / "bucket").mkdir()
+    data = os.urandom(10_000)
+    (tmp_path / "bucket" / "bookings.csv").write_bytes(data)
+    return str(tmp_path / "bucket"), data, str(tmp_path / "raw.csv"), str(tmp_path / "raw.csv.blob.json")
+
+
+def test_sliced_download_assembles_every_range(large_bucket):
+    root, data, path, metadata_path = large_bucket
+    storage = FlakyStorage(root)
+
+    assert download_blob(storage, "bookings.csv", path, metadata_path, workers=4, slice_size=1024,
+                         sliced_threshold=0) is True
+    assert open(path, "rb").read() == data
+    assert sorted(storage.requests) == list(range(0, 10_000, 1024))
+    assert not os.path.exists(f"{path}.part.progress.json")
+
+
+def test_interrupted_sliced_download_resumes(large_bucket):
+    root, data, path, metadata_path = large_bucket
+    options = {"workers": 1, "slice_size": 1024, "sliced_threshold": 0}
+
+    with pytest.raises(CustomException):
+        download_blob(FlakyStorage(root, fail_at={4}), "bookings.csv", path, metadata_path, **options)
+    assert os.path.getsize(f"{path}.part") == len(data)
+
+    storage = FlakyStorage(root)
+    download_blob(storage, "bookings.csv", path, metadata_path, **options)
+
+    assert open(path, "rb").read() == data
+    # The three slices before the failure are not fetched again; the failed one is
+    assert storage.requests[0] == 3 * 1024 and min(storage.requests) == 3 * 1024
+
+
+@pytest.fixture
+def exports(tmp_path):
+    root = tmp_path / "bucket"
+    for day, hotel, rows in [("2024-10-01", "A", b"INN1,10\nINN2,20\n"), ("2024-10-01", "B", b"INN3,30"),
+                             ("2024-10-02", "A", b"INN4,40\n")]:
+        (root / "exports" / day).mkdir(parents=True, exist_ok=True)
+        (root / "exports" / day / f"hotel_{hotel}.csv").write_bytes(b"Booking_ID,lead_time\n" + rows)
+    (root / "exports" / "2024-10-02" / "notes.txt").write_bytes(b"not a booking export")
+    paths = str(tmp_path / "raw.csv"), str(tmp_path / "raw.csv.blob.json"), str(tmp_path / "parts")
+    return CountingStorage(str(root)), paths
+
+
+def test_split_pattern():
+    assert split_pattern("exports/2024-*/hotel_*.csv") == ("exports/2024-", "exports/2024-*/hotel_*.csv")
+    assert split_pattern("exports/") == ("exports/", None)
+
+
+def test_matching_objects_are_concatenated_in_name_order(exports):
+    storage, (path, metadata_path, parts_dir) = exports
+
+    report = download_matching(storage, "exports/*/hotel_*.csv", path, metadata_path, parts_dir, parallel_files=2)
+
+    assert open(path, "rb").read() == b"Booking_ID,lead_time\nINN1,10\nINN2,20\nINN3,30\nINN4,40\n"
+    assert report["downloaded_files"] == 3
+    assert report["total_bytes"] == sum(entry["bytes"] for entry in report["files"])
+    assert all(entry["mb_per_second"] > 0 for entry in report["files"])
+
+
+def test_only_new_objects_are_fetched(exports):
+    storage, (path, metadata_path, parts_dir) = exports
+    download_matching(storage, "exports/*/hotel_*.csv", path, metadata_path, parts_dir)
+
+    report = download_matching(storage, "exports/*/hotel_*.csv", path, metadata_path, parts_dir)
+    assert report["downloaded_files"] == 0 and storage.opened == 3
+
+    (Path(storage.root) / "exports" / "2024-10-02" / "hotel_B.csv").write_bytes(b"Booking_ID,lead_time\nINN5,50\n")
+    report = download_matching(storage, "exports/*/hotel_*.csv", path, metadata_path, parts_dir)
+    assert report["downloaded_files"] == 1 and storage.opened == 4
+    assert open(path, "rb").read().endswith(b"INN4,40\nINN5,50\n")
+
+
+def test_mismatched_headers_are_rejected(exports):
+    storage, (path, metadata_path, parts_dir) = exports
+    (Path(storage.root) / "exports" / "2024-10-03").mkdir()
+    (Path(storage.root) / "exports" / "2024-10-03" / "hotel_A.csv").write_bytes(b"id,lead\nINN6,60\n")
+
+    with pytest.raises(CustomException):
+        download_matching(storage, "exports/*.csv", path, metadata_path, parts_dir)
+    assert not os.path.exists(path) and not os.path.exists(f"{path}.part")
+
+
+def test_header_only_part_without_newline_is_terminated(exports):
+    storage, (path, metadata_path, parts_dir) = exports
+    (Path(storage.root) / "exports" / "2024-09-30").mkdir()
+    (Path(storage.root) / "exports" / "2024-09-30" / "hotel_A.csv").write_bytes(b"Booking_ID,lead_time")
+
+    download_matching(storage, "exports/*/hotel_*.csv", path, metadata_path, parts_dir)
+
+    assert open(path, "rb").read().startswith(b"Booking_ID,lead_time\nINN1,10\n")
+
+
+def test_parts_of_objects_that_no_longer_match_are_removed(exports):
+    storage, (path, metadata_path, parts_dir) = exports
+    download_matching(storage, "exports/*/hotel_*.csv", path, metadata_path, parts_dir)
+    assert os.path.exists(os.path.join(parts_dir, "exports", "2024-10-02", "hotel_A.csv"))
+
+    download_matching(storage, "exports/2024-10-01/hotel_*.csv", path, metadata_path, parts_dir)
+
+    assert not os.path.exists(os.path.join(parts_dir, "exports", "2024-10-02"))
+    assert sorted(os.listdir(os.path.join(parts_dir, "exports", "2024-10-01"))) == [
+        "hotel_A.csv", "hotel_A.csv.blob.json", "hotel_B.csv", "hotel_B.csv.blob.json"]
+    assert open(path, "rb").read() == b"Booking_ID,lead_time\nINN1,10\nINN2,20\nINN3,30\n"
+
+
+def test_gcs_client_uses_a_bounded_connection_pool(monkeypatch):
+    import google.auth
+    from google.auth.credentials import AnonymousCredentials
+    monkeypatch.setattr(google.auth, "default", lambda scopes=None: (AnonymousCredentials(), "test-project"))
+
+    storage = GCSStorage("bookings", max_connections=4)
+
+    adapter = storage.session.get_adapter("https://storage.googleapis.com")
+    assert adapter._pool_maxsize == 4 and adapter._pool_block
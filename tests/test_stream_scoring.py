@@ -0,0 +1,64 @@
+import json
+
+import pandas as pd
+import pytest
+from application import app, model_registry
+from config.paths_config import PROCESSED_TEST_DATA_PATH
+from src.features import FEATURE_COLUMNS
+from src.stream_scoring import score_stream
+
+loaded_model = model_registry.current.model
+
+
+def load_bookings(n_rows):
+    return pd.read_parquet(PROCESSED_TEST_DATA_PATH, columns=FEATURE_COLUMNS).head(n_rows)
+
+
+def test_ndjson_stream_keeps_order_and_reports_bad_rows():
+    bookings = load_bookings(25)
+    lines = [json.dumps(record) for record in bookings.to_dict(orient="records")]
+    lines.insert(3, '{"lead_time": "soon"}')
+    lines.insert(10, "not json")
+
+    response = app.test_client().post("/predict/stream", data="\n".join(lines), content_type="application/x-ndjson")
+    results = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+    assert [result["row"] for result in results] == list(range(27))
+    assert "error" in results[3] and "error" in results[10]
+
+    expected = loaded_model.predict(bookings.to_numpy(dtype=float)).tolist()
+    assert [result["prediction"] for result in results if "prediction" in result] == expected
+
+
+def test_csv_stream_in_small_chunks():
+    bookings = load_bookings(50)
+    lines = bookings.to_csv(index=False).splitlines()
+
+    results = list(score_stream(loaded_model, iter(lines), "csv", chunk_size=7))
+
+    assert len(results) == 50
+    assert [result["prediction"] for result in results] == loaded_model.predict(bookings.to_numpy(dtype=float)).tolist()
+
+
+def test_csv_without_feature_columns_reports_stream_error():
+    results = list(score_stream(loaded_model, iter(["a,b", "1,2"]), "csv"))
+    assert results == [{"row": None, "error": results[0]["error"]}]
+    assert "missing the columns" in results[0]["error"]
+
+
+class FailingModel:
+    def __init__(self):
+        self.calls = 0
+
+    def predict_proba(self, features):
+        self.calls += 1
+        raise ValueError("feature count mismatch")
+
+
+def test_scoring_error_is_not_reported_as_a_bad_stream():
+    lines = load_bookings(10).to_csv(index=False).splitlines()
+    model = FailingModel()
+
+    with pytest.raises(ValueError, match="feature count mismatch"):
+        list(score_stream(model, iter(lines), "csv", chunk_size=4))
+    assert model.calls == 1
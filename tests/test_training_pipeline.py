@@ -0,0 +1,35 @@
+import pytest
+from config.paths_config import CONFIG_PATH
+from pipeline.training_pipeline import build_stages, plan
+from src.dag_executor import dependencies, topological_order
+from utils.common_functions import read_yaml
+
+
+@pytest.fixture(scope="module")
+def stages():
+    return build_stages(read_yaml(CONFIG_PATH))
+
+
+def test_stages_form_the_pipeline_dag(stages):
+    deps = dependencies(stages)
+
+    assert topological_order(stages, deps) == ["download", "split", "prepare_train", "prepare_test",
+                                               "select_features", "training"]
+    assert deps["prepare_train"] == deps["prepare_test"] == {"split"}
+    assert deps["select_features"] == {"prepare_train", "prepare_test"}
+    assert deps["training"] == {"select_features"}
+    # The download is always rerun; the split decides from the file contents
+    assert [stage.name for stage in stages if not stage.cached] == ["download"]
+
+
+def test_to_stops_after_the_group_and_force_expands_groups(stages):
+    selected, force = plan(stages, end="processing", force=["ingestion"])
+
+    assert selected == {"download", "split", "prepare_train", "prepare_test", "select_features"}
+    assert force == {"ingestion", "download", "split"}
+    assert plan(stages, start="training")[0] == {"training"}
+
+    with pytest.raises(ValueError):
+        plan(stages, force=["evaluation"])
+    with pytest.raises(ValueError):
+        plan(stages, start="training", end="ingestion")
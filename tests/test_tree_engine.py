@@ -0,0 +1,52 @@
+import joblib
+import pytest
+import numpy as np
+import pandas as pd
+from config.paths_config import MODEL_OUTPUT_PATH, PROCESSED_TEST_DATA_PATH
+from src.features import FEATURE_COLUMNS
+from src.tree_engine import TreeEnsemble
+
+
+def test_parity_with_lightgbm_predict_proba(tmp_path):
+    model = joblib.load(MODEL_OUTPUT_PATH)
+    X = pd.read_parquet(PROCESSED_TEST_DATA_PATH, columns=FEATURE_COLUMNS).to_numpy(dtype=np.float64)
+
+    ensemble = TreeEnsemble.from_lightgbm(model)
+    assert ensemble.feature_names == FEATURE_COLUMNS
+
+    expected = model.predict_proba(X)
+    np.testing.assert_allclose(ensemble.predict_proba(X), expected, rtol=0, atol=1e-12)
+    np.testing.assert_array_equal(ensemble.predict(X), model.predict(X))
+
+    ensemble.save(tmp_path / "trees.npz")
+    reloaded = TreeEnsemble.load(tmp_path / "trees.npz")
+    np.testing.assert_allclose(reloaded.predict_proba(X[:100]), expected[:100], rtol=0, atol=1e-12)
+
+
+def test_missing_values_follow_lightgbm():
+    model = joblib.load(MODEL_OUTPUT_PATH)
+    X = pd.read_parquet(PROCESSED_TEST_DATA_PATH, columns=FEATURE_COLUMNS).head(50).to_numpy(dtype=np.float64)
+    X[::3, 0] = np.nan
+    X[1::3, 2] = np.nan
+
+    ensemble = TreeEnsemble.from_lightgbm(model)
+    np.testing.assert_allclose(ensemble.predict_proba(X), model.predict_proba(X), rtol=0, atol=1e-12)
+
+
+def test_flat_file_is_memory_mapped_and_versioned(tmp_path):
+    model = joblib.load(MODEL_OUTPUT_PATH)
+    X = pd.read_parquet(PROCESSED_TEST_DATA_PATH, columns=FEATURE_COLUMNS).head(500).to_numpy(dtype=np.float64)
+    path = tmp_path / "trees.bin"
+    TreeEnsemble.from_lightgbm(model).save_flat(path, source_sha256="abc")
+
+    mapped, source_sha256 = TreeEnsemble.load_flat(path)
+    assert source_sha256 == "abc"
+    assert isinstance(mapped.value.base, np.memmap)
+    assert not mapped.value.flags.writeable
+    np.testing.assert_allclose(mapped.predict_proba(X), model.predict_proba(X), rtol=0, atol=1e-12)
+
+    data = bytearray(path.read_bytes())
+    data[4] = 99
+    path.write_bytes(bytes(data))
+    with pytest.raises(ValueError, match="format version 99"):
+        TreeEnsemble.load_flat(path)
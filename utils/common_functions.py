@@ -1,5 +1,5 @@
 import os
-import pandas as pd
+import hashlib
 from src.logger import get_logger
 from src.custom_exception import CustomException
 import yaml
@@ -19,10 +19,43 @@ def read_yaml(file_path):
         logger.error("Error reading YAML file")
         raise CustomException("Failed to read YAML file", e)
     
-def load_data(path):
+def load_data(path, columns=None):
+    # Parquet for the pipeline's own artifacts, CSV for external inputs; columns limits what is read
     try:
-        logger.info("Loading data")
-        return pd.read_csv(path)
+        logger.info(f"Loading data from {path}")
+        import pandas as pd  # only the training pipeline needs pandas, keep it out of serving imports
+        if path.endswith(".parquet"):
+            return pd.read_parquet(path, columns=columns)
+        return pd.read_csv(path, usecols=columns)
     except Exception as e:
         logger.error(f"Error loading data: {e}")
-        raise CustomException("Failed to load data", e)
\ No newline at end of file
+        raise CustomException("Failed to load data", e)
+
+def save_parquet(df, path, schema):
+    # Columns are cast to the declared schema (a lossy cast fails) and the index is not stored
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        from src.data_schema import select_schema
+
+        table = pa.Table.from_pandas(df, schema=select_schema(schema, list(df.columns)), preserve_index=False)
+        pq.write_table(table, path, compression="zstd")
+        logger.info(f"Saved {table.num_rows} rows to {path}")
+    except Exception as e:
+        logger.error(f"Error saving data: {e}")
+        raise CustomException("Failed to save data", e)
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def compute_model_version(path):
+    # Short content hash of the model artifact, used to tell model versions apart
+    try:
+        return file_sha256(path)[:12]
+    except Exception as e:
+        logger.error(f"Error computing model version: {e}")
+        raise CustomException("Failed to compute model version", e)